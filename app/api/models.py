@@ -14,6 +14,13 @@ class ProcessingStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobView(str, Enum):
+    """How much of a job's result is returned"""
+    SUMMARY = "summary"  # Counts and reports; pages are served by /jobs/{id}/pages
+    FULL = "full"
 
 
 class ConfigurationRequest(BaseModel):
@@ -44,6 +51,9 @@ class ConfigurationRequest(BaseModel):
     hash_algorithm: Optional[str] = Field("phash", description="Hash algorithm (phash/dhash/whash/average_hash)")
     similarity_threshold: Optional[float] = Field(0.95, description="Similarity threshold for duplicates")
     hamming_distance_threshold: Optional[int] = Field(5, description="Hamming distance threshold")
+    duplicate_verify_method: Optional[str] = Field(
+        None, description="Verification stage for candidate duplicates (phash/ncc)"
+    )
 
     # File management settings
     output_format: Optional[str] = Field("pdf", description="Output format (pdf/images/both)")
@@ -56,6 +66,17 @@ class ProcessRequest(BaseModel):
     configuration: Optional[ConfigurationRequest] = Field(None, description="Optional custom configuration")
 
 
+class PreviewSprite(BaseModel):
+    """Location of a page preview within a sprite sheet (in pixels)"""
+    url: str = Field(..., description="URL of the sprite sheet")
+    x: int = Field(..., description="Left edge of the preview in the sheet")
+    y: int = Field(..., description="Top edge of the preview in the sheet")
+    width: int = Field(..., description="Preview width")
+    height: int = Field(..., description="Preview height")
+    sheet_width: int = Field(..., description="Sprite sheet width")
+    sheet_height: int = Field(..., description="Sprite sheet height")
+
+
 class PageInfo(BaseModel):
     """Information about a single page"""
     page_index: int = Field(..., description="Original page index")
@@ -63,6 +84,7 @@ class PageInfo(BaseModel):
     is_duplicate: bool = Field(..., description="Whether this page is a duplicate")
     duplicate_of: Optional[int] = Field(None, description="Index of the page this is a duplicate of")
     preview_url: Optional[str] = Field(None, description="URL to page preview image")
+    sprite: Optional[PreviewSprite] = Field(None, description="Preview location in a sprite sheet")
 
 
 class ReportInfo(BaseModel):
@@ -74,6 +96,12 @@ class ReportInfo(BaseModel):
     download_url: str = Field(..., description="URL to download the report")
 
 
+class GenerationProgress(BaseModel):
+    """Progress of the PDF generated from a job's page selection"""
+    progress: int = Field(..., ge=0, le=100, description="Progress percentage (0-100)")
+    current_step: str = Field(..., description="Description of current step")
+
+
 class ProcessingProgress(BaseModel):
     """Processing progress update"""
     job_id: str = Field(..., description="Job identifier")
@@ -81,6 +109,9 @@ class ProcessingProgress(BaseModel):
     progress: int = Field(..., ge=0, le=100, description="Progress percentage (0-100)")
     current_step: str = Field(..., description="Description of current step")
     message: Optional[str] = Field(None, description="Additional message or error details")
+    generation: Optional[GenerationProgress] = Field(
+        None, description="PDF generation progress, once a PDF was requested"
+    )
 
 
 class ProcessingResult(BaseModel):
@@ -114,17 +145,48 @@ class JobStatusResponse(BaseModel):
     status: ProcessingStatus = Field(..., description="Current job status")
     progress: int = Field(..., ge=0, le=100, description="Progress percentage")
     current_step: Optional[str] = Field(None, description="Current processing step")
-    result: Optional[ProcessingResult] = Field(None, description="Final result if completed")
+    result: Optional[ProcessingResult] = Field(
+        None, description="Final result if completed (without pages in the summary view)"
+    )
+    page_count: Optional[int] = Field(
+        None, description="Number of entries in the result's page list"
+    )
+    pages_url: Optional[str] = Field(None, description="URL of the paginated page list")
     error: Optional[str] = Field(None, description="Error message if failed")
+    generation: Optional[GenerationProgress] = Field(
+        None, description="PDF generation progress, once a PDF was requested"
+    )
     created_at: datetime = Field(..., description="Job creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
 
 
+class MemoryReservation(BaseModel):
+    """Memory reserved by (or waited for by) one job"""
+    job_id: str = Field(..., description="Job identifier")
+    memory_mb: float = Field(..., description="Estimated peak memory in MB")
+    state: str = Field(..., description="waiting, running, parking or parked")
+
+
+class MemoryStatus(BaseModel):
+    """Memory budget of the job executor"""
+    limit_mb: int = Field(..., description="Memory budget of this worker in MB (0 for no limit)")
+    reserved_mb: float = Field(
+        ..., description="Memory reserved by running and parked jobs"
+    )
+    available_mb: Optional[float] = Field(
+        None, description="Unreserved memory (None without a limit)"
+    )
+    reservations: List[MemoryReservation] = Field(
+        default_factory=list, description="Jobs known to this worker"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = Field(..., description="Health status")
     version: str = Field(..., description="Application version")
     tesseract_available: bool = Field(..., description="Whether Tesseract OCR is available")
+    memory: Optional[MemoryStatus] = Field(None, description="Memory reservations of this worker")
 
 
 class ErrorResponse(BaseModel):
@@ -138,13 +200,42 @@ class UploadResponse(BaseModel):
     """File upload response"""
     filename: str = Field(..., description="Uploaded filename")
     size_mb: float = Field(..., description="File size in MB")
+    sha256: Optional[str] = Field(None, description="SHA-256 digest of the file")
     message: str = Field(..., description="Upload status message")
 
 
+class ResumableUploadRequest(BaseModel):
+    """Request model for starting a resumable upload"""
+    filename: str = Field(..., description="Name of the file being uploaded")
+    size: int = Field(..., gt=0, description="Total file size in bytes")
+    sha256: Optional[str] = Field(None, description="Expected SHA-256 digest, checked on finalize")
+
+
+class ResumableUploadStatus(BaseModel):
+    """State of a resumable upload"""
+    upload_id: str = Field(..., description="Upload identifier")
+    filename: str = Field(..., description="Name of the file being uploaded")
+    size: int = Field(..., description="Total file size in bytes")
+    received: int = Field(..., description="Bytes received so far (offset of the next chunk)")
+    chunk_size: int = Field(..., description="Recommended chunk size in bytes")
+    complete: bool = Field(..., description="Whether all bytes have been received")
+
+
 class ListJobsResponse(BaseModel):
-    """Response model for listing all jobs"""
-    jobs: List[JobStatusResponse] = Field(..., description="List of all jobs")
-    total: int = Field(..., description="Total number of jobs")
+    """Response model for listing jobs"""
+    jobs: List[JobStatusResponse] = Field(..., description="Jobs on this page, newest first")
+    total: int = Field(..., description="Total number of matching jobs")
+    limit: Optional[int] = Field(None, description="Maximum number of jobs per page")
+    offset: int = Field(0, description="Number of jobs skipped")
+
+
+class JobPagesResponse(BaseModel):
+    """Response model for a page of a job's page list"""
+    job_id: str = Field(..., description="Job identifier")
+    pages: List[PageInfo] = Field(..., description="Page information on this page of the list")
+    total: int = Field(..., description="Total number of pages in the list")
+    limit: int = Field(..., description="Maximum number of pages per response")
+    offset: int = Field(..., description="Number of pages skipped")
 
 
 class DeleteJobResponse(BaseModel):
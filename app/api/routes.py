@@ -4,32 +4,71 @@ API routes for the Medical Report PDF Processor.
 Endpoints for file upload, processing, status checking, and report download.
 """
 
+import hashlib
 import logging
 import os
+import re
 import asyncio
+import shutil
 from pathlib import Path
-from typing import List
-
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from typing import Dict, List, Optional
+
+import aiofiles
+
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    HTTPException,
+    BackgroundTasks,
+    WebSocket,
+    WebSocketDisconnect,
+    Request,
+    Query,
+)
+from fastapi.requests import HTTPConnection
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from app.api.models import (
     ProcessResponse,
     JobStatusResponse,
     HealthResponse,
+    MemoryStatus,
     UploadResponse,
     ErrorResponse,
     ListJobsResponse,
+    JobPagesResponse,
+    JobView,
     DeleteJobResponse,
     ConfigurationRequest,
     ConfigurationResponse,
     ProcessingStatus,
     GeneratePDFRequest,
     GeneratePDFResponse,
+    ResumableUploadRequest,
+    ResumableUploadStatus,
 )
 from app.core.tasks import job_manager
-from app.core.processor import process_pdf_async
-from config.config import get_config, BLANK_DETECTION_CONFIG
+from app.core.checkpoints import JobClaimedError, checkpoint_store
+from app.core.processor import (
+    generate_pdf_async,
+    process_pdf_async,
+    read_selection_manifest,
+    selected_page_indices,
+)
+from app.core.executor import JobCancelledError, job_executor
+from app.core.previews import preview_cache
+from app.core.events import JobEventStream
+from app.core.uploads import (
+    UploadNotFoundError,
+    UploadOffsetError,
+    UploadTooLargeError,
+    resumable_uploads,
+    stream_upload,
+)
+from config.config import get_config, BLANK_DETECTION_CONFIG, PERFORMANCE_CONFIG, UPLOAD_CONFIG
+from src.file_manager import FileManager
+from src.pdf_processor import PDFProcessor
 import json
 
 logger = logging.getLogger(__name__)
@@ -37,7 +76,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Constants
-MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
+MAX_FILE_SIZE = UPLOAD_CONFIG["max_file_size_mb"] * 1024 * 1024
+UPLOAD_CHUNK_SIZE = UPLOAD_CONFIG["chunk_size_kb"] * 1024
 ALLOWED_EXTENSIONS = {".pdf"}
 UPLOAD_DIR = Path("input")
 OUTPUT_DIR = Path("output")
@@ -69,6 +109,7 @@ async def health_check():
         status="healthy",
         version="1.1.0",
         tesseract_available=tesseract_available,
+        memory=MemoryStatus(**job_executor.memory_status()),
     )
 
 
@@ -84,60 +125,195 @@ async def upload_file(file: UploadFile = File(...)):
         Upload confirmation with file details
     """
     # Validate file extension
-    file_extension = Path(file.filename).suffix.lower()
+    _check_extension(file.filename)
+
+    # Stream to disk in chunks, checking the size and hashing as we go
+    try:
+        stored = await stream_upload(file, UPLOAD_DIR, MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    file_path, file_size = stored.path, stored.size
+
+    logger.info(f"File uploaded: {file_path.name} ({file_size / (1024*1024):.2f} MB)")
+
+    return UploadResponse(
+        filename=file_path.name,
+        size_mb=round(file_size / (1024 * 1024), 2),
+        sha256=stored.sha256,
+        message=f"File '{file_path.name}' uploaded successfully",
+    )
+
+
+def _client_id(connection: HTTPConnection) -> Optional[str]:
+    """
+    Identify the client of a request or WebSocket.
+
+    Browsers cannot set headers on WebSocket and EventSource connections, so
+    a client_id query parameter is accepted as well.
+
+    Args:
+        connection: Request or WebSocket
+
+    Returns:
+        X-Client-Id header, client_id query parameter, or the client address
+    """
+    return (
+        connection.headers.get("X-Client-Id")
+        or connection.query_params.get("client_id")
+        or (connection.client.host if connection.client else None)
+    )
+
+
+def _check_extension(filename: str):
+    """Reject files that are not PDFs."""
+    file_extension = Path(filename).suffix.lower()
     if file_extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file type. Only PDF files are allowed. Got: {file_extension}",
         )
 
-    # Read file and check size
-    contents = await file.read()
-    file_size = len(contents)
 
-    if file_size > MAX_FILE_SIZE:
+@router.post("/uploads", response_model=ResumableUploadStatus)
+async def start_resumable_upload(request: ResumableUploadRequest):
+    """
+    Start a resumable upload.
+
+    Protocol: start the upload, PUT chunks to /uploads/{upload_id}?offset=N
+    (N = bytes received so far), check GET /uploads/{upload_id} after a dropped
+    connection to find where to resume, then POST /uploads/{upload_id}/finalize.
+
+    Args:
+        request: Filename, total size and optional SHA-256 digest
+
+    Returns:
+        Upload status with the upload ID
+    """
+    _check_extension(request.filename)
+    try:
+        state = resumable_uploads.create(request.filename, request.size, request.sha256)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ResumableUploadStatus(**state)
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(upload_id: str):
+    """
+    Get the state of a resumable upload.
+
+    Args:
+        upload_id: Upload identifier
+
+    Returns:
+        Upload status, including the offset to resume from
+    """
+    try:
+        return ResumableUploadStatus(**resumable_uploads.status(upload_id))
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def upload_chunk(upload_id: str, offset: int, request: Request):
+    """
+    Append a chunk to a resumable upload. The request body is the raw chunk.
+
+    Args:
+        upload_id: Upload identifier
+        offset: Offset of the chunk in the file
+        request: Request whose body is streamed into the upload
+
+    Returns:
+        Updated upload status
+    """
+    try:
+        state = await resumable_uploads.append(upload_id, offset, request.stream())
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadOffsetError as e:
         raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024*1024):.1f} MB",
+            status_code=409,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.expected_offset)},
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return ResumableUploadStatus(**state)
 
-    if file_size == 0:
-        raise HTTPException(status_code=400, detail="File is empty")
 
-    # Save file
-    UPLOAD_DIR.mkdir(exist_ok=True)
-    file_path = UPLOAD_DIR / file.filename
-
-    # Handle duplicate filenames
-    counter = 1
-    original_stem = file_path.stem
-    while file_path.exists():
-        file_path = UPLOAD_DIR / f"{original_stem}_{counter}{file_extension}"
-        counter += 1
+@router.post("/uploads/{upload_id}/finalize", response_model=UploadResponse)
+async def finalize_resumable_upload(upload_id: str):
+    """
+    Finalize a resumable upload once every byte has been received.
 
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    Args:
+        upload_id: Upload identifier
 
-    logger.info(f"File uploaded: {file_path.name} ({file_size / (1024*1024):.2f} MB)")
+    Returns:
+        Upload confirmation; the filename can be passed to /process
+    """
+    try:
+        stored = await resumable_uploads.finalize(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"File uploaded: {stored.path.name} ({stored.size / (1024*1024):.2f} MB, resumable)"
+    )
 
     return UploadResponse(
-        filename=file_path.name,
-        size_mb=round(file_size / (1024 * 1024), 2),
-        message=f"File '{file_path.name}' uploaded successfully",
+        filename=stored.path.name,
+        size_mb=round(stored.size / (1024 * 1024), 2),
+        sha256=stored.sha256,
+        message=f"File '{stored.path.name}' uploaded successfully",
     )
 
 
+@router.delete("/uploads/{upload_id}")
+async def abort_resumable_upload(upload_id: str):
+    """
+    Discard a resumable upload.
+
+    Args:
+        upload_id: Upload identifier
+
+    Returns:
+        Deletion confirmation
+    """
+    try:
+        existed = resumable_uploads.abort(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not existed:
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return {"upload_id": upload_id, "message": "Upload discarded"}
+
+
 @router.post("/process", response_model=ProcessResponse)
 async def process_pdf(
     filename: str,
+    request: Request,
     background_tasks: BackgroundTasks,
     configuration: ConfigurationRequest = None,
 ):
     """
     Start processing a PDF file.
 
+    Jobs are scheduled by page count: small documents use the fast lane,
+    large ones share the bulk lane fairly between clients (identified by the
+    X-Client-Id header, or the client address).
+
     Args:
         filename: Name of the uploaded PDF file
+        request: Incoming request (used to identify the client)
         background_tasks: FastAPI background tasks
         configuration: Optional custom configuration
 
@@ -152,9 +328,22 @@ async def process_pdf(
             detail=f"File '{filename}' not found. Please upload the file first.",
         )
 
+    if job_executor.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many jobs are waiting to be processed. Please try again later.",
+        )
+
+    # Page count is read from the document trailer, without rendering
+    try:
+        page_count = await asyncio.to_thread(PDFProcessor().get_page_count, str(file_path))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read PDF: {e}")
+    client_id = _client_id(request)
+
     # Create job
     config_dict = configuration.dict(exclude_none=True) if configuration else {}
-    job_id = job_manager.create_job(filename, config_dict)
+    job_id = await job_manager.create_job(filename, config_dict, client_id)
 
     # Convert configuration to nested dict structure if needed
     processing_config = None
@@ -183,6 +372,7 @@ async def process_pdf(
                 "hash_algorithm": configuration.hash_algorithm,
                 "similarity_threshold": configuration.similarity_threshold,
                 "hamming_distance_threshold": configuration.hamming_distance_threshold,
+                "verify_method": configuration.duplicate_verify_method,
             },
             "file_management": {
                 "output_format": configuration.output_format,
@@ -199,9 +389,14 @@ async def process_pdf(
         str(file_path),
         str(OUTPUT_DIR),
         processing_config,
+        page_count,
+        client_id,
     )
 
-    logger.info(f"Started processing job {job_id} for file: {filename}")
+    logger.info(
+        f"Started processing job {job_id} for file: {filename} "
+        f"({page_count} pages, {job_executor.classify(page_count)} lane)"
+    )
 
     return ProcessResponse(
         job_id=job_id,
@@ -216,77 +411,307 @@ async def _process_and_update(
     input_path: str,
     output_dir: str,
     config: dict,
+    page_count: int = None,
+    client_id: str = None,
 ):
     """
     Background task to process PDF and update job status.
     """
     try:
-        result = await process_pdf_async(job_id, input_path, output_dir, config)
-        await job_manager.complete_job(job_id, result)
+        result = await process_pdf_async(
+            job_id, input_path, output_dir, config, page_count, client_id
+        )
+        # Failures were already recorded by process_pdf_async
+        if result.status == ProcessingStatus.COMPLETED:
+            await job_manager.complete_job(job_id, result)
+    except JobCancelledError:
+        # Recorded again: progress relayed before the job stopped may have
+        # overwritten the step (no-op if the job was deleted)
+        await job_manager.cancel_job(job_id)
+    except JobClaimedError as e:
+        # The worker holding the job updates its record
+        logger.info(str(e))
     except Exception as e:
         logger.error(f"Error in background processing: {e}", exc_info=True)
         await job_manager.fail_job(job_id, str(e))
+    finally:
+        job_executor.clear_cancelled(job_id)
 
 
-@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
+# Resumed jobs, referenced so they are not garbage collected
+_resumed_tasks = set()
+
+
+async def resume_interrupted_jobs() -> List[str]:
     """
-    Get the status of a processing job.
+    Resume the jobs left unfinished by a previous run of the server.
 
-    Args:
-        job_id: Job identifier
+    Every job with a checkpoint that no live worker holds is started again;
+    it skips the page batches analysed before the restart. Checkpoints of
+    jobs that ended, or whose input is gone, are removed.
 
     Returns:
-        Job status and result if completed
+        IDs of the resumed jobs
     """
-    job = job_manager.get_job(job_id)
+    if not checkpoint_store.enabled:
+        return []
+
+    resumed = []
+    for job_id in await asyncio.to_thread(checkpoint_store.job_ids):
+        checkpoint = checkpoint_store.claim(job_id)
+        if checkpoint is None:
+            continue  # Still running in another worker
+
+        saved = await asyncio.to_thread(checkpoint.read_job)
+        job = await job_manager.get_job(job_id, ["status"])
+        if (
+            saved is None
+            or not Path(saved["input_path"]).exists()
+            or (job is not None and job["status"] not in ACTIVE_STATUSES)
+        ):
+            checkpoint_store.release(job_id)
+            continue
+
+        if job is None:
+            # In-memory job store: the job record did not survive the restart
+            await job_manager.create_job(
+                Path(saved["input_path"]).name, {}, saved.get("client_id"), job_id=job_id
+            )
+        await job_manager.update_progress(
+            job_id, 0, "Resuming after restart", ProcessingStatus.PENDING
+        )
 
-    if not job:
-        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        task = asyncio.create_task(_process_and_update(
+            job_id,
+            saved["input_path"],
+            saved["output_dir"],
+            saved.get("config"),
+            saved.get("page_count"),
+            saved.get("client_id"),
+        ))
+        _resumed_tasks.add(task)
+        task.add_done_callback(_resumed_tasks.discard)
+        resumed.append(job_id)
+
+    if resumed:
+        logger.info(f"Resumed {len(resumed)} interrupted jobs")
+    return resumed
+
+
+# Pagination of job listings and page lists
+JOBS_PAGE_SIZE = 50
+MAX_JOBS_PAGE_SIZE = 500
+PAGES_PAGE_SIZE = 200
+MAX_PAGES_PAGE_SIZE = 2000
+
+# Job responses change with every update; clients revalidate them with If-None-Match
+JOB_CACHE_CONTROL = "no-cache"
+
+# Fields that identify a version of a job (read without decoding the result)
+JOB_VERSION_FIELDS = ["job_id", "status", "progress", "updated_at"]
+
+
+def _etag(*parts) -> str:
+    """Build an ETag from the values a response was derived from."""
+    version = ":".join(str(part) for part in parts)
+    return f'"{hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _job_etag(job: Dict, *parts) -> str:
+    """Build the ETag of a response derived from a version of a job."""
+    return _etag(job["job_id"], job["status"], job["progress"], job["updated_at"], *parts)
+
+
+def _job_response(job: Dict, view: JobView) -> JobStatusResponse:
+    """Build a job status response, leaving the page list out of the summary view."""
+    result = job.get("result")
+    page_count = pages_url = None
+    if result is not None and result.pages is not None:
+        page_count = len(result.pages)
+        pages_url = f"/api/jobs/{job['job_id']}/pages"
+        if view == JobView.SUMMARY:
+            result = result.model_copy(update={"pages": None})
 
     return JobStatusResponse(
         job_id=job["job_id"],
         status=job["status"],
         progress=job["progress"],
         current_step=job.get("current_step"),
-        result=job.get("result"),
+        result=result,
+        page_count=page_count,
+        pages_url=pages_url,
         error=job.get("error"),
+        generation=job.get("generation"),
         created_at=job["created_at"],
         updated_at=job["updated_at"],
     )
 
 
+async def _get_job_version(job_id: str) -> Dict:
+    """Read the version fields of a job, or raise a 404."""
+    version = await job_manager.get_job(job_id, JOB_VERSION_FIELDS)
+    if not version:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return version
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str, request: Request, response: Response, view: JobView = JobView.SUMMARY
+):
+    """
+    Get the status of a processing job.
+
+    The summary view leaves out the result's page list (see page_count and
+    pages_url). Responses carry an ETag, and a matching If-None-Match gets a
+    304 without reading the result.
+
+    Args:
+        job_id: Job identifier
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the ETag)
+        view: summary (default) or full
+
+    Returns:
+        Job status and result if completed
+    """
+    etag = _job_etag(await _get_job_version(job_id), view.value)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": JOB_CACHE_CONTROL})
+
+    job = await job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    response.headers["ETag"] = _job_etag(job, view.value)
+    response.headers["Cache-Control"] = JOB_CACHE_CONTROL
+    return _job_response(job, view)
+
+
+@router.get("/jobs/{job_id}/pages", response_model=JobPagesResponse)
+async def get_job_pages(
+    job_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGES_PAGE_SIZE, ge=1, le=MAX_PAGES_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Get a page of a completed job's page list.
+
+    Args:
+        job_id: Job identifier
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the ETag)
+        limit: Maximum number of pages to return
+        offset: Number of pages to skip
+
+    Returns:
+        Page information and the total number of pages
+    """
+    etag = _job_etag(await _get_job_version(job_id), "pages", limit, offset)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": JOB_CACHE_CONTROL})
+
+    job = await job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.get("result") is None:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' has no result yet")
+
+    pages = job["result"].pages or []
+    response.headers["ETag"] = _job_etag(job, "pages", limit, offset)
+    response.headers["Cache-Control"] = JOB_CACHE_CONTROL
+    return JobPagesResponse(
+        job_id=job_id,
+        pages=pages[offset:offset + limit],
+        total=len(pages),
+        limit=limit,
+        offset=offset,
+    )
+
+
 @router.get("/jobs", response_model=ListJobsResponse)
-async def list_jobs():
+async def list_jobs(
+    request: Request,
+    response: Response,
+    status: Optional[List[ProcessingStatus]] = Query(None),
+    limit: int = Query(JOBS_PAGE_SIZE, ge=1, le=MAX_JOBS_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    view: JobView = JobView.SUMMARY,
+):
     """
-    List all processing jobs.
+    List processing jobs, newest first.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the ETag)
+        status: Only list jobs with one of these statuses (repeatable)
+        limit: Maximum number of jobs to return
+        offset: Number of jobs to skip
+        view: summary (default, without page lists) or full
+
+    Returns:
+        Jobs on the requested page and the total number of matching jobs
+    """
+    jobs = await job_manager.get_all_jobs(status, limit, offset)
+    total = await job_manager.count_jobs(status)
+
+    etag = _etag(
+        "jobs", status, total, view.value, limit, offset, *(_job_etag(job) for job in jobs)
+    )
+    headers = {"ETag": etag, "Cache-Control": JOB_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return ListJobsResponse(
+        jobs=[_job_response(job, view) for job in jobs],
+        total=total,
+        limit=limit,
+        offset=offset,
+    )
+
+
+# Jobs whose work can still be cancelled
+ACTIVE_STATUSES = (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a pending or running job.
+
+    The job stops within one page of processing, removes its partial output
+    and temp files, and ends with the cancelled status.
+
+    Args:
+        job_id: Job identifier
 
     Returns:
-        List of all jobs with their status
-    """
-    jobs = job_manager.get_all_jobs()
-
-    job_responses = [
-        JobStatusResponse(
-            job_id=job["job_id"],
-            status=job["status"],
-            progress=job["progress"],
-            current_step=job.get("current_step"),
-            result=job.get("result"),
-            error=job.get("error"),
-            created_at=job["created_at"],
-            updated_at=job["updated_at"],
+        Job status
+    """
+    job = await _get_job_version(job_id)
+    if job["status"] == ProcessingStatus.CANCELLED:
+        return _job_response(await job_manager.get_job(job_id), JobView.SUMMARY)
+    if job["status"] not in ACTIVE_STATUSES:
+        raise HTTPException(
+            status_code=409, detail=f"Job '{job_id}' has already {job['status'].value}"
         )
-        for job in jobs
-    ]
 
-    return ListJobsResponse(jobs=job_responses, total=len(job_responses))
+    job_executor.cancel(job_id)
+    if not await job_manager.cancel_job(job_id):
+        # Finished in the meantime: nothing left to stop
+        job_executor.clear_cancelled(job_id)
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' has already finished")
+
+    return _job_response(await job_manager.get_job(job_id), JobView.SUMMARY)
 
 
 @router.delete("/jobs/{job_id}", response_model=DeleteJobResponse)
 async def delete_job(job_id: str):
     """
-    Delete a processing job.
+    Delete a processing job, cancelling its work if it is still running.
 
     Args:
         job_id: Job identifier
@@ -294,7 +719,16 @@ async def delete_job(job_id: str):
     Returns:
         Deletion confirmation
     """
-    deleted = job_manager.delete_job(job_id)
+    job = await job_manager.get_job(job_id, ["status"])
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    if job["status"] in ACTIVE_STATUSES or job_id in _generating_jobs:
+        # The job's task removes the flag once its work has stopped
+        job_executor.cancel(job_id)
+
+    deleted = await job_manager.delete_job(job_id)
+    await asyncio.to_thread(shutil.rmtree, OUTPUT_DIR / "temp" / f"job_{job_id}", True)
 
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
@@ -463,133 +897,386 @@ async def websocket_progress(websocket: WebSocket, job_id: str):
     """
     await websocket.accept()
 
-    # Register progress callback
-    async def send_progress(progress_update):
-        try:
-            await websocket.send_json(progress_update.dict())
-        except Exception as e:
-            logger.error(f"Error sending progress update: {e}")
+    # Events are queued per connection and sent from this connection's own
+    # task, so a slow browser never holds up other jobs or clients. The
+    # stream also polls the job store, so jobs run by other workers report too
+    stream = JobEventStream(
+        job_manager, [job_id], poll_interval=PERFORMANCE_CONFIG["event_poll_interval"]
+    )
 
-    job_manager.register_progress_callback(job_id, send_progress)
+    async def send_progress():
+        async for progress_update in stream:
+            try:
+                await websocket.send_json(progress_update.model_dump(mode="json"))
+            except Exception as e:
+                logger.error(f"Error sending progress update: {e}")
+                break
+
+    sender = asyncio.create_task(send_progress())
 
     try:
         # Keep connection alive and listen for disconnect
         while True:
             try:
-                data = await websocket.receive_text()
+                await websocket.receive_text()
                 # Echo back or handle client messages if needed
             except WebSocketDisconnect:
                 logger.info(f"WebSocket disconnected for job {job_id}")
                 break
     finally:
-        job_manager.unregister_progress_callbacks(job_id)
+        stream.close()
+        sender.cancel()
+
+
+# Seconds between keep-alive comments on idle Server-Sent Events streams
+SSE_KEEPALIVE_INTERVAL = 15
+
+
+def _open_event_stream(connection: HTTPConnection, jobs: Optional[str]) -> JobEventStream:
+    """
+    Create the event stream requested by a connection.
+
+    Args:
+        connection: Request or WebSocket
+        jobs: Comma-separated job IDs; without them, all jobs of the client
+
+    Returns:
+        JobEventStream (close it when the connection ends)
+    """
+    job_ids = [job_id for job_id in (jobs or "").split(",") if job_id]
+    return JobEventStream(
+        job_manager,
+        job_ids,
+        client_id=None if job_ids else _client_id(connection),
+        poll_interval=PERFORMANCE_CONFIG["event_poll_interval"],
+    )
+
+
+@router.websocket("/events")
+async def job_events_websocket(websocket: WebSocket, jobs: Optional[str] = None):
+    """
+    WebSocket stream of status, progress and completion events for many jobs.
+
+    Without the jobs parameter, every job of the client is followed. The
+    client may send {"subscribe": [...]} and {"unsubscribe": [...]} messages
+    to change the followed job IDs.
+
+    Args:
+        websocket: WebSocket connection
+        jobs: Comma-separated job IDs to follow
+    """
+    await websocket.accept()
+    stream = _open_event_stream(websocket, jobs)
+
+    async def send_events():
+        async for event in stream:
+            try:
+                await websocket.send_json(event.model_dump(mode="json"))
+            except Exception as e:
+                logger.error(f"Error sending job event: {e}")
+                break
+
+    sender = asyncio.create_task(send_events())
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except WebSocketDisconnect:
+                break
+            except ValueError:
+                continue  # Not JSON
+            if isinstance(message, dict):
+                await stream.add_jobs(message.get("subscribe") or [])
+                stream.remove_jobs(message.get("unsubscribe") or [])
+    finally:
+        stream.close()
+        sender.cancel()
+
+
+@router.get("/events")
+async def job_events_sse(request: Request, jobs: Optional[str] = None):
+    """
+    Server-Sent Events stream of status, progress and completion events for many jobs.
+
+    Without the jobs parameter, every job of the client is followed.
+
+    Args:
+        request: Incoming request (used to identify the client)
+        jobs: Comma-separated job IDs to follow
+
+    Returns:
+        text/event-stream response
+    """
+    stream = _open_event_stream(request, jobs)
+
+    async def sse():
+        events = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                except StopAsyncIteration:
+                    break
+                yield f"data: {event.model_dump_json()}\n\n"
+        finally:
+            stream.close()
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Previews of a job never change, so browsers may keep them for the job's lifetime
+PREVIEW_CACHE_CONTROL = "private, max-age=86400, immutable"
 
 
 @router.get("/preview/{job_id}/{filename}")
-async def get_page_preview(job_id: str, filename: str):
+async def get_page_preview(job_id: str, filename: str, request: Request):
     """
-    Serve page preview images for user selection.
+    Serve page preview images and sprite sheets for user selection.
+
+    Previews are rendered from the source PDF on first request and cached.
+    Responses carry an ETag, and a matching If-None-Match gets a 304
+    without touching the cache.
 
     Args:
         job_id: Job identifier
-        filename: Preview image filename (e.g., page_0.jpg)
+        filename: Preview image filename (page_0.jpg) or sprite sheet
+            filename (sheet_0.webp)
+        request: Incoming request (for If-None-Match)
 
     Returns:
         Image file
     """
-    from pathlib import Path
+    page = re.fullmatch(r"page_(\d+)\.jpg", filename)
+    sheet = re.fullmatch(rf"sheet_(\d+)\.{preview_cache.sheet_extension}", filename)
+    if not page and not sheet:
+        raise HTTPException(status_code=404, detail="Preview image not found")
 
     base_dir = Path(__file__).parent.parent.parent
-    preview_path = base_dir / "output" / "temp" / f"job_{job_id}" / filename
+    job_dir = base_dir / "output" / "temp" / f"job_{job_id}"
 
-    if not preview_path.exists():
+    try:
+        manifest = await asyncio.to_thread(read_selection_manifest, job_dir)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Preview image not found")
 
-    return FileResponse(preview_path, media_type="image/jpeg")
+    if page:
+        index = int(page.group(1))
+        non_blank_indices = manifest["non_blank_indices"]
+        if not 0 <= index < len(non_blank_indices):
+            raise HTTPException(status_code=404, detail="Preview image not found")
+        etag = f'"{preview_cache.key(manifest, non_blank_indices[index])}"'
+        get_preview, media_type = preview_cache.get, "image/jpeg"
+    else:
+        index = int(sheet.group(1))
+        if not 0 <= index < preview_cache.sheet_count(len(manifest["non_blank_indices"])):
+            raise HTTPException(status_code=404, detail="Preview image not found")
+        etag = f'"{preview_cache.sheet_key(manifest, index)}"'
+        get_preview = preview_cache.get_sheet
+        media_type = f"image/{preview_cache.sheet_format.lower()}"
 
+    headers = {"ETag": etag, "Cache-Control": PREVIEW_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
 
-@router.post("/generate-pdf", response_model=GeneratePDFResponse)
-async def generate_pdf_with_selection(request: GeneratePDFRequest):
+    try:
+        preview_path = await asyncio.to_thread(get_preview, manifest, index)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Preview image not found")
+
+    return FileResponse(preview_path, media_type=media_type, headers=headers)
+
+
+# Jobs whose PDF is being generated (one generation per job at a time)
+_generating_jobs = set()
+
+# How often a streamed PDF is checked for newly written bytes
+STREAM_POLL_INTERVAL = 0.05
+
+
+async def _start_pdf_generation(request: GeneratePDFRequest):
     """
-    Generate final PDF with user-selected pages.
+    Validate a page selection and start generating its PDF in the job executor.
 
     Args:
         request: Contains job_id and selected page indices
 
     Returns:
-        PDF generation result with download URL
+        Tuple of (generation task, PDF path, page count)
     """
-    import pickle
-    from pathlib import Path
-    from src.file_manager import FileManager
-    from config.config import get_config
+    job_id = request.job_id
+    selected_indices = request.selected_page_indices
+
+    logger.info(f"Generating PDF for job {job_id} with {len(selected_indices)} selected pages")
+
+    # Load the job's page manifest
+    base_dir = Path(__file__).parent.parent.parent
+    cache_dir = base_dir / "output" / "temp" / f"job_{job_id}"
 
     try:
-        job_id = request.job_id
-        selected_indices = request.selected_page_indices
-
-        logger.info(f"Generating PDF for job {job_id} with {len(selected_indices)} selected pages")
-
-        # Load cached pages
-        base_dir = Path(__file__).parent.parent.parent
-        cache_dir = base_dir / "output" / "temp" / f"job_{job_id}"
-        pages_cache_path = cache_dir / "pages.pkl"
-
-        if not pages_cache_path.exists():
-            raise HTTPException(status_code=404, detail="Job cache not found. Please re-process the PDF.")
-
-        with open(pages_cache_path, 'rb') as f:
-            all_pages = pickle.load(f)
-
-        # Select only the pages user chose
-        selected_pages = [all_pages[i] for i in selected_indices if i < len(all_pages)]
-
-        if not selected_pages:
-            raise HTTPException(status_code=400, detail="No valid pages selected")
-
-        # Generate PDF
-        config = get_config()
-        output_dir = base_dir / "output"
-        file_manager = FileManager(str(output_dir), **config["file_management"])
-
-        # Get original filename from job manager
-        job_status = job_manager.get_job(job_id)
-        if not job_status:
-            original_filename = "processed"
-        else:
-            import re
-            original_filename = re.sub(r'\.pdf$', '', job_status.get('filename', 'processed'))
-
-        metadata = {
-            "original_page_indices": selected_indices,
-            "total_pages_selected": len(selected_pages),
-            "user_selected": True,
-            "processing_mode": "user_selection",
-        }
+        manifest = await asyncio.to_thread(read_selection_manifest, cache_dir)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404, detail="Job cache not found. Please re-process the PDF."
+        )
+
+    if not Path(manifest["source"]).exists():
+        raise HTTPException(status_code=404, detail="Source PDF not found. Please upload it again.")
+
+    # Only the pages the user chose are rendered from the source PDF
+    page_indices = selected_page_indices(manifest, selected_indices)
+    if not page_indices:
+        raise HTTPException(status_code=400, detail="No valid pages selected")
+
+    if job_id in _generating_jobs:
+        raise HTTPException(status_code=409, detail="A PDF is already being generated for this job")
+    if job_executor.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many jobs are waiting to be processed. Please try again later.",
+        )
+
+    # Get original filename from job manager
+    job_status = await job_manager.get_job(job_id)
+    if not job_status:
+        original_filename = "processed"
+    else:
+        original_filename = re.sub(r'\.pdf$', '', job_status.get('filename', 'processed'))
+
+    config = get_config()
+    output_dir = base_dir / "output"
+    file_manager = FileManager(str(output_dir), **config["file_management"])
+    filename = file_manager.report_filename(1, original_filename)
+
+    metadata = {
+        "original_page_indices": selected_indices,
+        "total_pages_selected": len(page_indices),
+        "user_selected": True,
+        "processing_mode": "user_selection",
+    }
+
+    async def generate():
+        try:
+            saved = await generate_pdf_async(
+                job_id, manifest, page_indices, str(output_dir), filename, metadata
+            )
+            # Clean up temp files
+            await asyncio.to_thread(shutil.rmtree, cache_dir, True)
+            return saved
+        finally:
+            _generating_jobs.discard(job_id)
+            job_executor.clear_cancelled(job_id)
 
-        saved = file_manager.save_report(selected_pages, 1, metadata, original_filename)
+    _generating_jobs.add(job_id)
+    task = asyncio.create_task(generate())
+    return task, output_dir / f"{filename}.pdf", len(page_indices)
 
-        if "pdf" not in saved:
-            raise HTTPException(status_code=500, detail="Failed to generate PDF")
 
-        pdf_path = Path(saved["pdf"])
-        file_size_mb = pdf_path.stat().st_size / (1024 * 1024)
+@router.post("/generate-pdf", response_model=GeneratePDFResponse)
+async def generate_pdf_with_selection(request: GeneratePDFRequest):
+    """
+    Generate final PDF with user-selected pages.
+
+    The PDF is built in the job executor; progress is sent over the job's
+    WebSocket.
+
+    Args:
+        request: Contains job_id and selected page indices
 
-        # Clean up temp files
-        import shutil
-        if cache_dir.exists():
-            shutil.rmtree(cache_dir, ignore_errors=True)
+    Returns:
+        PDF generation result with download URL
+    """
+    try:
+        task, pdf_path, page_count = await _start_pdf_generation(request)
+        await task
 
         return GeneratePDFResponse(
             success=True,
             filename=pdf_path.name,
             download_url=f"/api/download/{pdf_path.name}",
-            page_count=len(selected_pages),
-            message=f"PDF generated successfully with {len(selected_pages)} pages"
+            page_count=page_count,
+            message=f"PDF generated successfully with {page_count} pages"
         )
 
     except HTTPException:
         raise
+    except JobCancelledError:
+        raise HTTPException(status_code=409, detail="PDF generation was cancelled")
     except Exception as e:
         logger.error(f"Error generating PDF: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+
+
+@router.post("/generate-pdf/stream")
+async def stream_pdf_with_selection(request: GeneratePDFRequest):
+    """
+    Generate final PDF with user-selected pages, streaming it as it is written.
+
+    The response starts as soon as the first page is rendered. The PDF is
+    also kept in the output directory, so it can be downloaded again from
+    the URL in the X-Download-Url header.
+
+    Args:
+        request: Contains job_id and selected page indices
+
+    Returns:
+        Streaming PDF response
+    """
+    task, pdf_path, page_count = await _start_pdf_generation(request)
+
+    return StreamingResponse(
+        _tail_file(pdf_path, task),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{pdf_path.name}"',
+            "X-Download-Url": f"/api/download/{pdf_path.name}",
+            "X-Page-Count": str(page_count),
+        },
+    )
+
+
+async def _tail_file(path: Path, writer: asyncio.Task):
+    """
+    Yield the contents of a file while another task is still writing it.
+
+    Args:
+        path: File being written
+        writer: Task writing the file; the file is complete once it is done
+
+    Yields:
+        Chunks of the file
+    """
+    def failed() -> bool:
+        # The response has already started, so a failure can only end it early
+        if writer.exception() is not None:
+            logger.error(f"PDF generation failed while streaming {path.name}: {writer.exception()}")
+            return True
+        return False
+
+    while not path.exists():
+        if writer.done():
+            failed()
+            return
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            chunk = await f.read(UPLOAD_CHUNK_SIZE)
+            if chunk:
+                yield chunk
+                continue
+            if writer.done():
+                if failed():
+                    return
+                # Read whatever was written between the last read and completion
+                while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+                    yield chunk
+                return
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
@@ -0,0 +1,291 @@
+"""
+Crash-safe job checkpoints.
+
+Each running job has a checkpoint directory recording how it was started
+(job.json), the metrics and packed hashes of every page batch analysed so far
+(one .npz file per batch, written atomically as the batch completes), and
+finally the job's result. If the server stops mid-job, the next start finds
+the checkpoint and resumes the job: completed batches are loaded instead of
+being rendered and analysed again, and a job that had already written its
+output returns the stored result.
+
+The uvicorn worker running a job holds an exclusive lock on its checkpoint,
+so a job still running on another worker is never resumed twice. The lock is
+released by the operating system when the worker dies.
+"""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from config.config import CHECKPOINT_CONFIG
+from src.feature_cache import METRIC_FIELDS, arrays_to_metrics, metrics_to_arrays
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process claims (single worker)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class JobClaimedError(Exception):
+    """Raised when a job's checkpoint is held by another live worker."""
+
+
+class PageBatch(NamedTuple):
+    """Stored analysis of one batch of consecutive pages."""
+    metrics: List[dict]  # compute_metrics output, one per page
+    packed_hashes: Optional[np.ndarray]  # pack_hashes output, one row per page
+
+
+class JobCheckpoint:
+    """
+    Checkpoint directory of one job.
+
+    Batches and the result are written from the job executor's worker
+    process; claiming and clearing happen in the uvicorn worker.
+    """
+
+    JOB_FILE = "job.json"
+    RESULT_FILE = "result.json"
+    LOCK_FILE = "lock"
+
+    def __init__(self, path: str):
+        """
+        Initialize the checkpoint. Nothing is written until it is used.
+
+        Args:
+            path: Checkpoint directory
+        """
+        self.path = Path(path)
+        self._lock_fd: Optional[int] = None
+
+    def claim(self) -> bool:
+        """
+        Take the exclusive lock on this checkpoint (never waits).
+
+        Returns:
+            True if this process now holds the lock, False if another live
+            process does
+        """
+        if self._lock_fd is not None:
+            return True
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path / self.LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._lock_fd = fd
+        return True
+
+    def release(self):
+        """Release the lock taken by claim()."""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def clear(self):
+        """
+        Remove the checkpoint (the job has ended) and release the lock.
+
+        The contents are removed while the lock is still held, so no other
+        worker claims a half-removed checkpoint; the lock file goes last.
+        """
+        lock_path = self.path / self.LOCK_FILE
+        try:
+            entries = list(self.path.iterdir())
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if entry == lock_path:
+                continue
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+        lock_path.unlink(missing_ok=True)
+        try:
+            self.path.rmdir()
+        except OSError:
+            pass  # Already gone, or claimed again since the lock file was removed
+        self.release()
+
+    def write_job(self, job: Dict):
+        """
+        Record how the job was started.
+
+        Args:
+            job: JSON-serialisable job arguments
+        """
+        self._write_atomic(self.path / self.JOB_FILE, json.dumps(job, default=str).encode("utf-8"))
+
+    def read_job(self) -> Optional[Dict]:
+        """
+        Read how the job was started.
+
+        Returns:
+            Job arguments, or None if not recorded
+        """
+        try:
+            return json.loads((self.path / self.JOB_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_batch(self, key: str, start: int, batch: PageBatch):
+        """
+        Store the analysis of a completed page batch.
+
+        Args:
+            key: Feature key of the job's settings (see src.feature_cache.feature_key);
+                batches stored under another key are never loaded
+            start: Index of the batch's first page
+            batch: Metrics and packed hashes of the batch's pages
+        """
+        arrays = metrics_to_arrays(batch.metrics)
+        if batch.packed_hashes is not None:
+            arrays["packed_hashes"] = batch.packed_hashes
+
+        path = self._batch_dir(key) / f"batch_{start:07d}.npz"
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.npz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load_batches(self, key: str) -> Dict[int, PageBatch]:
+        """
+        Load every stored page batch.
+
+        Args:
+            key: Feature key of the job's settings
+
+        Returns:
+            Dictionary mapping a batch's first page index to its analysis
+        """
+        batches = {}
+        for path in sorted(self._batch_dir(key).glob("batch_*.npz")):
+            try:
+                with np.load(path) as data:
+                    columns = {field: data[field] for field in METRIC_FIELDS}
+                    packed = data["packed_hashes"] if "packed_hashes" in data.files else None
+            except (OSError, KeyError, ValueError):
+                continue  # Unreadable batch: analysed again
+            start = int(path.stem.split("_")[1])
+            batches[start] = PageBatch(arrays_to_metrics(columns), packed)
+        return batches
+
+    def save_result(self, result: Dict):
+        """
+        Store the job's result once its output has been written.
+
+        Args:
+            result: ProcessingResult as a dictionary
+        """
+        data = json.dumps(result, default=str).encode("utf-8")
+        self._write_atomic(self.path / self.RESULT_FILE, data)
+
+    def load_result(self) -> Optional[Dict]:
+        """
+        Load the job's stored result.
+
+        Returns:
+            ProcessingResult dictionary, or None if the job had not finished
+        """
+        try:
+            return json.loads((self.path / self.RESULT_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _batch_dir(self, key: str) -> Path:
+        return self.path / f"features_{key[:16]}"
+
+    def _write_atomic(self, path: Path, data: bytes):
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
+class CheckpointStore:
+    """
+    Directory of job checkpoints (one subdirectory per job).
+    """
+
+    def __init__(self, path: str, enabled: bool = True):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            path: Checkpoint directory
+            enabled: Whether jobs are checkpointed and resumed
+        """
+        self.path = Path(path)
+        self.enabled = enabled
+        self._claimed: Dict[str, JobCheckpoint] = {}
+
+    def job(self, job_id: str) -> JobCheckpoint:
+        """
+        Get a job's checkpoint (the one claimed by this process, if any).
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            JobCheckpoint
+        """
+        return self._claimed.get(job_id) or JobCheckpoint(str(self.path / job_id))
+
+    def claim(self, job_id: str) -> Optional[JobCheckpoint]:
+        """
+        Claim a job's checkpoint for this process.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The claimed checkpoint, or None if another live process holds it
+        """
+        checkpoint = self.job(job_id)
+        if not checkpoint.claim():
+            return None
+        self._claimed[job_id] = checkpoint
+        return checkpoint
+
+    def release(self, job_id: str, clear: bool = True):
+        """
+        Give up a claimed checkpoint.
+
+        Args:
+            job_id: Job identifier
+            clear: Remove the checkpoint (the job has ended); False keeps it
+                so the job resumes on the next start
+        """
+        checkpoint = self._claimed.pop(job_id, None) or self.job(job_id)
+        if clear:
+            checkpoint.clear()
+        else:
+            checkpoint.release()
+
+    def job_ids(self) -> List[str]:
+        """
+        List the jobs that have a checkpoint.
+
+        Returns:
+            Job identifiers
+        """
+        if not self.path.is_dir():
+            return []
+        return sorted(path.name for path in self.path.iterdir() if path.is_dir())
+
+
+# Global checkpoint store
+checkpoint_store = CheckpointStore(**CHECKPOINT_CONFIG)
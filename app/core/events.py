@@ -0,0 +1,194 @@
+"""
+Multiplexed job event streams.
+
+One JobEventStream serves one client connection (WebSocket or Server-Sent
+Events) for any number of jobs: a set of job IDs, all jobs created by the
+client, or both. It starts with the current state of the followed jobs
+(only the active ones of the client), then delivers progress, completion and
+failure events.
+
+Events published on this worker arrive through the progress bus. Jobs
+processed by other uvicorn workers are picked up by polling the shared job
+store for rows changed since the last poll.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.api.models import ProcessingProgress, ProcessingStatus
+from app.core.progress_bus import FINAL_STATUSES
+from app.core.tasks import JobManager
+
+logger = logging.getLogger(__name__)
+
+# Jobs of a client included in the initial snapshot of a client stream
+ACTIVE_STATUSES = (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
+
+# How far each store poll reaches back before the previous one: a row is
+# stamped before it is committed, so a write still in flight during a poll may
+# carry an earlier updated_at. Rows seen twice are dropped as unchanged state.
+POLL_OVERLAP = timedelta(seconds=5)
+
+
+def job_event(job: Dict) -> ProcessingProgress:
+    """
+    Build an event from a job (or partial job) dictionary.
+
+    Args:
+        job: Job dictionary with at least the JobStore.list_updated_after fields
+
+    Returns:
+        Progress event
+    """
+    return ProcessingProgress(
+        job_id=job["job_id"],
+        status=job["status"],
+        progress=job["progress"],
+        current_step=job["current_step"] or "",
+        message=job.get("error"),
+        generation=job.get("generation"),
+    )
+
+
+class JobEventStream:
+    """
+    Events of a set of jobs, or of all jobs of a client, for one connection.
+    """
+
+    def __init__(
+        self,
+        manager: JobManager,
+        job_ids: Optional[Iterable[str]] = None,
+        client_id: Optional[str] = None,
+        poll_interval: float = 2.0,
+    ):
+        """
+        Initialize the stream. Nothing is delivered until it is iterated.
+
+        Args:
+            manager: Job manager (for its store and progress bus)
+            job_ids: Jobs to follow
+            client_id: Follow every job created by this client (None to only
+                follow job_ids)
+            poll_interval: Seconds between job store polls
+        """
+        self.manager = manager
+        self.job_ids: Set[str] = set(job_ids or ())
+        self.client_id = client_id
+        self.poll_interval = poll_interval
+
+        # All jobs of a client cannot be listed up front, so take every local
+        # event and filter by owner
+        bus_jobs = None if client_id is not None else self.job_ids
+        self._subscription = manager.progress_bus.subscribe(bus_jobs)
+        self._owners: Dict[str, Optional[str]] = {}
+        self._last_sent: Dict[str, Tuple] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def add_jobs(self, job_ids: Iterable[str]):
+        """
+        Follow more jobs; their current state is sent first.
+
+        Args:
+            job_ids: Jobs to add
+        """
+        new = set(job_ids) - self.job_ids
+        if not new:
+            return
+        self.job_ids |= new
+        self.manager.progress_bus.add_jobs(self._subscription, new)
+        await self._offer_snapshot(new)
+
+    def remove_jobs(self, job_ids: Iterable[str]):
+        """
+        Stop following jobs (jobs of the followed client are still delivered).
+
+        Args:
+            job_ids: Jobs to remove
+        """
+        for job_id in job_ids:
+            self.job_ids.discard(job_id)
+            self._last_sent.pop(job_id, None)
+
+    def close(self):
+        """Stop polling and release the bus subscription."""
+        if self._poller is not None:
+            self._poller.cancel()
+        self.manager.progress_bus.unsubscribe(self._subscription)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ProcessingProgress:
+        if self._poller is None:
+            # The first event is the snapshot, then polling starts
+            started_at = datetime.now()
+            await self._offer_snapshot(self.job_ids, include_client_jobs=True)
+            self._poller = asyncio.create_task(self._poll(started_at))
+        while True:
+            update = await self._subscription.get()
+            if update is None:
+                raise StopAsyncIteration
+            wanted = await self._wants(update.job_id)
+            if update.status in FINAL_STATUSES:
+                # A finished job sends no more events; forget its owner
+                self._owners.pop(update.job_id, None)
+            if not wanted:
+                continue
+
+            # The same state may arrive from the bus and from the store
+            state = (update.status, update.progress, update.current_step, update.generation)
+            if self._last_sent.get(update.job_id) == state:
+                continue
+            self._last_sent[update.job_id] = state
+            return update
+
+    async def _wants(self, job_id: str) -> bool:
+        if job_id in self.job_ids:
+            return True
+        if self.client_id is None:
+            return False
+        if job_id not in self._owners:
+            job = await asyncio.to_thread(self.manager.store.get, job_id, ["client_id"])
+            self._owners[job_id] = job.get("client_id") if job else None
+        return self._owners[job_id] == self.client_id
+
+    async def _offer_snapshot(self, job_ids: Iterable[str], include_client_jobs: bool = False):
+        """Queue the current state of jobs (and of the client's active jobs)."""
+        store = self.manager.store
+        job_ids = list(job_ids)
+        jobs = await asyncio.to_thread(store.list_updated_after, datetime.min, job_ids)
+        if include_client_jobs and self.client_id is not None:
+            jobs += await asyncio.to_thread(
+                store.list_updated_after, datetime.min, None, self.client_id, ACTIVE_STATUSES
+            )
+        for job in jobs:
+            if job is not None:
+                self._owners.setdefault(job["job_id"], job.get("client_id"))
+                self._subscription.offer(job_event(job))
+
+    async def _poll(self, since: datetime):
+        """Feed changes made by other workers since a time into the subscription."""
+        store = self.manager.store
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            polled_at = datetime.now()
+            try:
+                changed = []
+                if self.client_id is not None:
+                    changed = await asyncio.to_thread(
+                        store.list_updated_after, since, None, self.client_id
+                    )
+                if self.job_ids:
+                    changed += await asyncio.to_thread(
+                        store.list_updated_after, since, list(self.job_ids)
+                    )
+            except Exception as e:
+                logger.warning(f"Could not poll job events: {e}")
+                continue
+            since = polled_at - POLL_OVERLAP
+            for job in changed:
+                self._owners.setdefault(job["job_id"], job.get("client_id"))
+                self._subscription.offer(job_event(job))
@@ -0,0 +1,622 @@
+"""
+Job execution subsystem for CPU-bound processing.
+
+Processing jobs run in a dedicated process pool, so rendering and image
+analysis no longer compete with the event loop for the GIL. The number of
+jobs running at once is capped, the number of jobs waiting for a slot is
+bounded, and progress reported inside worker processes is relayed back to
+the job manager through a multiprocessing queue.
+
+Jobs are scheduled in two lanes, classified by page count at submit time:
+
+- fast lane: small jobs, always dispatched first, with reserved slots
+- bulk lane: large jobs, round-robin between clients (fair share), capped so
+  the fast lane always has capacity
+
+When small jobs are waiting and every slot is busy, a running bulk job is
+asked to park at its next page-batch boundary, handing its slot to the
+small job; it resumes as soon as a slot frees up again.
+
+Jobs are also admitted against a memory budget: each job states its
+estimated peak memory when it asks for a slot, and is only started once that
+much of the budget is free (a job larger than the whole budget runs alone).
+Running and parked jobs hold their reservation until they finish. Each
+uvicorn worker has its own executor, so the host budget is split evenly
+between the workers (see worker_memory_limit_mb).
+
+Jobs are cancelled cooperatively: cancel() drops a flag file that the job
+function checks after every page, so a cancelled job stops within one page's
+processing time. Flag files are seen by the worker processes and by every
+uvicorn worker, whichever one received the cancellation.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional
+
+from app.core.tasks import job_manager
+from config.config import PERFORMANCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Progress queue inherited by worker processes (set by the pool initializer)
+_worker_progress_queue = None
+
+
+class JobQueueFullError(Exception):
+    """Raised when no more jobs can be queued for execution."""
+
+
+class JobCancelledError(Exception):
+    """Raised when a job is cancelled, while waiting for a slot or while running."""
+
+
+def _cancel_check(job_id: str, flag_path: str) -> Callable[[], None]:
+    """
+    Build the check_cancelled() hook of a job.
+
+    Args:
+        job_id: Job identifier
+        flag_path: Path of the job's cancellation flag file
+
+    Returns:
+        Function raising JobCancelledError once the flag file exists
+    """
+    def check_cancelled():
+        if os.path.exists(flag_path):
+            raise JobCancelledError(f"Job {job_id} was cancelled")
+
+    return check_cancelled
+
+
+def _init_worker(progress_queue):
+    """Process pool initializer: remember the progress relay queue."""
+    global _worker_progress_queue
+    _worker_progress_queue = progress_queue
+
+
+def _run_in_worker(
+    job_id: str,
+    func: Callable,
+    args: tuple,
+    turn=None,
+    cancel_flag: str = None,
+    generation: bool = False,
+):
+    """
+    Run a job function inside a worker process.
+
+    The function receives a progress_callback(progress, step) keyword argument
+    that forwards updates to the parent process (as PDF generation progress
+    if generation is set), a yield_point() keyword argument that parks the
+    job while the scheduler has taken its turn away, and a check_cancelled()
+    keyword argument that raises JobCancelledError once the job is cancelled.
+    """
+    check_cancelled = _cancel_check(job_id, cancel_flag)
+
+    def report_progress(progress: int, step: str):
+        _worker_progress_queue.put(("progress", job_id, progress, step, generation))
+
+    def yield_point():
+        if turn is not None and not turn.is_set():
+            _worker_progress_queue.put(("parked", job_id))
+            turn.wait()
+            check_cancelled()
+
+    return func(
+        *args,
+        progress_callback=report_progress,
+        yield_point=yield_point,
+        check_cancelled=check_cancelled,
+    )
+
+
+class _Ticket:
+    """Scheduling state of one job."""
+
+    def __init__(
+        self, job_id: str, lane: str, client_id: str, page_count: int, memory_mb: float = 0.0
+    ):
+        self.job_id = job_id
+        self.lane = lane
+        self.client_id = client_id
+        self.page_count = page_count
+        self.memory_mb = memory_mb
+        self.state = "waiting"  # waiting, running, parking, parked
+        self.granted: Optional[asyncio.Future] = None
+        self.turn = None  # Event cleared to park a bulk job
+
+
+class JobExecutor:
+    """
+    Runs processing jobs in a process pool with concurrency limits.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_concurrent_jobs: int = 2,
+        max_queued_jobs: int = 20,
+        use_processes: bool = True,
+        small_job_max_pages: int = 50,
+        fast_lane_slots: int = 1,
+        cancel_dir: str = "temp/cancel",
+        memory_limit_mb: int = 0,
+    ):
+        """
+        Initialize the job executor. Pools are started on first use.
+
+        Args:
+            max_workers: Number of worker processes (or threads)
+            max_concurrent_jobs: Maximum number of jobs running at once
+            max_queued_jobs: Maximum number of jobs waiting for a slot
+            use_processes: Use a process pool (True) or a thread pool (False)
+            small_job_max_pages: Jobs with at most this many pages use the fast lane
+            fast_lane_slots: Slots that bulk jobs may not occupy
+            cancel_dir: Directory of cancellation flag files
+            memory_limit_mb: Memory budget shared by this process's running jobs
+                (0 for no limit)
+        """
+        self.max_workers = max_workers
+        self.max_concurrent_jobs = max(1, min(max_concurrent_jobs, max_workers))
+        self.max_queued_jobs = max_queued_jobs
+        self.use_processes = use_processes
+        self.small_job_max_pages = small_job_max_pages
+        self.bulk_slots = max(1, self.max_concurrent_jobs - fast_lane_slots)
+        self.cancel_dir = Path(cancel_dir)
+        self.memory_limit_mb = memory_limit_mb
+
+        self._pool: Optional[Executor] = None
+        self._manager = None
+        self._progress_queue = None
+        self._relay_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Scheduler state (only touched on the event loop thread)
+        self._tickets: Dict[str, _Ticket] = {}
+        self._fast_waiting: Deque[_Ticket] = deque()
+        self._bulk_waiting: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._parked: Deque[_Ticket] = deque()
+
+        logger.info(
+            f"JobExecutor initialized: workers={max_workers}, "
+            f"max_concurrent_jobs={self.max_concurrent_jobs}, bulk_slots={self.bulk_slots}, "
+            f"small_job_max_pages={small_job_max_pages}, "
+            f"max_queued_jobs={max_queued_jobs}, memory_limit_mb={memory_limit_mb}, "
+            f"processes={use_processes}"
+        )
+
+    def _start(self):
+        """Start the pool and the progress relay on the running event loop."""
+        if self._pool is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+
+        if self.use_processes:
+            # spawn avoids forking a process that runs an event loop and threads
+            context = multiprocessing.get_context("spawn")
+            self._progress_queue = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress_queue,),
+            )
+            # Manager events can be passed to pool tasks to park bulk jobs
+            self._manager = context.Manager()
+            self._relay_thread = threading.Thread(
+                target=self._relay_progress, name="job-progress-relay", daemon=True
+            )
+            self._relay_thread.start()
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="job-worker"
+            )
+
+    def _relay_progress(self):
+        """Forward progress updates from worker processes to the job manager."""
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                break
+            if item[0] == "parked":
+                self._loop.call_soon_threadsafe(self._on_parked, item[1])
+            else:
+                _, job_id, progress, step, generation = item
+                self._publish_progress(job_id, progress, step, generation)
+
+    def _publish_progress(self, job_id: str, progress: int, step: str, generation: bool = False):
+        """Schedule a progress update on the event loop (thread-safe)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            logger.debug(f"Progress update: {progress}% - {step}")
+            return
+        update = job_manager.update_generation if generation else job_manager.update_progress
+        try:
+            asyncio.run_coroutine_threadsafe(update(job_id, progress, step), loop)
+        except Exception as e:
+            # If anything fails, just log
+            logger.debug(f"Progress update failed: {e}")
+
+    def is_full(self) -> bool:
+        """Check whether the wait queue is full."""
+        return self._count("waiting") >= self.max_queued_jobs
+
+    def classify(self, page_count: Optional[int]) -> str:
+        """
+        Choose the scheduling lane for a job.
+
+        Args:
+            page_count: Number of pages (None if unknown)
+
+        Returns:
+            "fast" or "bulk"
+        """
+        if page_count is not None and page_count <= self.small_job_max_pages:
+            return "fast"
+        return "bulk"
+
+    def _count(self, *states: str, lane: Optional[str] = None) -> int:
+        return sum(
+            1
+            for ticket in self._tickets.values()
+            if ticket.state in states and (lane is None or ticket.lane == lane)
+        )
+
+    def reserved_memory_mb(self) -> float:
+        """Memory reserved by running and parked jobs, in MB."""
+        return sum(
+            ticket.memory_mb
+            for ticket in self._tickets.values()
+            if ticket.state in ("running", "parking", "parked")
+        )
+
+    def _fits(self, ticket: _Ticket) -> bool:
+        """Check whether a job's memory estimate fits in the free budget."""
+        if self.memory_limit_mb <= 0:
+            return True
+        reserved = self.reserved_memory_mb()
+        # A job larger than the whole budget runs once nothing else holds memory
+        return reserved == 0 or reserved + ticket.memory_mb <= self.memory_limit_mb
+
+    def _grant(self, ticket: _Ticket):
+        ticket.state = "running"
+        if not ticket.granted.done():
+            ticket.granted.set_result(None)
+
+    def _peek_bulk(self) -> _Ticket:
+        """The bulk job _next_bulk would take (the bulk queue must not be empty)."""
+        return next(iter(self._bulk_waiting.values()))[0]
+
+    def _next_bulk(self) -> Optional[_Ticket]:
+        """Take the next bulk job, round-robin between clients."""
+        if not self._bulk_waiting:
+            return None
+        client_id, queue = next(iter(self._bulk_waiting.items()))
+        ticket = queue.popleft()
+        del self._bulk_waiting[client_id]
+        if queue:
+            # Move the client to the back of the rotation
+            self._bulk_waiting[client_id] = queue
+        return ticket
+
+    def _dispatch(self):
+        """Hand free slots to waiting jobs and park bulk jobs if small jobs wait."""
+        while self._count("running", "parking") < self.max_concurrent_jobs:
+            if self._fast_waiting and self._fits(self._fast_waiting[0]):
+                self._grant(self._fast_waiting.popleft())
+            elif self._parked:
+                # Parked jobs still hold their memory reservation
+                ticket = self._parked.popleft()
+                self._grant(ticket)
+                ticket.turn.set()
+                logger.info(f"Resumed bulk job {ticket.job_id}")
+            elif self._fast_waiting:
+                break  # The next small job waits for memory; nothing overtakes it
+            elif (
+                self._bulk_waiting
+                and self._count("running", "parking", lane="bulk") < self.bulk_slots
+                and self._fits(self._peek_bulk())
+            ):
+                self._grant(self._next_bulk())
+            else:
+                break
+
+        # Small jobs still waiting: ask running bulk jobs to park at their next
+        # page batch, as long as a spare worker can take the small job. Parking
+        # frees a slot but no memory, so a small job waiting for memory does not
+        # park anything.
+        parking = [t for t in self._tickets.values() if t.state == "parking"]
+        fast_ready = 0
+        if self._fast_waiting and self._fits(self._fast_waiting[0]):
+            fast_ready = len(self._fast_waiting)
+        if len(parking) < fast_ready:
+            spare_workers = self.max_workers - self._count("running", "parking", "parked")
+            candidates = sorted(
+                (t for t in self._tickets.values() if t.state == "running" and t.turn is not None),
+                key=lambda t: t.page_count,
+                reverse=True,
+            )
+            for ticket in candidates[:min(fast_ready - len(parking), spare_workers)]:
+                ticket.state = "parking"
+                ticket.turn.clear()
+                logger.info(f"Parking bulk job {ticket.job_id} for waiting small jobs")
+        elif not fast_ready:
+            # Nothing is waiting any more: cancel outstanding park requests
+            for ticket in parking:
+                ticket.state = "running"
+                ticket.turn.set()
+
+    def _on_parked(self, job_id: str):
+        """A bulk job reached a batch boundary and released its slot."""
+        ticket = self._tickets.get(job_id)
+        if ticket is None or ticket.state != "parking":
+            return
+        ticket.state = "parked"
+        self._parked.append(ticket)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        job_id: str,
+        page_count: Optional[int] = None,
+        client_id: Optional[str] = None,
+        memory_mb: float = 0.0,
+    ):
+        """
+        Wait for a free execution slot in the job's lane and for enough free memory.
+
+        Args:
+            job_id: Job identifier
+            page_count: Number of pages, used to pick the lane
+            client_id: Client identifier for fair share between bulk jobs
+            memory_mb: Estimated peak memory of the job, reserved while it runs
+
+        Raises:
+            JobQueueFullError: If too many jobs are already waiting
+        """
+        self._start()
+
+        if self.is_full():
+            raise JobQueueFullError(
+                f"Job queue is full ({self.max_queued_jobs} jobs waiting)"
+            )
+
+        ticket = _Ticket(
+            job_id, self.classify(page_count), client_id or "anonymous", page_count or 0, memory_mb
+        )
+        ticket.granted = self._loop.create_future()
+        if ticket.lane == "bulk":
+            ticket.turn = self._manager.Event() if self.use_processes else threading.Event()
+            ticket.turn.set()
+            self._bulk_waiting.setdefault(ticket.client_id, deque()).append(ticket)
+        else:
+            self._fast_waiting.append(ticket)
+        self._tickets[job_id] = ticket
+
+        logger.info(
+            f"Job {job_id} queued in {ticket.lane} lane ({page_count} pages, ~{memory_mb:.0f} MB)"
+        )
+
+        try:
+            self._dispatch()
+            if ticket.state == "waiting" and not self._fits(ticket):
+                logger.info(
+                    f"Job {job_id} waits for memory: {self.reserved_memory_mb():.0f} of "
+                    f"{self.memory_limit_mb} MB reserved"
+                )
+            await ticket.granted
+            yield
+        finally:
+            self._tickets.pop(job_id, None)
+            self._unqueue(ticket)
+            self._dispatch()
+
+    def _unqueue(self, ticket: _Ticket):
+        """Remove a ticket from the wait and parked queues."""
+        if ticket in self._fast_waiting:
+            self._fast_waiting.remove(ticket)
+        queue = self._bulk_waiting.get(ticket.client_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._bulk_waiting[ticket.client_id]
+        if ticket in self._parked:
+            self._parked.remove(ticket)
+
+    def _cancel_flag(self, job_id: str) -> Path:
+        return self.cancel_dir / job_id
+
+    def cancel(self, job_id: str):
+        """
+        Cancel a job.
+
+        A job waiting for a slot leaves the queue at once (its slot() raises
+        JobCancelledError). A running job stops at its next page, and a
+        parked job is woken up to stop.
+
+        Args:
+            job_id: Job identifier
+        """
+        flag = self._cancel_flag(job_id)
+        flag.parent.mkdir(parents=True, exist_ok=True)
+        flag.touch()
+
+        ticket = self._tickets.get(job_id)
+        if ticket is None:
+            return  # Not known here: running on another worker, or not started yet
+
+        if ticket.state == "waiting":
+            self._unqueue(ticket)
+            if not ticket.granted.done():
+                ticket.granted.set_exception(JobCancelledError(f"Job {job_id} was cancelled"))
+        elif ticket.state in ("parking", "parked"):
+            self._unqueue(ticket)
+            ticket.state = "running"
+            ticket.turn.set()
+        logger.info(f"Cancelling job {job_id} ({ticket.state})")
+
+    def is_cancelled(self, job_id: str) -> bool:
+        """Check whether a job has been cancelled."""
+        return self._cancel_flag(job_id).exists()
+
+    def clear_cancelled(self, job_id: str):
+        """
+        Remove a job's cancellation flag once the job has stopped.
+
+        Args:
+            job_id: Job identifier
+        """
+        self._cancel_flag(job_id).unlink(missing_ok=True)
+
+    async def run(self, job_id: str, func: Callable, *args, generation: bool = False):
+        """
+        Run a job function in the pool.
+
+        The function must accept a progress_callback(progress, step) keyword
+        argument, whose updates are forwarded to job_manager.update_progress
+        (job_manager.update_generation if generation is set), a yield_point()
+        keyword argument, to be called between page batches, and a
+        check_cancelled() keyword argument, to be called after every page; it
+        raises JobCancelledError once the job is cancelled.
+
+        Args:
+            job_id: Job identifier (must hold a slot)
+            func: Picklable (module-level) job function
+            *args: Positional arguments for the function
+            generation: Report progress as the job's PDF generation progress
+
+        Returns:
+            The function's return value
+
+        Raises:
+            JobCancelledError: If the job is cancelled
+        """
+        self._start()
+        ticket = self._tickets.get(job_id)
+        turn = ticket.turn if ticket else None
+        cancel_flag = str(self._cancel_flag(job_id))
+        check_cancelled = _cancel_check(job_id, cancel_flag)
+
+        # Cancelled (possibly on another worker) while waiting for the slot
+        check_cancelled()
+
+        if self.use_processes:
+            return await self._loop.run_in_executor(
+                self._pool, _run_in_worker, job_id, func, args, turn, cancel_flag, generation
+            )
+
+        def report_progress(progress: int, step: str):
+            self._publish_progress(job_id, progress, step, generation)
+
+        def yield_point():
+            if turn is not None and not turn.is_set():
+                self._loop.call_soon_threadsafe(self._on_parked, job_id)
+                turn.wait()
+                check_cancelled()
+
+        return await self._loop.run_in_executor(
+            self._pool,
+            lambda: func(
+                *args,
+                progress_callback=report_progress,
+                yield_point=yield_point,
+                check_cancelled=check_cancelled,
+            ),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Get current executor load."""
+        return {
+            "running_jobs": self._count("running", "parking"),
+            "queued_jobs": self._count("waiting"),
+            "parked_jobs": self._count("parked"),
+            "fast_lane_running": self._count("running", "parking", lane="fast"),
+            "bulk_lane_running": self._count("running", "parking", lane="bulk"),
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "max_queued_jobs": self.max_queued_jobs,
+        }
+
+    def memory_status(self) -> Dict:
+        """
+        Get the memory budget and the jobs holding or waiting for a reservation.
+
+        Returns:
+            Dictionary with limit_mb, reserved_mb, available_mb (None without
+            a limit) and reservations, one per known job with job_id,
+            memory_mb and state
+        """
+        reserved = self.reserved_memory_mb()
+        available = None
+        if self.memory_limit_mb > 0:
+            available = round(max(self.memory_limit_mb - reserved, 0), 1)
+        return {
+            "limit_mb": self.memory_limit_mb,
+            "reserved_mb": round(reserved, 1),
+            "available_mb": available,
+            "reservations": [
+                {"job_id": t.job_id, "memory_mb": round(t.memory_mb, 1), "state": t.state}
+                for t in self._tickets.values()
+            ],
+        }
+
+    def shutdown(self):
+        """Stop the pool and the progress relay."""
+        if self._pool is None:
+            return
+
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._relay_thread.join(timeout=5)
+            self._progress_queue = None
+            self._relay_thread = None
+
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+        self._loop = None
+
+
+def worker_memory_limit_mb(memory_limit_mb: int, web_workers: int) -> int:
+    """
+    Get one uvicorn worker's share of the host memory budget.
+
+    Each worker has its own executor, so the workers together stay within
+    the budget only if each admits jobs against its share.
+
+    Args:
+        memory_limit_mb: Host memory budget (0 for no limit)
+        web_workers: Number of uvicorn workers
+
+    Returns:
+        Memory budget of one worker in MB (0 for no limit)
+    """
+    return memory_limit_mb // max(1, web_workers)
+
+
+# Global job executor instance
+job_executor = JobExecutor(
+    max_workers=PERFORMANCE_CONFIG["max_workers"],
+    max_concurrent_jobs=PERFORMANCE_CONFIG["max_concurrent_jobs"],
+    max_queued_jobs=PERFORMANCE_CONFIG["max_queued_jobs"],
+    use_processes=PERFORMANCE_CONFIG["executor"] == "process",
+    small_job_max_pages=PERFORMANCE_CONFIG["small_job_max_pages"],
+    fast_lane_slots=PERFORMANCE_CONFIG["fast_lane_slots"],
+    cancel_dir=PERFORMANCE_CONFIG["cancel_dir"],
+    memory_limit_mb=worker_memory_limit_mb(
+        PERFORMANCE_CONFIG["memory_limit_mb"], PERFORMANCE_CONFIG["web_workers"]
+    ),
+)
@@ -0,0 +1,434 @@
+"""
+Job store backends for the job manager.
+
+Jobs live in a store so that every uvicorn worker sees the same jobs:
+
+- SQLiteJobStore: durable, shared between worker processes (WAL mode), the default
+- InMemoryJobStore: per-process dictionary, used for tests
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, List, Any, Iterable
+
+from app.api.models import ProcessingStatus, ProcessingResult
+
+logger = logging.getLogger(__name__)
+
+# Fields returned by JobStore.list_updated_after
+PROGRESS_FIELDS = (
+    "job_id", "client_id", "status", "progress", "current_step", "error", "generation",
+    "updated_at",
+)
+
+
+class JobStore(ABC):
+    """Interface for job store backends. Jobs are plain dictionaries."""
+
+    @abstractmethod
+    def create(self, job: Dict[str, Any]) -> None:
+        """
+        Insert a new job.
+
+        Args:
+            job: Job dictionary (must contain job_id)
+        """
+
+    @abstractmethod
+    def get(self, job_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+
+        Args:
+            job_id: Job identifier
+            fields: Only return these fields (None for the whole job); leaving
+                out result avoids decoding it
+
+        Returns:
+            Job dictionary or None if not found
+        """
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> bool:
+        """
+        Update fields of a job.
+
+        Args:
+            job_id: Job identifier
+            **fields: Fields to update
+
+        Returns:
+            True if the job exists
+        """
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        """
+        Delete a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if deleted, False if not found
+        """
+
+    @abstractmethod
+    def list(
+        self,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        List jobs, newest first.
+
+        Args:
+            statuses: Only return jobs with one of these statuses
+            limit: Maximum number of jobs to return
+            offset: Number of jobs to skip
+
+        Returns:
+            List of job dictionaries
+        """
+
+    @abstractmethod
+    def count(self, statuses: Optional[Iterable[ProcessingStatus]] = None) -> int:
+        """
+        Count jobs.
+
+        Args:
+            statuses: Only count jobs with one of these statuses
+
+        Returns:
+            Number of jobs
+        """
+
+    @abstractmethod
+    def find_updated_before(
+        self, statuses: Iterable[ProcessingStatus], before: datetime
+    ) -> List[str]:
+        """
+        Find jobs in the given statuses that were last updated before a time.
+
+        Args:
+            statuses: Job statuses to match
+            before: Cut-off timestamp
+
+        Returns:
+            List of job IDs
+        """
+
+    @abstractmethod
+    def list_updated_after(
+        self,
+        after: datetime,
+        job_ids: Optional[Iterable[str]] = None,
+        client_id: Optional[str] = None,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List the progress fields of jobs updated after a time.
+
+        Only job_id, client_id, status, progress, current_step, error,
+        generation and updated_at are returned (no result), so this is cheap to call often.
+
+        Args:
+            after: Cut-off timestamp
+            job_ids: Only return these jobs
+            client_id: Only return jobs created by this client
+            statuses: Only return jobs with one of these statuses
+
+        Returns:
+            List of partial job dictionaries
+        """
+
+
+class InMemoryJobStore(JobStore):
+    """Per-process dictionary store. Not shared between workers."""
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, job: Dict[str, Any]) -> None:
+        self.jobs[job["job_id"]] = dict(job)
+
+    def get(self, job_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if fields is not None:
+            return {field: job.get(field) for field in fields}
+        return dict(job)
+
+    def update(self, job_id: str, **fields) -> bool:
+        if job_id not in self.jobs:
+            return False
+        self.jobs[job_id].update(fields)
+        return True
+
+    def delete(self, job_id: str) -> bool:
+        return self.jobs.pop(job_id, None) is not None
+
+    def _filtered(self, statuses: Optional[Iterable[ProcessingStatus]]) -> List[Dict[str, Any]]:
+        jobs = self.jobs.values()
+        if statuses is not None:
+            statuses = set(statuses)
+            jobs = [job for job in jobs if job["status"] in statuses]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def list(
+        self,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        jobs = self._filtered(statuses)
+        end = None if limit is None else offset + limit
+        return [dict(job) for job in jobs[offset:end]]
+
+    def count(self, statuses: Optional[Iterable[ProcessingStatus]] = None) -> int:
+        return len(self._filtered(statuses))
+
+    def find_updated_before(
+        self, statuses: Iterable[ProcessingStatus], before: datetime
+    ) -> List[str]:
+        return [job["job_id"] for job in self._filtered(statuses) if job["updated_at"] < before]
+
+    def list_updated_after(
+        self,
+        after: datetime,
+        job_ids: Optional[Iterable[str]] = None,
+        client_id: Optional[str] = None,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+    ) -> List[Dict[str, Any]]:
+        job_ids = set(job_ids) if job_ids is not None else None
+        statuses = set(statuses) if statuses is not None else None
+        return [
+            {field: job.get(field) for field in PROGRESS_FIELDS}
+            for job in self.jobs.values()
+            if job["updated_at"] > after
+            and (job_ids is None or job["job_id"] in job_ids)
+            and (client_id is None or job.get("client_id") == client_id)
+            and (statuses is None or job["status"] in statuses)
+        ]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite store in WAL mode, shared by all worker processes on a host.
+
+    Progress updates are single-row UPDATEs of small columns; the result is
+    stored as JSON and only written on completion.
+    """
+
+    # Columns stored as JSON text
+    JSON_FIELDS = ("result", "config", "generation")
+    # Columns stored as ISO timestamps
+    DATETIME_FIELDS = ("created_at", "updated_at")
+
+    def __init__(self, path: str):
+        """
+        Initialize the SQLite job store. The database is opened on first use.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path), check_same_thread=False, isolation_level=None, timeout=30
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    current_step TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    config TEXT,
+                    client_id TEXT,
+                    generation TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs (status, updated_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+                """
+            )
+            # Databases created before jobs had an owner
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "client_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN client_id TEXT")
+            # Databases created before PDF generation had its own progress
+            if "generation" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN generation TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)")
+            self._conn = conn
+            logger.info(f"SQLite job store opened: {self.path}")
+        return self._conn
+
+    def _execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        with self._conn_lock:
+            return self._connection().execute(sql, tuple(params))
+
+    def _encode(self, field: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if field in self.DATETIME_FIELDS:
+            return value.isoformat()
+        if field == "status":
+            return ProcessingStatus(value).value
+        if field == "result":
+            return json.dumps(value.model_dump())
+        if field in self.JSON_FIELDS:
+            return json.dumps(value)
+        return value
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        if "status" in job:
+            job["status"] = ProcessingStatus(job["status"])
+        for field in self.DATETIME_FIELDS:
+            if field in job:
+                job[field] = datetime.fromisoformat(job[field])
+        if "config" in job:
+            job["config"] = json.loads(job["config"]) if job["config"] else {}
+        if job.get("generation"):
+            job["generation"] = json.loads(job["generation"])
+        if job.get("result"):
+            job["result"] = ProcessingResult(**json.loads(job["result"]))
+        return job
+
+    @staticmethod
+    def _status_clause(statuses: Optional[Iterable[ProcessingStatus]]):
+        if statuses is None:
+            return "", []
+        values = [ProcessingStatus(status).value for status in statuses]
+        return f"WHERE status IN ({', '.join('?' * len(values))})", values
+
+    def create(self, job: Dict[str, Any]) -> None:
+        fields = list(job.keys())
+        self._execute(
+            f"INSERT INTO jobs ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+            [self._encode(field, job[field]) for field in fields],
+        )
+
+    def get(self, job_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        columns = "*" if fields is None else ", ".join(fields)
+        row = self._execute(f"SELECT {columns} FROM jobs WHERE job_id = ?", [job_id]).fetchone()
+        return self._decode(row) if row else None
+
+    def update(self, job_id: str, **fields) -> bool:
+        if not fields:
+            return self.get(job_id) is not None
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        cursor = self._execute(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+            [self._encode(field, value) for field, value in fields.items()] + [job_id],
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, job_id: str) -> bool:
+        cursor = self._execute("DELETE FROM jobs WHERE job_id = ?", [job_id])
+        return cursor.rowcount > 0
+
+    def list(
+        self,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        where, params = self._status_clause(statuses)
+        rows = self._execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [-1 if limit is None else limit, offset],
+        ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def count(self, statuses: Optional[Iterable[ProcessingStatus]] = None) -> int:
+        where, params = self._status_clause(statuses)
+        return self._execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+
+    def find_updated_before(
+        self, statuses: Iterable[ProcessingStatus], before: datetime
+    ) -> List[str]:
+        where, params = self._status_clause(statuses)
+        rows = self._execute(
+            f"SELECT job_id FROM jobs {where} AND updated_at < ?",
+            params + [before.isoformat()],
+        ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def list_updated_after(
+        self,
+        after: datetime,
+        job_ids: Optional[Iterable[str]] = None,
+        client_id: Optional[str] = None,
+        statuses: Optional[Iterable[ProcessingStatus]] = None,
+    ) -> List[Dict[str, Any]]:
+        clauses, params = ["updated_at > ?"], [after.isoformat()]
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            if not job_ids:
+                return []
+            clauses.append(f"job_id IN ({', '.join('?' * len(job_ids))})")
+            params += job_ids
+        if client_id is not None:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if statuses is not None:
+            values = [ProcessingStatus(status).value for status in statuses]
+            clauses.append(f"status IN ({', '.join('?' * len(values))})")
+            params += values
+        rows = self._execute(
+            f"SELECT {', '.join(PROGRESS_FIELDS)} FROM jobs WHERE {' AND '.join(clauses)}", params
+        ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_job_store(backend: str = "sqlite", path: Optional[str] = None) -> JobStore:
+    """
+    Create a job store backend.
+
+    Args:
+        backend: Store backend (sqlite, memory)
+        path: Database path for the sqlite backend
+
+    Returns:
+        JobStore instance
+
+    Raises:
+        ValueError: If backend is not supported
+    """
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        if path is None:
+            raise ValueError("The sqlite job store requires a database path")
+        return SQLiteJobStore(path)
+    raise ValueError(f"Unsupported job store backend: {backend}. Choose from ['sqlite', 'memory']")
@@ -0,0 +1,312 @@
+"""
+Page preview thumbnails for the page selection UI.
+
+Thumbnails are rendered on first request straight from the source PDF at
+thumbnail resolution, rather than by the processing job, and kept in a
+size-bounded on-disk LRU cache. They are keyed by the source PDF's digest,
+so reprocessing the same file reuses them.
+
+Thumbnails are also tiled into sprite sheets (sheet_pages per sheet, in
+fixed-size cells), so a selection grid of hundreds of pages loads in a
+handful of requests. The sheets covering the first screenful of a job can be
+rendered ahead of the first request (prewarming).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, features
+
+from config.config import PREVIEW_CONFIG
+from src.pdf_processor import PDFProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewCache:
+    """
+    On-disk LRU cache of page thumbnails (one JPEG per page) and sprite sheets.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size_mb: int = 256,
+        max_width: int = 300,
+        max_height: int = 400,
+        quality: int = 85,
+        prewarm_pages: int = 24,
+        sheet_pages: int = 50,
+        sheet_columns: int = 10,
+        sheet_format: str = "WEBP",
+    ):
+        """
+        Initialize the preview cache.
+
+        Args:
+            path: Cache directory
+            max_size_mb: Maximum total size of cached thumbnails in MB
+            max_width: Maximum thumbnail width in pixels
+            max_height: Maximum thumbnail height in pixels
+            quality: JPEG quality
+            prewarm_pages: Number of leading pages rendered ahead by prewarm
+            sheet_pages: Number of thumbnails per sprite sheet
+            sheet_columns: Number of thumbnail columns in a sprite sheet
+            sheet_format: Sprite sheet image format (WEBP, or JPEG where
+                WebP is not available)
+        """
+        self.cache_dir = Path(path)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.max_size = (max_width, max_height)
+        self.quality = quality
+        self.prewarm_pages = prewarm_pages
+        self.sheet_pages = sheet_pages
+        self.sheet_columns = min(sheet_columns, sheet_pages)
+
+        self.sheet_format = sheet_format.upper()
+        if self.sheet_format == "WEBP" and not features.check("webp"):
+            logger.warning("WebP is not available, writing preview sheets as JPEG")
+            self.sheet_format = "JPEG"
+        self.sheet_extension = "webp" if self.sheet_format == "WEBP" else "jpg"
+
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Measured on first write
+
+    def key(self, manifest: Dict, page_index: int) -> str:
+        """
+        Build the cache key of a source page's thumbnail.
+
+        Args:
+            manifest: Selection manifest
+            page_index: Page index in the source PDF
+
+        Returns:
+            Cache key
+        """
+        source = manifest.get("source_sha256") or manifest["source"]
+        color_space = manifest["render"].get("color_space", "RGB")
+        params = f"{source}:{page_index}:{self.max_size}:{self.quality}:{color_space}"
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+    def sheet_key(self, manifest: Dict, sheet_index: int) -> str:
+        """
+        Build the cache key of a sprite sheet.
+
+        Args:
+            manifest: Selection manifest
+            sheet_index: Sprite sheet number
+
+        Returns:
+            Cache key
+        """
+        pages = self._sheet_pages(manifest, sheet_index)
+        page_keys = ",".join(self.key(manifest, page) for page in pages)
+        params = f"sheet:{page_keys}:{self.sheet_columns}:{self.sheet_format}"
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+    def sheet_count(self, page_count: int) -> int:
+        """Number of sprite sheets needed for a number of selectable pages."""
+        return -(-page_count // self.sheet_pages)
+
+    def sprite_layout(self, page_count: int) -> List[Dict[str, int]]:
+        """
+        Locate every selectable page's thumbnail within the sprite sheets.
+
+        Thumbnails are centred in fixed-size cells, so the layout is known
+        without rendering anything.
+
+        Args:
+            page_count: Number of selectable pages
+
+        Returns:
+            One dict per page with sheet, x, y, width, height, sheet_width
+            and sheet_height (in pixels)
+        """
+        cell_width, cell_height = self.max_size
+        layout = []
+        for idx in range(page_count):
+            sheet, position = divmod(idx, self.sheet_pages)
+            row, column = divmod(position, self.sheet_columns)
+            sheet_size = min(self.sheet_pages, page_count - sheet * self.sheet_pages)
+            layout.append({
+                "sheet": sheet,
+                "x": column * cell_width,
+                "y": row * cell_height,
+                "width": cell_width,
+                "height": cell_height,
+                "sheet_width": min(sheet_size, self.sheet_columns) * cell_width,
+                "sheet_height": -(-sheet_size // self.sheet_columns) * cell_height,
+            })
+        return layout
+
+    def get(self, manifest: Dict, index: int) -> Path:
+        """
+        Get the thumbnail of a selectable page, rendering it if needed.
+
+        Args:
+            manifest: Selection manifest
+            index: Index into the selectable (non-blank) pages
+
+        Returns:
+            Path to the JPEG thumbnail
+
+        Raises:
+            IndexError: If the index is out of range
+            FileNotFoundError: If the thumbnail is not cached and the source PDF is gone
+        """
+        non_blank_indices = manifest["non_blank_indices"]
+        if not 0 <= index < len(non_blank_indices):
+            raise IndexError(f"Page {index} out of range (pages: {len(non_blank_indices)})")
+
+        path = self._path(self.key(manifest, non_blank_indices[index]))
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        self._render(manifest, [index])
+        return path
+
+    def get_sheet(self, manifest: Dict, sheet_index: int) -> Path:
+        """
+        Get a sprite sheet of selectable pages, rendering it if needed.
+
+        Args:
+            manifest: Selection manifest
+            sheet_index: Sprite sheet number
+
+        Returns:
+            Path to the sprite sheet
+
+        Raises:
+            IndexError: If there is no such sheet
+            FileNotFoundError: If the sheet is not cached and the source PDF is gone
+        """
+        sheets = self.sheet_count(len(manifest["non_blank_indices"]))
+        if not 0 <= sheet_index < sheets:
+            raise IndexError(f"Sheet {sheet_index} out of range (sheets: {sheets})")
+
+        path = self._path(self.sheet_key(manifest, sheet_index), self.sheet_extension)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        self._render_sheet(manifest, sheet_index, path)
+        return path
+
+    def prewarm(self, manifest: Dict, count: int = None) -> int:
+        """
+        Render the sprite sheets of the first pages ahead of their first request.
+
+        Args:
+            manifest: Selection manifest
+            count: Number of leading pages (default: prewarm_pages)
+
+        Returns:
+            Number of sheets rendered
+        """
+        count = self.prewarm_pages if count is None else count
+        pages = min(count, len(manifest["non_blank_indices"]))
+        rendered = 0
+        for sheet_index in range(self.sheet_count(pages)):
+            path = self._path(self.sheet_key(manifest, sheet_index), self.sheet_extension)
+            if not path.exists():
+                self._render_sheet(manifest, sheet_index, path)
+                rendered += 1
+        if rendered:
+            logger.debug(f"Prewarmed {rendered} preview sheets")
+        return rendered
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used thumbnails over the size limit.
+
+        Returns:
+            Number of files removed
+        """
+        files = []
+        for path in self.cache_dir.glob("*/*"):
+            if path.suffix not in (".jpg", ".webp"):
+                continue  # Files still being written
+            try:
+                files.append((path.stat(), path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(stat.st_size for stat, _ in files)
+        removed = 0
+        for stat, path in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+
+        with self._lock:
+            self._total_bytes = total
+        return removed
+
+    def _path(self, key: str, extension: str = "jpg") -> Path:
+        return self.cache_dir / key[:2] / f"{key}.{extension}"
+
+    def _sheet_pages(self, manifest: Dict, sheet_index: int) -> List[int]:
+        """Source page indices of the pages on a sprite sheet."""
+        start = sheet_index * self.sheet_pages
+        return manifest["non_blank_indices"][start:start + self.sheet_pages]
+
+    def _render(self, manifest: Dict, indices: List[int]):
+        """Render and store thumbnails of selectable pages (one document open)."""
+        non_blank_indices = manifest["non_blank_indices"]
+        page_indices = [non_blank_indices[i] for i in indices]
+        processor = PDFProcessor(**manifest["render"])
+        thumbnails = processor.render_thumbnails(manifest["source"], page_indices, self.max_size)
+
+        for page_index, thumbnail in zip(page_indices, thumbnails):
+            self._store(thumbnail, self._path(self.key(manifest, page_index)), "JPEG")
+
+    def _render_sheet(self, manifest: Dict, sheet_index: int, path: Path):
+        """Render the thumbnails of a sprite sheet and tile them into cells."""
+        page_indices = self._sheet_pages(manifest, sheet_index)
+        processor = PDFProcessor(**manifest["render"])
+        thumbnails = processor.render_thumbnails(manifest["source"], page_indices, self.max_size)
+
+        cell_width, cell_height = self.max_size
+        layout = self.sprite_layout(len(page_indices))
+        sheet = Image.new("RGB", (layout[0]["sheet_width"], layout[0]["sheet_height"]), "white")
+        for cell, thumbnail in zip(layout, thumbnails):
+            sheet.paste(
+                thumbnail,
+                (
+                    cell["x"] + (cell_width - thumbnail.width) // 2,
+                    cell["y"] + (cell_height - thumbnail.height) // 2,
+                ),
+            )
+        self._store(sheet, path, self.sheet_format)
+
+    def _store(self, image: Image.Image, path: Path, image_format: str):
+        """Write an image atomically and evict old files when over the size limit."""
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        image.save(tmp_path, image_format, quality=self.quality)
+        written = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += written
+            over_limit = self._total_bytes is None or self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+
+# Global preview cache
+preview_cache = PreviewCache(**PREVIEW_CONFIG)
@@ -1,54 +1,94 @@
 """
 Async wrapper for the PDF processing pipeline.
 
-Wraps the synchronous processing pipeline to run in background tasks
-and provide progress updates.
+Wraps the synchronous processing pipeline to run in the job executor's
+process pool and provide progress updates.
 """
 
 import asyncio
+import copy
+import json
 import logging
+import shutil
 from pathlib import Path
-from typing import Dict, Optional
-from datetime import datetime
+from typing import Callable, Dict, List, Optional
 import time
 
+import numpy as np
+
 from config.config import get_config
 from src.pdf_processor import PDFProcessor
 from src.image_analyzer import ImageAnalyzer
 # from src.report_splitter import ReportSplitter  # COMMENTED OUT: Report splitting disabled
 from src.duplicate_detector import DuplicateDetector
+from src.feature_cache import FeatureCache, PageFeatures, feature_key
 from src.file_manager import FileManager
+from src.page_store import PageSequence, PageStore
+from src.page_table import NO_PAGE, PAGE_PENDING, PAGE_RESTORED, PageTable
+from src.pipeline import (
+    AnalyzeStage,
+    BlankFilterStage,
+    DedupeStage,
+    PageItem,
+    Pipeline,
+    PipelineEvent,
+    Stage,
+    WriteStage,
+    render_pages,
+)
 
 from app.core.tasks import job_manager
-from app.api.models import ProcessingResult, ProcessingStatus, ReportInfo, PageInfo
-import base64
-from io import BytesIO
+from app.core.checkpoints import JobCheckpoint, JobClaimedError, PageBatch, checkpoint_store
+from app.core.executor import JobCancelledError, job_executor
+from app.core.previews import preview_cache
+from app.core.result_cache import result_cache
+from app.core.uploads import content_digest
+from app.api.models import ProcessingResult, ProcessingStatus, ReportInfo, PageInfo, PreviewSprite
 
 logger = logging.getLogger(__name__)
 
+# Per-job file describing the selectable pages (see write_selection_manifest)
+SELECTION_MANIFEST = "manifest.json"
+
+# Background tasks started here, referenced so they are not garbage collected
+_background_tasks = set()
+
 
 async def process_pdf_async(
     job_id: str,
     input_path: str,
     output_dir: str,
     config: Optional[Dict] = None,
+    page_count: Optional[int] = None,
+    client_id: Optional[str] = None,
 ) -> ProcessingResult:
     """
     Process a PDF file asynchronously with progress updates.
 
+    A checkpoint of the job is kept while it runs (see app.core.checkpoints)
+    and removed once it ends, unless the server stops first.
+
     Args:
         job_id: Job identifier for progress tracking
         input_path: Path to input PDF file
         output_dir: Path to output directory
         config: Optional custom configuration
+        page_count: Number of pages, used to schedule the job
+        client_id: Client identifier for fair share between large jobs
 
     Returns:
         ProcessingResult with complete processing information
+
+    Raises:
+        JobCancelledError: If the job is cancelled
+        JobClaimedError: If another worker is running the job (its record is
+            left to that worker)
     """
     start_time = time.time()
 
-    # Get default config and merge with custom config
-    default_config = get_config()
+    # Get default config and merge with custom config (copied, so one job's
+    # settings never leak into the module-level defaults)
+    default_config = copy.deepcopy(get_config())
     if config:
         # Merge custom config
         for key, value in config.items():
@@ -59,31 +99,99 @@ async def process_pdf_async(
                     default_config[key] = value
 
     processing_config = default_config
+    checkpoint = None
+    interrupted = False
 
     try:
-        # Update status to processing
-        await job_manager.update_progress(
-            job_id, 0, "Starting PDF processing...", ProcessingStatus.PROCESSING
-        )
-
-        # Run the processing in a thread pool to avoid blocking
-        # Pass the current event loop to the sync function
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            _process_pdf_sync,
-            job_id,
+        # The input digest keys both the result cache and the page feature cache
+        input_digest = None
+        if result_cache.enabled or processing_config["feature_cache"]["enabled"]:
+            input_digest = await asyncio.to_thread(content_digest, Path(input_path))
+
+        # Same input and same effective settings: reuse the stored result
+        cache_key = None
+        if result_cache.enabled:
+            cache_key = result_cache.key(input_digest, processing_config)
+            cached = await asyncio.to_thread(result_cache.get, cache_key, job_id, Path(output_dir))
+            if cached is not None:
+                cached.input_file = Path(input_path).name
+                cached.processing_time_seconds = time.time() - start_time
+                await job_manager.update_progress(
+                    job_id, 100, "Loaded previously processed result", ProcessingStatus.PROCESSING
+                )
+                return cached
+
+        # Checkpointed from now on, so the job resumes if the server stops
+        if checkpoint_store.enabled:
+            checkpoint = checkpoint_store.claim(job_id)
+            if checkpoint is None:
+                raise JobClaimedError(f"Job {job_id} is already running in another worker")
+            await asyncio.to_thread(checkpoint.write_job, {
+                "job_id": job_id,
+                "input_path": str(input_path),
+                "output_dir": str(output_dir),
+                "config": config,
+                "page_count": page_count,
+                "client_id": client_id,
+            })
+
+        # Rendered pages are held until the job ends, up to the page store's
+        # RAM budget, and each analysis thread works on one page: reserve
+        # memory for them, estimated before rendering
+        memory_mb = await asyncio.to_thread(
+            PDFProcessor(**processing_config["pdf"]).estimate_memory_mb,
             input_path,
-            output_dir,
-            processing_config,
-            loop,  # Pass event loop
+            None,
+            None,
+            processing_config["performance"]["page_store_mb"],
+            processing_config["performance"]["analyze_workers"],
         )
 
+        # Wait for a free slot (and memory) in the job executor
+        async with job_executor.slot(job_id, page_count, client_id, memory_mb):
+            # Update status to processing
+            await job_manager.update_progress(
+                job_id, 0, "Starting PDF processing...", ProcessingStatus.PROCESSING
+            )
+
+            # Run the CPU-bound processing in the executor's process pool;
+            # progress is relayed back to the job manager
+            result = await job_executor.run(
+                job_id,
+                _process_pdf_sync,
+                job_id,
+                input_path,
+                output_dir,
+                processing_config,
+                input_digest,
+                str(checkpoint.path) if checkpoint else None,
+            )
+            if job_executor.is_cancelled(job_id):
+                # Cancelled just as the work finished
+                raise JobCancelledError(f"Job {job_id} was cancelled")
+
+        if result.requires_user_selection and preview_cache.prewarm_pages:
+            _start_preview_prewarm(Path(output_dir) / "temp" / f"job_{job_id}")
+
         processing_time = time.time() - start_time
         result.processing_time_seconds = processing_time
 
+        if cache_key is not None:
+            await asyncio.to_thread(result_cache.put, cache_key, result, Path(output_dir))
+
         return result
 
+    except JobCancelledError:
+        # Drop whatever the job left in its temp directory
+        await asyncio.to_thread(
+            shutil.rmtree, Path(output_dir) / "temp" / f"job_{job_id}", True
+        )
+        logger.info(f"Job {job_id} cancelled")
+        raise
+
+    except JobClaimedError:
+        raise
+
     except Exception as e:
         logger.error(f"Error processing PDF in job {job_id}: {e}", exc_info=True)
         await job_manager.fail_job(job_id, str(e))
@@ -103,40 +211,378 @@ async def process_pdf_async(
             error=str(e),
         )
 
+    except asyncio.CancelledError:
+        # Server shutting down: keep the checkpoint so the job resumes
+        interrupted = True
+        raise
+
+    finally:
+        if checkpoint is not None:
+            checkpoint_store.release(job_id, clear=not interrupted)
+
+
+def write_selection_manifest(
+    job_dir: Path,
+    source_path: str,
+    source_digest: Optional[str],
+    non_blank_indices: List[int],
+    render_config: Dict,
+) -> Path:
+    """
+    Persist what is needed to build the PDF once the user has selected pages.
+
+    Only page indices and render settings are stored; the pages themselves
+    are rendered again from the source PDF, so disk use and generation time
+    scale with the selection.
+
+    Args:
+        job_dir: Job temp directory
+        source_path: Path to the input PDF
+        source_digest: SHA-256 digest of the input PDF (if known)
+        non_blank_indices: Original page index of each selectable page
+        render_config: PDFProcessor settings (dpi, image_format, color_space)
+
+    Returns:
+        Path to the manifest
+    """
+    manifest = {
+        "source": str(Path(source_path).resolve()),
+        "source_sha256": source_digest,
+        "non_blank_indices": [int(i) for i in non_blank_indices],
+        "render": dict(render_config),
+    }
+    path = Path(job_dir) / SELECTION_MANIFEST
+    path.write_text(json.dumps(manifest, indent=2))
+    return path
+
+
+def read_selection_manifest(job_dir: Path) -> Dict:
+    """
+    Load a job's selection manifest.
+
+    Args:
+        job_dir: Job temp directory
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        FileNotFoundError: If the job has no manifest
+    """
+    return json.loads((Path(job_dir) / SELECTION_MANIFEST).read_text())
+
+
+def _start_preview_prewarm(job_dir: Path):
+    """
+    Render the first screenful of page previews in the background.
+
+    Args:
+        job_dir: Job temp directory holding the selection manifest
+    """
+    async def prewarm():
+        try:
+            manifest = await asyncio.to_thread(read_selection_manifest, job_dir)
+            await asyncio.to_thread(preview_cache.prewarm, manifest)
+        except Exception as e:
+            logger.warning(f"Could not prewarm page previews: {e}")
+
+    task = asyncio.create_task(prewarm())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def selected_page_indices(manifest: Dict, selected_indices: List[int]) -> List[int]:
+    """
+    Map user selections onto page indices of the source PDF.
+
+    Args:
+        manifest: Selection manifest
+        selected_indices: Indices into the selectable (non-blank) pages
+
+    Returns:
+        Source page indices, in selection order (invalid selections are dropped)
+    """
+    non_blank_indices = manifest["non_blank_indices"]
+    return [non_blank_indices[i] for i in selected_indices if 0 <= i < len(non_blank_indices)]
+
+
+def render_selected_pages(manifest: Dict, selected_indices: List[int]) -> List:
+    """
+    Render the user-selected pages from the source PDF.
+
+    Args:
+        manifest: Selection manifest
+        selected_indices: Indices into the selectable (non-blank) pages
+
+    Returns:
+        List of PIL Images, in selection order
+
+    Raises:
+        FileNotFoundError: If the source PDF is gone
+    """
+    page_indices = selected_page_indices(manifest, selected_indices)
+    if not page_indices:
+        return []
+    processor = PDFProcessor(**manifest["render"])
+    return processor.extract_pages_by_index(manifest["source"], page_indices)
+
+
+async def generate_pdf_async(
+    job_id: str,
+    manifest: Dict,
+    page_indices: List[int],
+    output_dir: str,
+    filename: str,
+    metadata: Optional[Dict] = None,
+) -> Dict[str, str]:
+    """
+    Build the PDF of the user-selected pages in the job executor.
+
+    Progress is reported as the job's PDF generation progress (and so over
+    the job's WebSocket); the job's own progress is left alone. The PDF is
+    written page by page to <output_dir>/<filename>.pdf, so it can be
+    streamed while it is being generated.
+
+    Args:
+        job_id: Job identifier (used for scheduling and progress)
+        manifest: Selection manifest
+        page_indices: Source page indices, see selected_page_indices
+        output_dir: Output directory
+        filename: Base filename (without extension)
+        metadata: Optional metadata stored alongside the PDF
+
+    Returns:
+        Dictionary with paths to saved files
+
+    Raises:
+        JobCancelledError: If the job is cancelled
+    """
+    config = get_config()
+    # Pages are streamed to the PDF, so only one is held at a time
+    memory_mb = await asyncio.to_thread(
+        PDFProcessor(**manifest["render"]).estimate_memory_mb, manifest["source"], page_indices, 1
+    )
+    async with job_executor.slot(job_id, len(page_indices), memory_mb=memory_mb):
+        await job_manager.update_generation(job_id, 0, "Generating PDF...")
+        saved = await job_executor.run(
+            job_id,
+            _generate_pdf_sync,
+            manifest["source"],
+            manifest["render"],
+            page_indices,
+            output_dir,
+            config["file_management"],
+            filename,
+            metadata,
+            config["performance"]["batch_size"],
+            generation=True,
+        )
+    await job_manager.update_generation(job_id, 100, f"PDF generated: {Path(saved['pdf']).name}")
+    return saved
+
+
+def _generate_pdf_sync(
+    source_path: str,
+    render_config: Dict,
+    page_indices: List[int],
+    output_dir: str,
+    file_config: Dict,
+    filename: str,
+    metadata: Optional[Dict] = None,
+    batch_size: int = 10,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    yield_point: Optional[Callable[[], None]] = None,
+    check_cancelled: Optional[Callable[[], None]] = None,
+) -> Dict[str, str]:
+    """
+    Render pages and write them to a PDF one at a time (runs in the job executor's pool).
+
+    Args:
+        source_path: Path to the source PDF
+        render_config: PDFProcessor settings (dpi, image_format, color_space)
+        page_indices: Source page indices, in output order
+        output_dir: Output directory
+        file_config: FileManager settings
+        filename: Base filename (without extension)
+        metadata: Optional metadata stored alongside the PDF
+        batch_size: Number of pages between yield points
+        progress_callback: Optional callback(progress, step) for progress updates
+        yield_point: Optional scheduler hook called between page batches
+        check_cancelled: Optional hook called after every page, raising
+            JobCancelledError once the job is cancelled
+
+    Returns:
+        Dictionary with paths to saved files
+    """
+    processor = PDFProcessor(**render_config)
+    file_manager = FileManager(output_dir, **file_config)
+
+    page_progress = _stage_progress(
+        progress_callback or _log_progress, 0, 99, "Generating PDF", yield_point, batch_size,
+        check_cancelled,
+    )
+
+    pages = processor.iter_pages_by_index(source_path, page_indices, page_progress)
+    return file_manager.save_report_stream(pages, filename, metadata, dpi=processor.dpi)
+
+
+def _log_progress(progress: int, step: str):
+    """Progress callback of jobs run without one."""
+    logger.debug(f"Progress update: {progress}% - {step}")
+
+
+def _stage_progress(
+    update_progress: Callable[[int, str], None],
+    start: int,
+    end: int,
+    label: str,
+    yield_point: Optional[Callable[[], None]] = None,
+    batch_size: int = 10,
+    check_cancelled: Optional[Callable[[], None]] = None,
+) -> Callable[[int, int], None]:
+    """
+    Build a per-item progress callback that maps a stage onto a progress range.
+
+    Args:
+        update_progress: Job-level progress callback(progress, step)
+        start: Progress percentage at the start of the stage
+        end: Progress percentage at the end of the stage
+        label: Step description, e.g. "Extracting pages"
+        yield_point: Optional scheduler hook, called after every batch of items
+        batch_size: Number of items per batch
+        check_cancelled: Optional cancellation hook, called after every item
+
+    Returns:
+        Callback(done, total) that only reports when the percentage changes
+    """
+    last = {"progress": None}
+
+    def callback(done: int, total: int):
+        if check_cancelled:
+            check_cancelled()
+        progress = start + (end - start) * done // max(total, 1)
+        if progress != last["progress"] or done == total:
+            last["progress"] = progress
+            update_progress(progress, f"{label} ({done}/{total})")
+        if yield_point and done < total and done % batch_size == 0:
+            yield_point()
+
+    return callback
+
+
+class _CheckpointStage(Stage):
+    """
+    Reports analysis progress and checkpoints every completed page batch.
+
+    Runs inline, in page order: a page's progress (and cancellation check)
+    comes before its batch is stored, so a cancelled job never checkpoints
+    a batch it has not reported.
+    """
+
+    name = "checkpoint"
+
+    def __init__(
+        self,
+        table: PageTable,
+        checkpoint: Optional[JobCheckpoint],
+        key: str,
+        batch_size: int,
+        progress_callback: Callable[[int, int], None],
+        hashed: bool = True,
+    ):
+        super().__init__(workers=0)
+        self.table = table
+        self.checkpoint = checkpoint
+        self.key = key
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.hashed = hashed
+        self._analysed: Dict[int, int] = {}  # Pages analysed per batch start
+
+    def process(self, item: PageItem) -> PageItem:
+        self.progress_callback(item.index + 1, len(self.table))
+        if self.checkpoint:
+            start = item.index - item.index % self.batch_size
+            end = min(start + self.batch_size, len(self.table))
+            analysed = self._analysed.pop(start, 0) + 1
+            if analysed == end - start:
+                hashes = self.table.packed_hashes[start:end] if self.hashed else None
+                batch = PageBatch(self.table.metrics(start, end), hashes)
+                self.checkpoint.save_batch(self.key, start, batch)
+            else:
+                self._analysed[start] = analysed
+        return item
+
 
 def _process_pdf_sync(
-    job_id: str, input_path: str, output_dir: str, config: Dict, event_loop
+    job_id: str,
+    input_path: str,
+    output_dir: str,
+    config: Dict,
+    input_digest: Optional[str] = None,
+    checkpoint_dir: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    yield_point: Optional[Callable[[], None]] = None,
+    check_cancelled: Optional[Callable[[], None]] = None,
 ) -> ProcessingResult:
     """
-    Synchronous processing function (runs in thread pool).
+    Synchronous processing function (runs in the job executor's pool).
 
     Args:
         job_id: Job identifier
         input_path: Path to input PDF
         output_dir: Output directory
         config: Configuration dictionary
-        event_loop: Event loop from async context for progress updates
+        input_digest: SHA-256 digest of the input, used to store and reuse
+            per-page features (metrics and hashes)
+        checkpoint_dir: Optional job checkpoint directory (see
+            app.core.checkpoints): analysed page batches stored there are
+            reused, new ones and the final result are stored there
+        progress_callback: Optional callback(progress, step) for progress updates
+        yield_point: Optional scheduler hook called between page batches, where
+            a large job may be parked so that small jobs can run
+        check_cancelled: Optional hook called after every page rendered,
+            analysed, hashed or saved, raising JobCancelledError once the job
+            is cancelled
 
     Returns:
         ProcessingResult
+
+    Raises:
+        JobCancelledError: If the job is cancelled
     """
     logger.info(f"Starting synchronous processing for job {job_id}")
 
-    # Convert async progress updates to sync by using asyncio
+    checkpoint = JobCheckpoint(checkpoint_dir) if checkpoint_dir else None
+    if checkpoint:
+        stored_result = checkpoint.load_result()
+        if stored_result is not None:
+            # Interrupted after its output was written
+            logger.info(f"Job {job_id} already finished before the restart")
+            return ProcessingResult(**stored_result)
+
+    reported = {"progress": 0}
+
     def update_progress_sync(progress: int, step: str):
         """Helper to update progress synchronously"""
-        try:
-            # Use the event loop passed from async context
-            if event_loop and not event_loop.is_closed():
-                asyncio.run_coroutine_threadsafe(
-                    job_manager.update_progress(job_id, progress, step),
-                    event_loop,
-                )
-            else:
-                logger.debug(f"Progress update: {progress}% - {step}")
-        except Exception as e:
-            # If anything fails, just log
-            logger.debug(f"Progress update failed: {e}")
+        reported["progress"] = progress
+        if progress_callback:
+            progress_callback(progress, step)
+        else:
+            logger.debug(f"Progress update: {progress}% - {step}")
+
+    batch_size = config["performance"]["batch_size"]
+
+    def stage(start: int, end: int, label: str):
+        """Per-page progress for one stage, yielding between page batches."""
+        return _stage_progress(
+            update_progress_sync, start, end, label, yield_point, batch_size, check_cancelled
+        )
+
+    def between_pages(done: int, total: int):
+        """Per-page hook of work without progress reports: only checks for cancellation."""
+        if check_cancelled:
+            check_cancelled()
 
     # Extract original filename without path and extension for use in output filenames
     original_filename = Path(input_path).stem  # Gets filename without extension
@@ -153,107 +599,179 @@ def _process_pdf_sync(
         "error": None,
     }
 
+    # Pages rendered in this job; beyond the RAM budget they spill to disk
+    rendered = PageStore(config["performance"]["page_store_mb"], config["performance"]["spill_dir"])
+
     try:
-        # Step 1: Extract pages from PDF (0-20%)
-        update_progress_sync(5, "Extracting pages from PDF...")
         pdf_processor = PDFProcessor(**config["pdf"])
-        pages = pdf_processor.extract_pages(input_path)
-        stats["total_pages"] = len(pages)
-        logger.info(f"Extracted {len(pages)} pages")
-        update_progress_sync(20, f"Extracted {len(pages)} pages")
-
-        # Step 2: Remove blank pages (20-40%)
-        update_progress_sync(25, "Detecting and removing blank pages...")
         image_analyzer = ImageAnalyzer(**config["blank_detection"])
-        non_blank_pages, non_blank_indices, metrics = image_analyzer.filter_blank_pages(pages)
-        stats["non_blank_pages"] = len(non_blank_pages)
-        stats["blank_pages"] = stats["total_pages"] - stats["non_blank_pages"]
-        logger.info(f"Removed {stats['blank_pages']} blank pages")
-        update_progress_sync(40, f"Removed {stats['blank_pages']} blank pages")
-
-        if not non_blank_pages:
-            raise ValueError("No non-blank pages found in the PDF")
 
         # Check duplicate detection setting
         duplicate_detection_enabled = config.get("duplicate_detection", {}).get("enabled", True)
-
-        # Step 3: Detect and remove duplicate pages (40-70%) - conditional
-        requires_user_selection = False
-        page_infos = []
-        duplicate_map = {}  # Maps duplicate index to original index
-
+        duplicate_detector = None
         if duplicate_detection_enabled:
-            update_progress_sync(45, "Detecting duplicate pages...")
             # Remove 'enabled' key before passing to DuplicateDetector
-            dedup_config = {k: v for k, v in config["duplicate_detection"].items() if k != "enabled"}
+            dedup_config = {
+                k: v for k, v in config["duplicate_detection"].items() if k != "enabled"
+            }
             duplicate_detector = DuplicateDetector(**dedup_config)
 
-            # Treat each page as a separate "report" for duplicate detection
-            page_list = [[page] for page in non_blank_pages]
-
-            # Find duplicates and get unique pages
-            unique_indices, duplicate_pairs = duplicate_detector.find_duplicates(page_list)
-
-            # Build duplicate map from duplicate_pairs
-            for idx1, idx2, similarity in duplicate_pairs:
-                duplicate_map[idx2] = idx1  # idx2 is duplicate of idx1
-
-            stats["unique_pages"] = len(unique_indices)
-            stats["duplicate_pages"] = stats["non_blank_pages"] - stats["unique_pages"]
-            logger.info(f"Found {stats['duplicate_pages']} duplicate pages")
-            update_progress_sync(65, f"Found {stats['duplicate_pages']} duplicate pages")
-
-            # If duplicates found, prepare for user selection
-            if stats["duplicate_pages"] > 0:
-                requires_user_selection = True
-                update_progress_sync(68, "Preparing page previews for user selection...")
-
-                # Save page previews and create page info
-                preview_dir = Path(output_dir) / "temp" / f"job_{job_id}"
-                preview_dir.mkdir(parents=True, exist_ok=True)
-
-                for idx, page in enumerate(non_blank_pages):
-                    is_duplicate = idx not in unique_indices
-                    duplicate_of = duplicate_map.get(idx, None)
-
-                    # Save page preview as thumbnail
-                    preview_path = preview_dir / f"page_{idx}.jpg"
-                    page_resized = page.copy()
-                    page_resized.thumbnail((300, 400))  # Thumbnail size
-                    page_resized.save(preview_path, "JPEG", quality=85)
-
-                    page_info = PageInfo(
-                        page_index=idx,
-                        page_number=idx + 1,
-                        is_duplicate=is_duplicate,
-                        duplicate_of=duplicate_of,
-                        preview_url=f"/api/preview/{job_id}/page_{idx}.jpg"
+        # Per-page metrics and hashes do not depend on the thresholds: when they
+        # are stored for this file and these render/hash settings, reuse them
+        feature_cache = FeatureCache(**config["feature_cache"])
+        feature_cache_key = feature_key(input_digest, config) if input_digest else None
+        features = feature_cache.load(feature_cache_key) if feature_cache_key else None
+        if features is not None and duplicate_detection_enabled and features.packed_hashes is None:
+            features = None  # Stored without hashes, analyse again
+
+        def page_images(indices: List[int]) -> PageSequence:
+            """Get page images, rendering only the pages not rendered yet."""
+            missing = table.pending_indices(indices)
+            if missing:
+                pdf_processor.render_to_store(input_path, rendered, missing, between_pages)
+                table.mark_rendered(missing)
+            return rendered.images(indices)
+
+        # Step 1: Render and analyse pages (5-60%). Page batches stored in the
+        # checkpoint by an interrupted run of this job are reused.
+        checkpoint_key = feature_key(input_digest or "", config)
+        if features is None:
+            update_progress_sync(5, "Extracting pages from PDF...")
+            table = PageTable(pdf_processor.get_page_count(input_path))
+            stored = checkpoint.load_batches(checkpoint_key) if checkpoint else {}
+            for start, batch in stored.items():
+                complete = len(batch.metrics) == min(batch_size, len(table) - start)
+                if start % batch_size == 0 and complete:
+                    table.set_metrics(start, batch.metrics, PAGE_RESTORED)
+                    if batch.packed_hashes is not None:
+                        table.set_hashes(start, batch.packed_hashes)
+            pending = np.flatnonzero(table.rows["render_state"] == PAGE_PENDING).tolist()
+            if len(pending) < len(table):
+                logger.info(
+                    f"Resumed job {job_id}: reused {len(table) - len(pending)} checkpointed pages"
+                )
+        else:
+            table = PageTable.from_metrics(*features)
+            pending = []
+            update_progress_sync(25, f"Reusing stored analysis of {len(table)} pages")
+
+        # Rendering runs ahead of the analysis: its steps are reported without
+        # moving the progress past the analysed pages
+        render_progress = _stage_progress(
+            lambda _, step: update_progress_sync(reported["progress"], step),
+            5,
+            60,
+            "Extracting pages",
+        )
+
+        # Step 2: Remove blank pages, then detect duplicate pages (60-70%) -
+        # only candidate pages are rendered if a verification stage needs them.
+        # Without duplicates the unique pages are saved right away (75-90%).
+        writer = WriteStage(
+            table,
+            FileManager(output_dir, **config["file_management"]),
+            page_images,
+            original_filename,
+            deduplicated=duplicate_detection_enabled,
+            defer_if_duplicates=True,
+            progress_callback=stage(75, 90, "Saving pages"),
+            dpi=pdf_processor.dpi,
+        )
+        stages = [
+            # Hash every page when features are stored, so that a later change
+            # of blank thresholds finds hashes for all pages
+            AnalyzeStage(
+                table,
+                image_analyzer,
+                duplicate_detector,
+                hash_all=feature_cache_key is not None,
+                workers=config["performance"]["analyze_workers"],
+            ),
+            _CheckpointStage(
+                table, checkpoint, checkpoint_key, batch_size, stage(5, 60, "Analyzing pages"),
+                hashed=duplicate_detection_enabled,
+            ),
+            BlankFilterStage(table, image_analyzer),
+        ]
+        if duplicate_detection_enabled:
+            stages.append(DedupeStage(table, duplicate_detector, page_images))
+        stages.append(writer)
+
+        def on_event(event: PipelineEvent):
+            """Map stage events onto job progress."""
+            if event.index is not None:
+                if event.stage == Pipeline.SOURCE_STAGE:
+                    render_progress(event.index + 1, len(table))
+                return
+
+            if event.stage == AnalyzeStage.name:
+                logger.info(f"Analysed {len(table)} pages")
+                if feature_cache_key and features is None:
+                    feature_cache.save(
+                        feature_cache_key, PageFeatures(table.metrics(), table.packed_hashes)
                     )
-                    page_infos.append(page_info)
+            elif event.stage == BlankFilterStage.name:
+                stats.update(table.summary())
+                logger.info(f"Removed {stats['blank_pages']} blank pages")
+                update_progress_sync(62, f"Removed {stats['blank_pages']} blank pages")
+                if not stats["non_blank_pages"]:
+                    raise ValueError("No non-blank pages found in the PDF")
+                if not duplicate_detection_enabled:
+                    update_progress_sync(65, "Skipping duplicate detection (disabled)...")
+                    logger.info("Duplicate detection disabled - keeping all pages")
+                    update_progress_sync(70, "Duplicate detection skipped")
+                    update_progress_sync(75, "Saving processed PDF...")
+            elif event.stage == DedupeStage.name:
+                stats.update(table.summary())
+                logger.info(f"Found {stats['duplicate_pages']} duplicate pages")
+                update_progress_sync(65, f"Found {stats['duplicate_pages']} duplicate pages")
+                if not stats["duplicate_pages"]:
+                    update_progress_sync(70, "No duplicate pages found")
+                    update_progress_sync(75, "Saving processed PDF...")
+
+        pipeline = Pipeline(stages, config["performance"]["pipeline_queue_size"], on_event)
+        source = render_pages(pdf_processor, input_path, rendered, pending) if pending else []
+        pipeline.run(source, len(pending))
+        non_blank_indices = table.non_blank_indices().tolist()
+
+        # Step 3: Handle result based on whether user selection is required
+        if writer.saved is None:
+            # Duplicates found: the user selects the pages - don't generate PDF yet
+            update_progress_sync(68, "Preparing pages for user selection...")
+
+            # Previews are rendered on request from the source PDF (see
+            # app.core.previews); only the page info is needed here
+            preview_dir = Path(output_dir) / "temp" / f"job_{job_id}"
+            preview_dir.mkdir(parents=True, exist_ok=True)
+
+            # Pages are numbered among the non-blank pages
+            page_infos = []
+            duplicate_of = table.rows["duplicate_of"][non_blank_indices]
+            duplicate_positions = np.searchsorted(non_blank_indices, duplicate_of).tolist()
+            sprite_layout = preview_cache.sprite_layout(len(non_blank_indices))
+            for idx, cell in enumerate(sprite_layout):
+                sheet = cell.pop("sheet")
+                is_duplicate = bool(duplicate_of[idx] != NO_PAGE)
+                page_info = PageInfo(
+                    page_index=idx,
+                    page_number=idx + 1,
+                    is_duplicate=is_duplicate,
+                    duplicate_of=duplicate_positions[idx] if is_duplicate else None,
+                    preview_url=f"/api/preview/{job_id}/page_{idx}.jpg",
+                    sprite=PreviewSprite(
+                        url=f"/api/preview/{job_id}/sheet_{sheet}.{preview_cache.sheet_extension}",
+                        **cell,
+                    ),
+                )
+                page_infos.append(page_info)
 
-                # Store non_blank_pages for later PDF generation
-                import pickle
-                pages_cache_path = preview_dir / "pages.pkl"
-                with open(pages_cache_path, 'wb') as f:
-                    pickle.dump(non_blank_pages, f)
+            # Store how to re-render the pages for later PDF generation
+            write_selection_manifest(
+                preview_dir, input_path, input_digest, non_blank_indices, config["pdf"]
+            )
 
-                logger.info(f"Saved {len(page_infos)} page previews for user selection")
-                update_progress_sync(70, "Page previews ready for user selection")
-            else:
-                # No duplicates, proceed normally
-                unique_pages = non_blank_pages
-                update_progress_sync(70, "No duplicate pages found")
-        else:
-            update_progress_sync(45, "Skipping duplicate detection (disabled)...")
-            logger.info("Duplicate detection disabled - keeping all pages")
-            unique_pages = non_blank_pages
-            stats["unique_pages"] = len(unique_pages)
-            stats["duplicate_pages"] = 0
-            update_progress_sync(70, "Duplicate detection skipped")
-
-        # Step 4: Handle result based on whether user selection is required
-        if requires_user_selection:
-            # User needs to select pages - don't generate PDF yet
+            logger.info(f"Prepared {len(page_infos)} pages for user selection")
+            update_progress_sync(70, "Pages ready for user selection")
             update_progress_sync(100, "Waiting for user to select pages...")
 
             # Create result with page info for user selection
@@ -273,28 +791,21 @@ def _process_pdf_sync(
                 error=None,
             )
 
-            logger.info(f"Awaiting user selection: {len(page_infos)} pages, {stats['duplicate_pages']} duplicates")
+            logger.info(
+                f"Awaiting user selection: {len(page_infos)} pages, "
+                f"{stats['duplicate_pages']} duplicates"
+            )
+            if checkpoint:
+                checkpoint.save_result(result.model_dump())
             return result
         else:
-            # No duplicates or detection disabled - generate PDF immediately
-            update_progress_sync(75, "Saving processed PDF...")
-            file_manager = FileManager(output_dir, **config["file_management"])
-
-            # Create metadata for the processed PDF
-            metadata = {
-                "original_page_indices": list(range(len(unique_pages))),
-                "total_pages": stats["total_pages"],
-                "blank_pages_removed": stats["blank_pages"],
-                "duplicate_pages_removed": stats["duplicate_pages"],
-                "processing_mode": "blank_removal_and_deduplication" if duplicate_detection_enabled else "blank_removal_only",
-            }
-
-            # Save as single processed PDF
-            saved = file_manager.save_report(unique_pages, 1, metadata, original_filename)
+            # No duplicates or detection disabled - the PDF has been generated
+            saved = writer.saved
             saved_files = [saved]
             stats["saved_files"] = saved_files
 
             update_progress_sync(90, "Creating processing log...")
+            file_manager = writer.file_manager
             file_manager.create_processing_log(stats)
 
             output_summary = file_manager.get_output_summary()
@@ -311,7 +822,7 @@ def _process_pdf_sync(
                 report_info = ReportInfo(
                     report_id="report_0001",
                     filename=pdf_path.name,
-                    page_count=len(unique_pages),
+                    page_count=writer.page_count,
                     file_size_mb=round(file_size_mb, 2),
                     download_url=f"/api/download/{pdf_path.name}",
                 )
@@ -334,10 +845,23 @@ def _process_pdf_sync(
                 error=None,
             )
 
-            logger.info(f"Returning processed PDF: {report_infos[0].filename if report_infos else 'None'}")
-            logger.info(f"Total pages: {stats['total_pages']}, Blank pages removed: {stats['blank_pages']}, Duplicate pages removed: {stats['duplicate_pages']}, Final pages: {stats['unique_pages']}")
+            logger.info(
+                f"Returning processed PDF: {report_infos[0].filename if report_infos else 'None'}"
+            )
+            logger.info(
+                f"Total pages: {stats['total_pages']}, "
+                f"Blank pages removed: {stats['blank_pages']}, "
+                f"Duplicate pages removed: {stats['duplicate_pages']}, "
+                f"Final pages: {stats['unique_pages']}"
+            )
+            if checkpoint:
+                checkpoint.save_result(result.model_dump())
             return result
 
+    except JobCancelledError:
+        logger.info(f"Stopped processing of cancelled job {job_id}")
+        raise
+
     except Exception as e:
         logger.error(f"Error in synchronous processing: {e}", exc_info=True)
         stats["error"] = str(e)
@@ -359,3 +883,6 @@ def _process_pdf_sync(
             processing_time_seconds=0,
             error=str(e),
         )
+
+    finally:
+        rendered.close()
@@ -0,0 +1,248 @@
+"""
+Publish/subscribe fan-out of job progress events.
+
+Publishing never waits for subscribers: each subscriber has its own bounded
+queue and sends from its own task. A subscriber that falls behind has its
+queued progress events coalesced: an update supersedes the older pending
+update of the same job, so a slow client gets fewer, fresher events while
+completion and failure events are always delivered.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.api.models import ProcessingProgress, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+# Events that end a job and are never coalesced away
+FINAL_STATUSES = (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED, ProcessingStatus.CANCELLED)
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue of progress events.
+    """
+
+    def __init__(self, job_ids: Optional[Iterable[str]] = None, max_pending: int = 64):
+        """
+        Initialize a subscription.
+
+        Args:
+            job_ids: Jobs to receive events for (None for all jobs)
+            max_pending: Maximum number of queued events before coalescing
+        """
+        self.job_ids: Optional[Set[str]] = set(job_ids) if job_ids is not None else None
+        self.max_pending = max(1, max_pending)
+        self.coalesced = 0  # Events superseded or dropped while the subscriber was behind
+
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def wants(self, job_id: str) -> bool:
+        """Check whether the subscription receives events of a job."""
+        return self.job_ids is None or job_id in self.job_ids
+
+    def offer(self, update: ProcessingProgress):
+        """
+        Queue an event without waiting (called by the bus).
+
+        Args:
+            update: Progress event
+        """
+        if self._closed:
+            return
+        if len(self._queue) >= self.max_pending and not self._make_room(update):
+            return
+        self._queue.append(update)
+        self._ready.set()
+
+    async def get(self) -> Optional[ProcessingProgress]:
+        """
+        Wait for the next event.
+
+        Returns:
+            Next event, or None once the subscription is closed
+        """
+        while not self._queue:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    def get_nowait(self) -> List[ProcessingProgress]:
+        """
+        Take all queued events without waiting.
+
+        Returns:
+            Queued events, oldest first
+        """
+        events = list(self._queue)
+        self._queue.clear()
+        return events
+
+    def close(self):
+        """Stop receiving events and wake a waiting get()."""
+        self._closed = True
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ProcessingProgress:
+        update = await self.get()
+        if update is None:
+            raise StopAsyncIteration
+        return update
+
+    def _make_room(self, update: ProcessingProgress) -> bool:
+        """
+        Drop one queued progress event, preferring one the new event supersedes.
+
+        Final events are never dropped. With only final events queued, a new
+        progress event is dropped instead, and a new final event is queued
+        beyond the bound.
+
+        Args:
+            update: Event about to be queued
+
+        Returns:
+            True if the event should still be queued
+        """
+        candidates = [
+            i for i, event in enumerate(self._queue) if event.status not in FINAL_STATUSES
+        ]
+        if not candidates:
+            if update.status in FINAL_STATUSES:
+                return True
+            self.coalesced += 1
+            return False
+        same_job = [i for i in candidates if self._queue[i].job_id == update.job_id]
+        del self._queue[(same_job or candidates)[0]]
+        self.coalesced += 1
+        return True
+
+
+class ProgressBus:
+    """
+    Fans progress events out to subscriptions, without blocking the publisher.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        """
+        Initialize the bus.
+
+        Args:
+            max_pending: Default queue bound of new subscriptions
+        """
+        self.max_pending = max_pending
+        self._by_job: Dict[str, Set[Subscription]] = {}
+        self._all_jobs: Set[Subscription] = set()
+        self._pumps: Dict[str, List[asyncio.Task]] = {}
+
+    def subscribe(
+        self, job_ids: Optional[Iterable[str]] = None, max_pending: Optional[int] = None
+    ) -> Subscription:
+        """
+        Subscribe to the events of some jobs, or of all jobs.
+
+        Args:
+            job_ids: Jobs to receive events for (None for all jobs)
+            max_pending: Queue bound (default: the bus default)
+
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(job_ids, max_pending or self.max_pending)
+        if subscription.job_ids is None:
+            self._all_jobs.add(subscription)
+        else:
+            for job_id in subscription.job_ids:
+                self._by_job.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def add_jobs(self, subscription: Subscription, job_ids: Iterable[str]):
+        """
+        Extend a per-job subscription with more jobs.
+
+        Args:
+            subscription: Subscription from subscribe
+            job_ids: Jobs to add
+        """
+        if subscription.job_ids is None:
+            return
+        for job_id in job_ids:
+            subscription.job_ids.add(job_id)
+            self._by_job.setdefault(job_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a subscription and close it.
+
+        Args:
+            subscription: Subscription from subscribe
+        """
+        subscription.close()
+        self._all_jobs.discard(subscription)
+        for job_id in subscription.job_ids or ():
+            subscribers = self._by_job.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_job[job_id]
+
+    def has_subscribers(self, job_id: str) -> bool:
+        """Check whether anyone receives events of a job."""
+        return bool(self._all_jobs) or job_id in self._by_job
+
+    def publish(self, update: ProcessingProgress):
+        """
+        Queue an event for every interested subscription (never waits).
+
+        Args:
+            update: Progress event
+        """
+        for subscription in list(self._by_job.get(update.job_id, ())) + list(self._all_jobs):
+            subscription.offer(update)
+
+    def add_callback(
+        self, job_id: str, callback: Callable[[ProcessingProgress], Awaitable[None]]
+    ) -> Subscription:
+        """
+        Deliver a job's events to an async callback, from its own task.
+
+        Args:
+            job_id: Job identifier
+            callback: Async callback, awaited once per (possibly coalesced) event
+
+        Returns:
+            Subscription feeding the callback
+        """
+        subscription = self.subscribe([job_id])
+
+        async def pump():
+            async for update in subscription:
+                try:
+                    await callback(update)
+                except Exception as e:
+                    logger.error(f"Error in progress callback: {e}")
+
+        task = asyncio.create_task(pump())
+        task.subscription = subscription
+        self._pumps.setdefault(job_id, []).append(task)
+        return subscription
+
+    def remove_callbacks(self, job_id: str):
+        """
+        Stop all callbacks of a job.
+
+        Args:
+            job_id: Job identifier
+        """
+        for task in self._pumps.pop(job_id, []):
+            self.unsubscribe(task.subscription)
+            task.cancel()
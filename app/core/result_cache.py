@@ -0,0 +1,239 @@
+"""
+Result cache for processing jobs.
+
+Results are memoised by (input digest, config digest): processing the same
+PDF again with the same effective settings completes instantly with the
+stored ProcessingResult, and the output files are restored by hard link.
+The cache is bounded by total size and by entry age.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.api.models import ProcessingResult, ProcessingStatus
+from config.config import RESULT_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Config sections that affect the processing result
+CACHE_KEY_SECTIONS = (
+    "pdf",
+    "blank_detection",
+    "report_splitting",
+    "duplicate_detection",
+    "file_management",
+)
+
+
+def config_digest(config: Dict[str, Any]) -> str:
+    """
+    Compute a canonical digest of the settings that affect a result.
+
+    Args:
+        config: Effective processing configuration
+
+    Returns:
+        SHA-256 hex digest
+    """
+    relevant = {section: config.get(section) for section in CACHE_KEY_SECTIONS}
+    canonical = json.dumps(relevant, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of processing results and their output files.
+
+    Each entry is a directory holding result.json and hard links to the
+    output files. Entries are written to a temporary directory and renamed
+    into place, so concurrent workers never see a partial entry.
+    """
+
+    RESULT_FILE = "result.json"
+    FILES_DIR = "files"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_size_mb: int = 2048,
+        max_age_hours: int = 168,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Cache directory
+            max_size_mb: Maximum total size of cached entries in MB
+            max_age_hours: Entries unused for longer than this are evicted
+            enabled: Whether the cache is used at all
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.max_age_seconds = max_age_hours * 3600
+        self.enabled = enabled
+
+    @staticmethod
+    def key(input_digest: str, config: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a job.
+
+        Args:
+            input_digest: SHA-256 digest of the input PDF
+            config: Effective processing configuration
+
+        Returns:
+            Cache key
+        """
+        return hashlib.sha256(f"{input_digest}:{config_digest(config)}".encode()).hexdigest()
+
+    def get(self, key: str, job_id: str, output_dir: Path) -> Optional[ProcessingResult]:
+        """
+        Look up a cached result and restore its output files.
+
+        Args:
+            key: Cache key
+            job_id: Job the result is returned for
+            output_dir: Directory holding downloadable output files
+
+        Returns:
+            ProcessingResult for the job, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.cache_dir / key
+        try:
+            data = json.loads((entry / self.RESULT_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+        try:
+            for report in data["reports"]:
+                self._restore(entry / self.FILES_DIR / report["filename"], Path(output_dir))
+        except OSError as e:
+            logger.warning(f"Dropping incomplete cache entry {key}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(entry)
+
+        data["job_id"] = job_id
+        data["processing_time_seconds"] = 0
+        logger.info(f"Result cache hit for job {job_id}")
+        return ProcessingResult(**data)
+
+    def put(self, key: str, result: ProcessingResult, output_dir: Path) -> bool:
+        """
+        Store a completed result and its output files.
+
+        Results that still need the user to select pages are not cached, as
+        they refer to per-job preview files.
+
+        Args:
+            key: Cache key
+            result: Completed processing result
+            output_dir: Directory holding the result's output files
+
+        Returns:
+            True if the result was stored
+        """
+        if (
+            not self.enabled
+            or result.status != ProcessingStatus.COMPLETED
+            or result.requires_user_selection
+        ):
+            return False
+
+        entry = self.cache_dir / key
+        if entry.exists():
+            return False
+
+        staging = self.cache_dir / f".{key}.{uuid.uuid4().hex}"
+        try:
+            files_dir = staging / self.FILES_DIR
+            files_dir.mkdir(parents=True)
+            for report in result.reports:
+                self._link_or_copy(Path(output_dir) / report.filename, files_dir / report.filename)
+            (staging / self.RESULT_FILE).write_text(json.dumps(result.model_dump(), default=str))
+            os.rename(staging, entry)
+        except OSError as e:
+            # Another worker stored the same entry first, or an output file is gone
+            logger.debug(f"Result not cached: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        logger.info(f"Cached result of job {result.job_id}")
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then the least recently used ones over the size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        now = time.time()
+        entries: List[tuple] = []
+        removed = 0
+        for entry in self.cache_dir.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            mtime = entry.stat().st_mtime
+            if now - mtime > self.max_age_seconds:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+                continue
+            size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+            entries.append((mtime, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Result cache: evicted {removed} entries")
+        return removed
+
+    def _restore(self, cached_file: Path, output_dir: Path):
+        """Make a cached output file available for download again."""
+        target = output_dir / cached_file.name
+        if target.exists():
+            return
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._link_or_copy(cached_file, target)
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path):
+        try:
+            os.link(source, target)
+        except OSError:
+            if target.exists() or not source.exists():
+                raise
+            # Filesystems without hard links
+            shutil.copyfile(source, target)
+
+
+# Global result cache
+result_cache = ResultCache(
+    Path(RESULT_CACHE_CONFIG["path"]),
+    max_size_mb=RESULT_CACHE_CONFIG["max_size_mb"],
+    max_age_hours=RESULT_CACHE_CONFIG["max_age_hours"],
+    enabled=RESULT_CACHE_CONFIG["enabled"],
+)
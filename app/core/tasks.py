@@ -1,17 +1,22 @@
 """
 Background task management for async PDF processing.
 
-Handles job queue, status tracking, and progress updates.
+Handles job queue, status tracking, and progress updates. Job state lives in a
+pluggable JobStore so that all uvicorn workers see the same jobs.
 """
 
 import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Callable, Any
 from pathlib import Path
 import logging
 
 from app.api.models import ProcessingStatus, ProcessingProgress, ProcessingResult, ReportInfo
+from app.core.job_store import JobStore, create_job_store
+from app.core.progress_bus import ProgressBus, Subscription
+from app.core.uploads import resumable_uploads
+from config.config import JOB_STORE_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -19,25 +24,58 @@ logger = logging.getLogger(__name__)
 class JobManager:
     """Manages processing jobs and their status"""
 
-    def __init__(self):
-        self.jobs: Dict[str, Dict[str, Any]] = {}
-        self.progress_callbacks: Dict[str, List[Callable]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(self, store: Optional[JobStore] = None):
+        """
+        Initialize the job manager.
+
+        Every method touching the store is async and runs the store call in a
+        worker thread, so a database lock held by another uvicorn worker never
+        blocks this event loop.
+
+        Args:
+            store: Job store backend (default: built from JOB_STORE_CONFIG)
+        """
+        self.store = store or create_job_store(**JOB_STORE_CONFIG)
+        self.progress_bus = ProgressBus()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
 
-    def create_job(self, filename: str, config: Optional[Dict] = None) -> str:
+    def _loop_lock(self) -> asyncio.Lock:
+        """
+        Get the lock serialising updates, bound to the running event loop.
+
+        Store calls are awaited while the lock is held, so it is contended;
+        a lock left from another loop (e.g. an earlier asyncio.run) would fail.
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def create_job(
+        self,
+        filename: str,
+        config: Optional[Dict] = None,
+        client_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+    ) -> str:
         """
         Create a new processing job.
 
         Args:
             filename: Name of the PDF file to process
             config: Optional configuration dictionary
+            client_id: Client that created the job (for "my jobs" event streams)
+            job_id: Job ID to use (default: a new UUID), e.g. to recreate a
+                resumed job
 
         Returns:
             Job ID (UUID)
         """
-        job_id = str(uuid.uuid4())
+        job_id = job_id or str(uuid.uuid4())
 
-        self.jobs[job_id] = {
+        await asyncio.to_thread(self.store.create, {
             "job_id": job_id,
             "filename": filename,
             "status": ProcessingStatus.PENDING,
@@ -48,7 +86,9 @@ class JobManager:
             "created_at": datetime.now(),
             "updated_at": datetime.now(),
             "config": config or {},
-        }
+            "client_id": client_id,
+            "generation": None,
+        })
 
         logger.info(f"Created job {job_id} for file: {filename}")
         return job_id
@@ -69,35 +109,75 @@ class JobManager:
             current_step: Description of current step
             status: Optional status update
         """
-        async with self._lock:
-            if job_id not in self.jobs:
+        async with self._loop_lock():
+            fields = {
+                "progress": progress,
+                "current_step": current_step,
+                "updated_at": datetime.now(),
+            }
+            if status:
+                fields["status"] = status
+
+            if not await asyncio.to_thread(self.store.update, job_id, **fields):
                 logger.error(f"Job {job_id} not found for progress update")
                 return
 
-            self.jobs[job_id]["progress"] = progress
-            self.jobs[job_id]["current_step"] = current_step
-            self.jobs[job_id]["updated_at"] = datetime.now()
-
-            if status:
-                self.jobs[job_id]["status"] = status
-
             logger.debug(
                 f"Job {job_id} progress: {progress}% - {current_step}"
             )
 
-            # Trigger progress callbacks
-            if job_id in self.progress_callbacks:
-                progress_update = ProcessingProgress(
+            if status is None and self.progress_bus.has_subscribers(job_id):
+                status = (await asyncio.to_thread(self.store.get, job_id, ["status"]))["status"]
+
+        # Subscribers are notified outside the lock and never awaited
+        if status is not None:
+            self.progress_bus.publish(
+                ProcessingProgress(
                     job_id=job_id,
-                    status=self.jobs[job_id]["status"],
+                    status=status,
                     progress=progress,
                     current_step=current_step,
                 )
-                for callback in self.progress_callbacks[job_id]:
-                    try:
-                        await callback(progress_update)
-                    except Exception as e:
-                        logger.error(f"Error in progress callback: {e}")
+            )
+
+    async def update_generation(self, job_id: str, progress: int, current_step: str) -> None:
+        """
+        Update the progress of the PDF generated from a job's page selection.
+
+        It is kept apart from the job's own progress, so a completed job stays
+        at 100% while its PDF is generated.
+
+        Args:
+            job_id: Job identifier
+            progress: Progress percentage (0-100)
+            current_step: Description of current step
+        """
+        generation = {"progress": progress, "current_step": current_step}
+        async with self._loop_lock():
+            if not await asyncio.to_thread(
+                self.store.update, job_id, generation=generation, updated_at=datetime.now()
+            ):
+                logger.error(f"Job {job_id} not found for PDF generation update")
+                return
+
+            logger.debug(f"Job {job_id} PDF generation: {progress}% - {current_step}")
+
+            job = None
+            if self.progress_bus.has_subscribers(job_id):
+                job = await asyncio.to_thread(
+                    self.store.get, job_id, ["status", "progress", "current_step"]
+                )
+
+        if job is not None:
+            self.progress_bus.publish(
+                ProcessingProgress(
+                    job_id=job_id,
+                    status=job["status"],
+                    progress=job["progress"],
+                    current_step=job["current_step"] or "",
+                    generation=generation,
+                )
+            )
 
     async def complete_job(
         self, job_id: str, result: ProcessingResult
@@ -109,19 +189,31 @@ class JobManager:
             job_id: Job identifier
             result: Processing result
         """
-        async with self._lock:
-            if job_id not in self.jobs:
+        async with self._loop_lock():
+            updated = await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                status=ProcessingStatus.COMPLETED,
+                progress=100,
+                current_step="Processing completed",
+                result=result,
+                updated_at=datetime.now(),
+            )
+            if not updated:
                 logger.error(f"Job {job_id} not found for completion")
                 return
 
-            self.jobs[job_id]["status"] = ProcessingStatus.COMPLETED
-            self.jobs[job_id]["progress"] = 100
-            self.jobs[job_id]["current_step"] = "Processing completed"
-            self.jobs[job_id]["result"] = result
-            self.jobs[job_id]["updated_at"] = datetime.now()
-
             logger.info(f"Job {job_id} completed successfully")
 
+        self.progress_bus.publish(
+            ProcessingProgress(
+                job_id=job_id,
+                status=ProcessingStatus.COMPLETED,
+                progress=100,
+                current_step="Processing completed",
+            )
+        )
+
     async def fail_job(self, job_id: str, error: str) -> None:
         """
         Mark job as failed with error message.
@@ -130,40 +222,117 @@ class JobManager:
             job_id: Job identifier
             error: Error message
         """
-        async with self._lock:
-            if job_id not in self.jobs:
+        async with self._loop_lock():
+            updated = await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                status=ProcessingStatus.FAILED,
+                error=error,
+                current_step="Processing failed",
+                updated_at=datetime.now(),
+            )
+            if not updated:
                 logger.error(f"Job {job_id} not found for failure update")
                 return
 
-            self.jobs[job_id]["status"] = ProcessingStatus.FAILED
-            self.jobs[job_id]["error"] = error
-            self.jobs[job_id]["current_step"] = "Processing failed"
-            self.jobs[job_id]["updated_at"] = datetime.now()
-
             logger.error(f"Job {job_id} failed: {error}")
 
-    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self.store.get, job_id, ["progress"])
+        self.progress_bus.publish(
+            ProcessingProgress(
+                job_id=job_id,
+                status=ProcessingStatus.FAILED,
+                progress=job["progress"] if job else 0,
+                current_step="Processing failed",
+                message=error,
+            )
+        )
+
+    async def cancel_job(self, job_id: str) -> bool:
+        """
+        Mark a pending or running job as cancelled.
+
+        Only records the cancellation; the job executor stops the job's work.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job was cancelled, False if it is not found or has
+            already completed or failed
+        """
+        async with self._loop_lock():
+            job = await asyncio.to_thread(self.store.get, job_id, ["status", "progress"])
+            finished = (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED)
+            if job is None or job["status"] in finished:
+                return False
+
+            await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                status=ProcessingStatus.CANCELLED,
+                current_step="Job cancelled",
+                updated_at=datetime.now(),
+            )
+            logger.info(f"Job {job_id} cancelled")
+
+        self.progress_bus.publish(
+            ProcessingProgress(
+                job_id=job_id,
+                status=ProcessingStatus.CANCELLED,
+                progress=job["progress"],
+                current_step="Job cancelled",
+            )
+        )
+        return True
+
+    async def get_job(
+        self, job_id: str, fields: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Get job information.
 
         Args:
             job_id: Job identifier
+            fields: Only return these fields (None for the whole job)
 
         Returns:
             Job dictionary or None if not found
         """
-        return self.jobs.get(job_id)
+        return await asyncio.to_thread(self.store.get, job_id, fields)
 
-    def get_all_jobs(self) -> List[Dict[str, Any]]:
+    async def get_all_jobs(
+        self,
+        statuses: Optional[List[ProcessingStatus]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
         """
-        Get all jobs.
+        Get jobs, newest first.
+
+        Args:
+            statuses: Only return jobs with one of these statuses
+            limit: Maximum number of jobs to return
+            offset: Number of jobs to skip
 
         Returns:
             List of job dictionaries
         """
-        return list(self.jobs.values())
+        return await asyncio.to_thread(self.store.list, statuses, limit, offset)
 
-    def delete_job(self, job_id: str) -> bool:
+    async def count_jobs(self, statuses: Optional[List[ProcessingStatus]] = None) -> int:
+        """
+        Count jobs.
+
+        Args:
+            statuses: Only count jobs with one of these statuses
+
+        Returns:
+            Number of jobs
+        """
+        return await asyncio.to_thread(self.store.count, statuses)
+
+    async def delete_job(self, job_id: str) -> bool:
         """
         Delete a job.
 
@@ -173,27 +342,38 @@ class JobManager:
         Returns:
             True if deleted, False if not found
         """
-        if job_id in self.jobs:
-            del self.jobs[job_id]
-            if job_id in self.progress_callbacks:
-                del self.progress_callbacks[job_id]
+        if await asyncio.to_thread(self.store.delete, job_id):
+            self.progress_bus.remove_callbacks(job_id)
             logger.info(f"Deleted job {job_id}")
             return True
         return False
 
+    def subscribe(self, job_ids: Optional[List[str]] = None) -> Subscription:
+        """
+        Subscribe to progress, completion and failure events.
+
+        Args:
+            job_ids: Jobs to receive events for (None for all jobs)
+
+        Returns:
+            Subscription (release it with progress_bus.unsubscribe)
+        """
+        return self.progress_bus.subscribe(job_ids)
+
     def register_progress_callback(
         self, job_id: str, callback: Callable
     ) -> None:
         """
         Register a callback for progress updates.
 
+        The callback runs in its own task, outside the job manager's lock; if
+        it falls behind, intermediate progress updates are coalesced.
+
         Args:
             job_id: Job identifier
             callback: Async callback function
         """
-        if job_id not in self.progress_callbacks:
-            self.progress_callbacks[job_id] = []
-        self.progress_callbacks[job_id].append(callback)
+        self.progress_bus.add_callback(job_id, callback)
 
     def unregister_progress_callbacks(self, job_id: str) -> None:
         """
@@ -202,12 +382,11 @@ class JobManager:
         Args:
             job_id: Job identifier
         """
-        if job_id in self.progress_callbacks:
-            del self.progress_callbacks[job_id]
+        self.progress_bus.remove_callbacks(job_id)
 
     async def cleanup_old_jobs(self, max_age_hours: int = 24) -> int:
         """
-        Clean up old completed/failed jobs.
+        Clean up old completed/failed/cancelled jobs.
 
         Args:
             max_age_hours: Maximum age of jobs to keep (hours)
@@ -215,20 +394,17 @@ class JobManager:
         Returns:
             Number of jobs deleted
         """
-        async with self._lock:
-            now = datetime.now()
-            to_delete = []
-
-            for job_id, job in self.jobs.items():
-                if job["status"] in [ProcessingStatus.COMPLETED, ProcessingStatus.FAILED]:
-                    age_hours = (now - job["updated_at"]).total_seconds() / 3600
-                    if age_hours > max_age_hours:
-                        to_delete.append(job_id)
+        async with self._loop_lock():
+            cutoff = datetime.now() - timedelta(hours=max_age_hours)
+            to_delete = await asyncio.to_thread(
+                self.store.find_updated_before,
+                [ProcessingStatus.COMPLETED, ProcessingStatus.FAILED, ProcessingStatus.CANCELLED],
+                cutoff,
+            )
 
             for job_id in to_delete:
-                del self.jobs[job_id]
-                if job_id in self.progress_callbacks:
-                    del self.progress_callbacks[job_id]
+                await asyncio.to_thread(self.store.delete, job_id)
+                self.progress_bus.remove_callbacks(job_id)
 
             if to_delete:
                 logger.info(f"Cleaned up {len(to_delete)} old jobs")
@@ -248,5 +424,8 @@ async def cleanup_task():
             deleted = await job_manager.cleanup_old_jobs(max_age_hours=24)
             if deleted > 0:
                 logger.info(f"Auto-cleanup: removed {deleted} old jobs")
+            abandoned = resumable_uploads.cleanup_stale(max_age_hours=24)
+            if abandoned > 0:
+                logger.info(f"Auto-cleanup: removed {abandoned} abandoned uploads")
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
@@ -0,0 +1,511 @@
+"""
+Upload storage for the API.
+
+Uploaded PDFs are streamed to a partial file in fixed-size chunks while the
+size limit is enforced and a SHA-256 digest is computed, then moved into the
+upload directory under a unique name. Memory per upload is bounded by the
+chunk size, and disk writes never run on the event loop.
+
+Uploaded content is stored once by digest (objects/<ab>/<digest>.pdf); named
+files in the upload directory are hard links to these objects.
+
+Large files can also be sent with the resumable protocol (ResumableUploadStore):
+the client declares the file, appends chunks at the server's current offset
+(resuming from there after a dropped connection) and finalizes. Chunks are
+appended straight into the partial file, so finalizing never copies the data.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+from config.config import INPUT_DIR, UPLOAD_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Partial uploads live next to the final files, so the rename stays atomic
+PARTIAL_DIR_NAME = ".partial"
+# Content-addressed copies of uploaded files
+OBJECTS_DIR_NAME = "objects"
+
+# Digests of known files, keyed by (device, inode, size, mtime)
+_DIGEST_CACHE_SIZE = 1024
+_digest_cache: Dict[tuple, str] = {}
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class UploadNotFoundError(Exception):
+    """Raised when a resumable upload does not exist."""
+
+
+class UploadOffsetError(Exception):
+    """Raised when a chunk does not start at the server's current offset."""
+
+    def __init__(self, message: str, expected_offset: int):
+        super().__init__(message)
+        self.expected_offset = expected_offset
+
+
+class StoredUpload(NamedTuple):
+    """A file stored in the upload directory."""
+    path: Path
+    size: int
+    sha256: str
+
+
+def partial_dir(upload_dir: Path) -> Path:
+    """
+    Get (and create) the directory for partial uploads.
+
+    Args:
+        upload_dir: Upload directory
+
+    Returns:
+        Path to the partial upload directory
+    """
+    path = Path(upload_dir) / PARTIAL_DIR_NAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def object_path(upload_dir: Path, sha256: str) -> Path:
+    """
+    Get the content-addressed path of an uploaded file.
+
+    Args:
+        upload_dir: Upload directory
+        sha256: SHA-256 hex digest of the file
+
+    Returns:
+        Path of the stored object (objects/<ab>/<digest>.pdf)
+    """
+    return Path(upload_dir) / OBJECTS_DIR_NAME / sha256[:2] / f"{sha256}.pdf"
+
+
+def _place_unique(source: Path, upload_dir: Path, filename: str, keep_source: bool) -> Path:
+    """
+    Hard-link a file into the upload directory under an unused name.
+
+    Args:
+        source: File to place
+        upload_dir: Upload directory
+        filename: Requested filename
+        keep_source: Keep the source file (otherwise it is moved)
+
+    Returns:
+        Final path of the file
+    """
+    name = Path(filename)
+    counter = 0
+
+    while True:
+        candidate = name.name if counter == 0 else f"{name.stem}_{counter}{name.suffix}"
+        target = Path(upload_dir) / candidate
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            if keep_source and os.path.samefile(source, target):
+                # The same content was already uploaded under this name
+                return target
+            counter += 1
+            continue
+        except OSError:
+            # Filesystems without hard links
+            if target.exists():
+                counter += 1
+                continue
+            if keep_source:
+                shutil.copyfile(source, target)
+            else:
+                os.replace(source, target)
+            return target
+
+        if not keep_source:
+            os.unlink(source)
+        return target
+
+
+def commit_upload(
+    part_path: Path, upload_dir: Path, filename: str, sha256: Optional[str] = None
+) -> Path:
+    """
+    Move a completed partial file into the upload directory.
+
+    Existing files are never overwritten: a numeric suffix is added instead
+    (report.pdf, report_1.pdf, ...). The file is hard-linked into place so
+    that two concurrent uploads cannot claim the same name.
+
+    With a digest, the content is stored once under objects/ and the named
+    file is a hard link to it, so re-uploading the same PDF takes no extra
+    space.
+
+    Args:
+        part_path: Completed partial file
+        upload_dir: Upload directory
+        filename: Requested filename
+        sha256: Optional SHA-256 hex digest of the file
+
+    Returns:
+        Final path of the file
+    """
+    if sha256 is None:
+        return _place_unique(part_path, upload_dir, filename, keep_source=False)
+
+    obj = object_path(upload_dir, sha256)
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    if obj.exists():
+        os.unlink(part_path)
+    else:
+        os.replace(part_path, obj)
+    _digest_cache[_stat_key(obj)] = sha256
+
+    return _place_unique(obj, upload_dir, filename, keep_source=True)
+
+
+def _stat_key(path: Path):
+    stat = os.stat(path)
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def content_digest(path: Path) -> str:
+    """
+    Get the SHA-256 digest of an uploaded file.
+
+    Digests are remembered per inode, so files committed by this process
+    (and hard links to them) are not hashed again.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest
+    """
+    key = _stat_key(path)
+    digest = _digest_cache.get(key)
+    if digest is None:
+        digest = file_sha256(path)
+        if len(_digest_cache) >= _DIGEST_CACHE_SIZE:
+            _digest_cache.pop(next(iter(_digest_cache)))
+        _digest_cache[key] = digest
+    return digest
+
+
+async def stream_upload(
+    file: UploadFile,
+    upload_dir: Path,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+) -> StoredUpload:
+    """
+    Stream an uploaded file to the upload directory.
+
+    Args:
+        file: Uploaded file
+        upload_dir: Upload directory
+        max_bytes: Maximum file size in bytes
+        chunk_size: Bytes read and written per chunk
+
+    Returns:
+        StoredUpload with the final path, size and SHA-256 digest
+
+    Raises:
+        UploadTooLargeError: If the file exceeds max_bytes
+        ValueError: If the file is empty
+    """
+    part_path = partial_dir(upload_dir) / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(part_path, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"File too large. Maximum size is {max_bytes / (1024 * 1024):.1f} MB"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise ValueError("File is empty")
+
+        target = await asyncio.to_thread(
+            commit_upload, part_path, upload_dir, file.filename, digest.hexdigest()
+        )
+    except BaseException:
+        if part_path.exists():
+            part_path.unlink()
+        raise
+
+    return StoredUpload(target, size, digest.hexdigest())
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file, reading it in chunks.
+
+    Args:
+        path: File path
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResumableUploadStore:
+    """
+    Server-side state of resumable uploads.
+
+    Each upload is a partial data file plus a small JSON sidecar holding the
+    declared filename, size and digest. The number of bytes received is the
+    size of the partial file, so the state is shared by all worker processes
+    and survives restarts.
+    """
+
+    def __init__(self, upload_dir: Path, max_bytes: int, chunk_size: int = 8 * 1024 * 1024):
+        """
+        Initialize the resumable upload store.
+
+        Args:
+            upload_dir: Upload directory (final files are moved here)
+            max_bytes: Maximum declared file size in bytes
+            chunk_size: Recommended chunk size returned to clients
+        """
+        self.upload_dir = Path(upload_dir)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _paths(self, upload_id: str):
+        """Get the sidecar and data paths of an upload."""
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except ValueError:
+            raise UploadNotFoundError(f"Upload {upload_id} not found")
+        directory = partial_dir(self.upload_dir)
+        return directory / f"{upload_id}.json", directory / f"{upload_id}.part"
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def create(self, filename: str, size: int, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start a resumable upload.
+
+        Args:
+            filename: Name of the file being uploaded
+            size: Total file size in bytes
+            sha256: Optional expected SHA-256 digest, checked on finalize
+
+        Returns:
+            Upload status dictionary
+
+        Raises:
+            UploadTooLargeError: If size exceeds the configured ceiling
+            ValueError: If size is not positive
+        """
+        if size <= 0:
+            raise ValueError("File is empty")
+        if size > self.max_bytes:
+            raise UploadTooLargeError(
+                f"File too large. Maximum size is {self.max_bytes / (1024 * 1024):.1f} MB"
+            )
+
+        upload_id = uuid.uuid4().hex
+        meta_path, part_path = self._paths(upload_id)
+        part_path.touch()
+        meta_path.write_text(json.dumps({
+            "upload_id": upload_id,
+            "filename": Path(filename).name,
+            "size": size,
+            "sha256": sha256.lower() if sha256 else None,
+            "created_at": time.time(),
+        }))
+
+        logger.info(f"Resumable upload {upload_id} started: {filename} ({size} bytes)")
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Get the state of an upload.
+
+        Args:
+            upload_id: Upload identifier
+
+        Returns:
+            Dictionary with upload_id, filename, size, received, chunk_size and complete
+
+        Raises:
+            UploadNotFoundError: If the upload does not exist
+        """
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            meta = json.loads(meta_path.read_text())
+            received = part_path.stat().st_size
+        except FileNotFoundError:
+            raise UploadNotFoundError(f"Upload {upload_id} not found")
+
+        return {
+            "upload_id": meta["upload_id"],
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "received": received,
+            "chunk_size": self.chunk_size,
+            "complete": received == meta["size"],
+        }
+
+    async def append(
+        self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Append a chunk to an upload.
+
+        Bytes are written as they arrive; if the connection drops, whatever
+        was written counts as received and the client resumes from there.
+
+        Args:
+            upload_id: Upload identifier
+            offset: Offset of the chunk, must equal the bytes received so far
+            chunks: Async iterator over the chunk's bytes
+
+        Returns:
+            Upload status dictionary
+
+        Raises:
+            UploadNotFoundError: If the upload does not exist
+            UploadOffsetError: If offset is not the current offset, or another
+                chunk is being written
+            UploadTooLargeError: If the chunk goes past the declared size
+        """
+        lock = self._lock(upload_id)
+        if lock.locked():
+            raise UploadOffsetError(
+                f"A chunk is already being written to upload {upload_id}",
+                self.status(upload_id)["received"],
+            )
+
+        async with lock:
+            state = self.status(upload_id)
+            if offset != state["received"]:
+                raise UploadOffsetError(
+                    f"Chunk offset {offset} does not match received bytes {state['received']}",
+                    state["received"],
+                )
+
+            _, part_path = self._paths(upload_id)
+            received = state["received"]
+            async with aiofiles.open(part_path, "ab") as out:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if received + len(chunk) > state["size"]:
+                        raise UploadTooLargeError(
+                            f"Chunk exceeds the declared file size of {state['size']} bytes"
+                        )
+                    await out.write(chunk)
+                    received += len(chunk)
+
+        return self.status(upload_id)
+
+    async def finalize(self, upload_id: str) -> StoredUpload:
+        """
+        Complete an upload and move it into the upload directory.
+
+        Args:
+            upload_id: Upload identifier
+
+        Returns:
+            StoredUpload with the final path, size and SHA-256 digest
+
+        Raises:
+            UploadNotFoundError: If the upload does not exist
+            ValueError: If bytes are missing or the digest does not match
+        """
+        async with self._lock(upload_id):
+            state = self.status(upload_id)
+            if not state["complete"]:
+                raise ValueError(
+                    f"Upload incomplete: received {state['received']} of {state['size']} bytes"
+                )
+
+            meta_path, part_path = self._paths(upload_id)
+            expected = json.loads(meta_path.read_text())["sha256"]
+            digest = await asyncio.to_thread(file_sha256, part_path)
+            if expected and digest != expected:
+                raise ValueError(f"SHA-256 mismatch: expected {expected}, got {digest}")
+
+            target = await asyncio.to_thread(
+                commit_upload, part_path, self.upload_dir, state["filename"], digest
+            )
+            meta_path.unlink()
+
+        self._locks.pop(upload_id, None)
+        logger.info(f"Resumable upload {upload_id} finalized as {target.name}")
+        return StoredUpload(target, state["size"], digest)
+
+    def abort(self, upload_id: str) -> bool:
+        """
+        Discard an upload.
+
+        Args:
+            upload_id: Upload identifier
+
+        Returns:
+            True if the upload existed
+        """
+        meta_path, part_path = self._paths(upload_id)
+        existed = meta_path.exists()
+        meta_path.unlink(missing_ok=True)
+        part_path.unlink(missing_ok=True)
+        self._locks.pop(upload_id, None)
+        return existed
+
+    def cleanup_stale(self, max_age_hours: int = 24) -> int:
+        """
+        Discard uploads that have not received data for a while.
+
+        Args:
+            max_age_hours: Maximum idle time in hours
+
+        Returns:
+            Number of uploads discarded
+        """
+        cutoff = time.time() - max_age_hours * 3600
+        removed = 0
+        for meta_path in partial_dir(self.upload_dir).glob("*.json"):
+            part_path = meta_path.with_suffix(".part")
+            last_write = part_path.stat().st_mtime if part_path.exists() else 0
+            if max(last_write, meta_path.stat().st_mtime) < cutoff:
+                removed += self.abort(meta_path.stem)
+        return removed
+
+
+# Global resumable upload store
+resumable_uploads = ResumableUploadStore(
+    INPUT_DIR,
+    max_bytes=UPLOAD_CONFIG["max_resumable_size_mb"] * 1024 * 1024,
+    chunk_size=UPLOAD_CONFIG["resumable_chunk_size_mb"] * 1024 * 1024,
+)
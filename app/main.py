@@ -4,6 +4,7 @@ Medical Report PDF Processor - FastAPI Web Application
 Main application entry point for the FastAPI web interface.
 """
 
+import asyncio
 import sys
 from pathlib import Path
 
@@ -21,7 +22,7 @@ from fastapi.responses import FileResponse
 from app import __version__
 from app.api import routes
 from app.core.tasks import cleanup_task
-import asyncio
+from app.core.executor import job_executor
 
 # Setup logging
 logging.basicConfig(
@@ -49,6 +50,9 @@ async def lifespan(app: FastAPI):
     # Start background cleanup task
     cleanup_task_handle = asyncio.create_task(cleanup_task())
 
+    # Pick up jobs interrupted by the previous shutdown or crash
+    await routes.resume_interrupted_jobs()
+
     logger.info("API started successfully")
 
     yield
@@ -60,6 +64,7 @@ async def lifespan(app: FastAPI):
         await cleanup_task_handle
     except asyncio.CancelledError:
         pass
+    job_executor.shutdown()
     logger.info("API shutdown complete")
 
 
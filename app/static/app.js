@@ -3,8 +3,13 @@
 // State
 let uploadedFile = null;
 let currentJobId = null;
-let websocket = null;
 let currentPages = [];
+let jobEvents = null;
+const jobEventHandlers = {};  // job_id -> handler for events of that job
+const jobStatuses = {};  // job_id -> last status seen on the event stream
+const clientId = getClientId();
+const JOB_LIST_LIMIT = 50;  // Jobs shown in the history
+const PAGE_LIST_BATCH = 1000;  // Pages fetched per request for the selection grid
 
 // DOM Elements
 const uploadArea = document.getElementById('uploadArea');
@@ -44,6 +49,7 @@ const selectionCount = document.getElementById('selectionCount');
 function init() {
     setupEventListeners();
     checkHealth();
+    connectJobEvents();
     loadJobs();
     loadAvailableConfigs();
 
@@ -284,7 +290,8 @@ async function startProcessing() {
         const response = await fetch(`/api/process?filename=${encodeURIComponent(uploadedFile)}`, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'X-Client-Id': clientId
             },
             body: JSON.stringify(config)
         });
@@ -301,11 +308,8 @@ async function startProcessing() {
         progressSection.style.display = 'block';
         progressSection.scrollIntoView({ behavior: 'smooth' });
 
-        // Connect WebSocket for real-time updates
-        connectWebSocket(currentJobId);
-
-        // Also poll status as backup
-        pollJobStatus(currentJobId);
+        // Follow the job on the shared event stream
+        followJob(currentJobId);
 
     } catch (error) {
         console.error('Processing error:', error);
@@ -315,55 +319,88 @@ async function startProcessing() {
     }
 }
 
-function connectWebSocket(jobId) {
-    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/api/ws/${jobId}`;
+function getClientId() {
+    // Identifies this browser's jobs on the shared event stream
+    let id = localStorage.getItem('clientId');
+    if (!id) {
+        id = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+        localStorage.setItem('clientId', id);
+    }
+    return id;
+}
+
+function connectJobEvents() {
+    // One Server-Sent Events connection carries the events of all our jobs;
+    // EventSource reconnects by itself and the server resends current state
+    jobEvents = new EventSource(`/api/events?client_id=${encodeURIComponent(clientId)}`);
 
-    websocket = new WebSocket(wsUrl);
+    jobEvents.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        const handler = jobEventHandlers[data.job_id];
+        if (handler) handler(data);
 
-    websocket.onopen = () => {
-        console.log('WebSocket connected');
+        // Refresh the jobs list when a job changes status
+        if (jobStatuses[data.job_id] !== data.status) {
+            jobStatuses[data.job_id] = data.status;
+            scheduleJobsRefresh();
+        }
     };
 
-    websocket.onmessage = (event) => {
-        const data = JSON.parse(event.data);
-        updateProgress(data);
+    jobEvents.onerror = () => {
+        console.warn('Job event stream interrupted, reconnecting...');
     };
+}
+
+let jobsRefreshTimer = null;
+function scheduleJobsRefresh() {
+    clearTimeout(jobsRefreshTimer);
+    jobsRefreshTimer = setTimeout(loadJobs, 500);
+}
+
+// Statuses in which a job has ended
+const FINAL_STATUSES = ['completed', 'failed', 'cancelled'];
 
-    websocket.onerror = (error) => {
-        console.error('WebSocket error:', error);
+async function followJob(jobId) {
+    let finished = false;
+
+    const finish = async (status) => {
+        if (finished) return;
+        finished = true;
+        delete jobEventHandlers[jobId];
+
+        // One request for the result once the job has ended
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+
+        if (status === 'completed') {
+            showResults(await withPages(data));
+            processBtn.disabled = false;
+            processBtn.textContent = 'Process Another PDF';
+        } else {
+            showError(status === 'cancelled' ? 'the job was cancelled' : data.error);
+            processBtn.disabled = false;
+            processBtn.textContent = 'Try Again';
+        }
     };
 
-    websocket.onclose = () => {
-        console.log('WebSocket closed');
+    jobEventHandlers[jobId] = (data) => {
+        if (FINAL_STATUSES.includes(data.status)) {
+            finish(data.status);
+        } else {
+            updateProgress(data);
+        }
     };
-}
 
-async function pollJobStatus(jobId) {
-    const interval = setInterval(async () => {
-        try {
-            const response = await fetch(`/api/jobs/${jobId}`);
-            const data = await response.json();
-
-            if (data.status === 'completed') {
-                clearInterval(interval);
-                if (websocket) websocket.close();
-                showResults(data.result);
-                processBtn.disabled = false;
-                processBtn.textContent = 'Process Another PDF';
-                loadJobs();
-            } else if (data.status === 'failed') {
-                clearInterval(interval);
-                if (websocket) websocket.close();
-                showError(data.error);
-                processBtn.disabled = false;
-                processBtn.textContent = 'Try Again';
-                loadJobs();
-            }
-        } catch (error) {
-            console.error('Status poll error:', error);
+    // The job may have ended before the handler was registered
+    try {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+        if (FINAL_STATUSES.includes(data.status)) {
+            finish(data.status);
         }
-    }, 2000);
+    } catch (error) {
+        console.error('Job status error:', error);
+    }
 }
 
 function updateProgress(data) {
@@ -486,6 +523,21 @@ function showError(error) {
     alert(`Processing failed: ${error}`);
 }
 
+// Attach the page list (served separately, in pages) to a job's result
+async function withPages(job) {
+    const result = job.result;
+    if (!result || !job.pages_url) return result;
+
+    const pages = [];
+    while (pages.length < job.page_count) {
+        const response = await fetch(`${job.pages_url}?offset=${pages.length}&limit=${PAGE_LIST_BATCH}`);
+        const data = await response.json();
+        if (data.pages.length === 0) break;
+        pages.push(...data.pages);
+    }
+    return { ...result, pages };
+}
+
 function downloadReport(filename) {
     window.location.href = `/api/download/${filename}`;
 }
@@ -493,7 +545,7 @@ function downloadReport(filename) {
 // Jobs History
 async function loadJobs() {
     try {
-        const response = await fetch('/api/jobs');
+        const response = await fetch(`/api/jobs?limit=${JOB_LIST_LIMIT}`);
         const data = await response.json();
 
         if (data.jobs.length === 0) {
@@ -514,7 +566,7 @@ async function loadJobs() {
                 </div>
                 ${job.result ? `
                     <div class="job-actions">
-                        <button class="btn-view-details" onclick='viewJobDetails(${JSON.stringify(job).replace(/'/g, "&apos;")})'>
+                        <button class="btn-view-details" onclick="viewJobDetails('${job.job_id}')">
                             View Details
                         </button>
                     </div>
@@ -526,9 +578,15 @@ async function loadJobs() {
     }
 }
 
-function viewJobDetails(job) {
-    if (job.result) {
-        showResults(job.result);
+async function viewJobDetails(jobId) {
+    try {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const job = await response.json();
+        if (job.result) {
+            showResults(await withPages(job));
+        }
+    } catch (error) {
+        console.error('Error loading job details:', error);
     }
 }
 
@@ -771,6 +829,26 @@ async function loadSelectedPreset() {
 }
 
 // Page Selection Functions
+function renderPagePreview(page) {
+    // Previews are tiled into a few sprite sheets; fall back to one image per page
+    if (!page.sprite) {
+        return `<img src="${page.preview_url}" alt="Page ${page.page_number}" class="page-card-preview" loading="lazy">`;
+    }
+
+    const s = page.sprite;
+    const offset = (pos, size, sheetSize) => sheetSize > size ? pos / (sheetSize - size) * 100 : 0;
+    return `
+        <div class="page-card-preview">
+            <div class="page-card-sprite" role="img" aria-label="Page ${page.page_number}"
+                 style="aspect-ratio: ${s.width} / ${s.height};
+                        background-image: url('${s.url}');
+                        background-size: ${s.sheet_width / s.width * 100}% ${s.sheet_height / s.height * 100}%;
+                        background-position: ${offset(s.x, s.width, s.sheet_width)}% ${offset(s.y, s.height, s.sheet_height)}%;">
+            </div>
+        </div>
+    `;
+}
+
 function showPageSelection(result) {
     console.log('📄 showPageSelection called with result:', result);
     currentPages = result.pages || [];
@@ -790,7 +868,7 @@ function showPageSelection(result) {
                        data-page-index="${page.page_index}"
                        ${!page.is_duplicate ? 'checked' : ''}>
             </div>
-            <img src="${page.preview_url}" alt="Page ${page.page_number}" class="page-card-preview" loading="lazy">
+            ${renderPagePreview(page)}
             <div>
                 ${page.is_duplicate
                     ? `<span class="page-card-badge badge-duplicate">Duplicate of Page ${page.duplicate_of + 1}</span>`
@@ -907,6 +985,14 @@ function selectOnlyUniques() {
     updateSelectionCount();
 }
 
+function followGenerationProgress(jobId, btn) {
+    jobEventHandlers[jobId] = (data) => {
+        if (btn && btn.disabled && data.generation) {
+            btn.textContent = `Generating PDF... ${data.generation.progress}%`;
+        }
+    };
+}
+
 async function generatePdfWithSelection(event) {
     console.log('🔥 generatePdfWithSelection CALLED!');
     console.log('Event:', event);
@@ -933,6 +1019,9 @@ async function generatePdfWithSelection(event) {
         return;
     }
 
+    // Generation runs as a background job; follow its progress on the button
+    followGenerationProgress(currentJobId, btn);
+
     try {
         if (btn) {
             btn.disabled = true;
@@ -1002,6 +1091,7 @@ async function generatePdfWithSelection(event) {
         console.error('Error stack:', error.stack);
         alert(`Failed to generate PDF: ${error.message}`);
     } finally {
+        delete jobEventHandlers[currentJobId];
         if (btn) {
             btn.disabled = false;
             btn.textContent = 'Generate PDF with Selected Pages';
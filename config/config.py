@@ -101,6 +101,12 @@ BLANK_DETECTION_CONFIG = {
 # }
 REPORT_SPLITTING_CONFIG = {
     "enabled": False,  # Report splitting disabled
+    # OCR settings, passed to ReportSplitter (and its OCR worker pool)
+    "ocr_backend": get_env("OCR_BACKEND", "auto"),  # auto, tesserocr or cli
+    "ocr_workers": get_env("OCR_WORKERS", 4, int),  # Persistent Tesseract workers
+    "ocr_batch_size": get_env("OCR_BATCH_SIZE", 16, int),  # Header crops per tesseract run
+    "ocr_dpi": get_env("OCR_DPI", 150, int),  # Header clips are rendered at this DPI for OCR
+    "heuristic_dpi": get_env("HEURISTIC_DPI", 72, int),  # Header clips for the layout comparison
 }
 
 # Duplicate Detection settings
@@ -111,6 +117,10 @@ DUPLICATE_DETECTION_CONFIG = {
     "similarity_threshold": get_env("SIMILARITY_THRESHOLD", 0.95, float),
     "compare_first_page_only": False,  # Only compare first pages of reports
     "hamming_distance_threshold": get_env("HAMMING_DISTANCE_THRESHOLD", 5, int),
+    # Optional verification stage for candidate pairs: None, "phash" or "ncc"
+    "verify_method": get_env("DUPLICATE_VERIFY_METHOD", None),
+    "verify_hash_size": get_env("DUPLICATE_VERIFY_HASH_SIZE", 16, int),
+    "ncc_threshold": get_env("DUPLICATE_NCC_THRESHOLD", 0.95, float),
 }
 
 # File Management settings
@@ -122,6 +132,14 @@ FILE_MANAGEMENT_CONFIG = {
     "keep_temp_files": get_env("KEEP_TEMP_FILES", False, bool),
 }
 
+# Upload settings
+UPLOAD_CONFIG = {
+    "max_file_size_mb": get_env("MAX_UPLOAD_SIZE_MB", 100, int),  # Maximum size of a single upload
+    "chunk_size_kb": get_env("UPLOAD_CHUNK_SIZE_KB", 1024, int),  # Bytes streamed to disk per chunk
+    "max_resumable_size_mb": get_env("MAX_RESUMABLE_UPLOAD_SIZE_MB", 4096, int),  # Resumable upload ceiling
+    "resumable_chunk_size_mb": get_env("RESUMABLE_CHUNK_SIZE_MB", 8, int),  # Recommended chunk size
+}
+
 # Logging settings
 LOGGING_CONFIG = {
     "level": get_env("LOG_LEVEL", "INFO"),
@@ -130,11 +148,64 @@ LOGGING_CONFIG = {
     "console": get_env("LOG_CONSOLE", True, bool),
 }
 
+# Job store settings
+# "sqlite" is shared by all uvicorn workers on a host; "memory" is per-process (tests)
+JOB_STORE_CONFIG = {
+    "backend": get_env("JOB_STORE_BACKEND", "sqlite"),
+    "path": str(BASE_DIR / get_env("JOB_STORE_PATH", "temp/jobs.db")),
+}
+
+# Feature cache: per-page metrics and hashes, reused when only thresholds change
+FEATURE_CACHE_CONFIG = {
+    "enabled": get_env("FEATURE_CACHE_ENABLED", True, bool),
+    "path": str(BASE_DIR / get_env("FEATURE_CACHE_DIR", "temp/feature_cache")),
+    "max_size_mb": get_env("FEATURE_CACHE_MAX_SIZE_MB", 512, int),  # Total size bound
+}
+
+# Result cache: results memoised by (input digest, config digest)
+RESULT_CACHE_CONFIG = {
+    "enabled": get_env("RESULT_CACHE_ENABLED", True, bool),
+    "path": str(BASE_DIR / get_env("RESULT_CACHE_DIR", "temp/result_cache")),
+    "max_size_mb": get_env("RESULT_CACHE_MAX_SIZE_MB", 2048, int),  # Total size bound
+    "max_age_hours": get_env("RESULT_CACHE_MAX_AGE_HOURS", 168, int),  # Unused entries expire
+}
+
+# Job checkpoints: analysed page batches, so interrupted jobs resume after a restart
+CHECKPOINT_CONFIG = {
+    "enabled": get_env("CHECKPOINTS_ENABLED", True, bool),
+    "path": str(BASE_DIR / get_env("CHECKPOINT_DIR", "temp/checkpoints")),
+}
+
+# Page previews: thumbnails rendered from the source PDF on first request
+PREVIEW_CONFIG = {
+    "path": str(BASE_DIR / get_env("PREVIEW_CACHE_DIR", "temp/previews")),
+    "max_size_mb": get_env("PREVIEW_CACHE_MAX_SIZE_MB", 256, int),  # Total size bound
+    "max_width": 300,  # Thumbnail size in pixels
+    "max_height": 400,
+    "quality": get_env("PREVIEW_QUALITY", 85, int),  # JPEG quality
+    "prewarm_pages": get_env("PREVIEW_PREWARM_PAGES", 24, int),  # Rendered ahead (0 = off)
+    "sheet_pages": get_env("PREVIEW_SHEET_PAGES", 50, int),  # Thumbnails per sprite sheet
+    "sheet_columns": 10,
+    "sheet_format": get_env("PREVIEW_SHEET_FORMAT", "WEBP"),  # WEBP or JPEG
+}
+
 # Performance settings
 PERFORMANCE_CONFIG = {
-    "max_workers": 4,  # Number of parallel workers for processing
+    "max_workers": get_env("MAX_WORKERS", 4, int),  # Number of parallel workers for processing
     "batch_size": 10,  # Number of pages to process in a batch
-    "memory_limit_mb": 1024,  # Maximum memory usage in MB
+    "memory_limit_mb": get_env("MEMORY_LIMIT_MB", 1024, int),  # Host memory budget of running jobs (0 = no limit)
+    "web_workers": get_env("WEB_CONCURRENCY", 1, int),  # uvicorn workers sharing the budget
+    "max_concurrent_jobs": get_env("MAX_CONCURRENT_JOBS", 2, int),  # Jobs processed at once
+    "max_queued_jobs": get_env("MAX_QUEUED_JOBS", 20, int),  # Jobs waiting for a free slot
+    "executor": get_env("JOB_EXECUTOR", "process"),  # Job executor: process or thread
+    "small_job_max_pages": get_env("SMALL_JOB_MAX_PAGES", 50, int),  # Fast-lane page limit
+    "fast_lane_slots": get_env("FAST_LANE_SLOTS", 1, int),  # Slots reserved for small jobs
+    "event_poll_interval": get_env("EVENT_POLL_INTERVAL", 2.0, float),  # Job event store polls
+    "cancel_dir": str(BASE_DIR / get_env("JOB_CANCEL_DIR", "temp/cancel")),  # Cancellation flags
+    "page_store_mb": get_env("PAGE_STORE_MEMORY_MB", 256, int),  # Rendered pages kept in RAM per job
+    "spill_dir": str(BASE_DIR / get_env("PAGE_SPILL_DIR", "temp/spill")),  # Pages beyond it, memory-mapped
+    "analyze_workers": get_env("PIPELINE_ANALYZE_WORKERS", 2, int),  # Threads analysing pages per job
+    "pipeline_queue_size": get_env("PIPELINE_QUEUE_SIZE", 4, int),  # Pages queued between pipeline stages
 }
 
 
@@ -158,8 +229,13 @@ def get_config():
         "report_splitting": REPORT_SPLITTING_CONFIG,
         "duplicate_detection": DUPLICATE_DETECTION_CONFIG,
         "file_management": FILE_MANAGEMENT_CONFIG,
+        "upload": UPLOAD_CONFIG,
         "logging": LOGGING_CONFIG,
         "performance": PERFORMANCE_CONFIG,
+        "job_store": JOB_STORE_CONFIG,
+        "result_cache": RESULT_CACHE_CONFIG,
+        "feature_cache": FEATURE_CACHE_CONFIG,
+        "preview": PREVIEW_CONFIG,
         "directories": {
             "base": BASE_DIR,
             "input": INPUT_DIR,
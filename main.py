@@ -24,6 +24,17 @@ from src.image_analyzer import ImageAnalyzer
 # from src.report_splitter import ReportSplitter  # COMMENTED OUT: Report splitting disabled
 from src.duplicate_detector import DuplicateDetector
 from src.file_manager import FileManager
+from src.page_store import PageStore
+from src.page_table import PageTable
+from src.pipeline import (
+    AnalyzeStage,
+    BlankFilterStage,
+    DedupeStage,
+    Pipeline,
+    PipelineEvent,
+    WriteStage,
+    render_pages,
+)
 
 
 def setup_logging(config: dict):
@@ -90,76 +101,75 @@ def process_pdf(input_path: str, output_dir: str, config: dict) -> dict:
         "error": None,
     }
 
+    # Rendered pages; beyond the RAM budget they spill to a memory-mapped file
+    page_store = PageStore(
+        config["performance"]["page_store_mb"], config["performance"]["spill_dir"]
+    )
+
     try:
-        # Step 1: Extract pages from PDF
-        logger.info("Step 1/4: Extracting pages from PDF...")
         pdf_processor = PDFProcessor(**config["pdf"])
-        pages = pdf_processor.extract_pages(input_path)
-        stats["total_pages"] = len(pages)
-        logger.info(f"Extracted {len(pages)} pages")
-
-        # Step 2: Remove blank pages
-        logger.info("Step 2/4: Detecting and removing blank pages...")
         image_analyzer = ImageAnalyzer(**config["blank_detection"])
-        non_blank_pages, non_blank_indices, metrics = image_analyzer.filter_blank_pages(pages)
-        stats["non_blank_pages"] = len(non_blank_pages)
-        stats["blank_pages"] = stats["total_pages"] - stats["non_blank_pages"]
-        logger.info(
-            f"Removed {stats['blank_pages']} blank pages, "
-            f"{stats['non_blank_pages']} pages remaining"
-        )
-
-        # Check if any pages remain
-        if not non_blank_pages:
-            logger.warning("No non-blank pages found. Nothing to process.")
-            stats["error"] = "No non-blank pages found"
-            return stats
+        page_table = PageTable(pdf_processor.get_page_count(input_path))
+        stats["total_pages"] = len(page_table)
 
-        # Step 3: Detect and remove duplicate pages (conditional)
+        # Check duplicate detection setting
         duplicate_detection_enabled = config.get("duplicate_detection", {}).get("enabled", True)
-
+        duplicate_detector = None
         if duplicate_detection_enabled:
-            logger.info("Step 3/4: Detecting duplicate pages...")
             # Remove 'enabled' key before passing to DuplicateDetector
             dedup_config = {k: v for k, v in config["duplicate_detection"].items() if k != "enabled"}
             duplicate_detector = DuplicateDetector(**dedup_config)
 
-            # Treat each page as a separate "report" for duplicate detection
-            page_list = [[page] for page in non_blank_pages]
-
-            # Find duplicates and get unique pages
-            unique_indices, duplicate_pairs = duplicate_detector.find_duplicates(page_list)
-            unique_pages = [non_blank_pages[i] for i in unique_indices]
-
-            stats["unique_pages"] = len(unique_pages)
-            stats["duplicate_pages"] = stats["non_blank_pages"] - stats["unique_pages"]
-            logger.info(
-                f"Found {stats['duplicate_pages']} duplicate pages, "
-                f"{stats['unique_pages']} unique pages remaining"
-            )
-        else:
-            logger.info("Step 3/4: Skipping duplicate detection (disabled)")
-            unique_pages = non_blank_pages
-            stats["unique_pages"] = len(unique_pages)
-            stats["duplicate_pages"] = 0
-
-        # Step 4: Save processed PDF
-        logger.info("Step 4/4: Saving processed PDF...")
         file_manager = FileManager(output_dir, **config["file_management"])
+        writer = WriteStage(
+            page_table, file_manager, page_store.images, original_filename,
+            duplicate_detection_enabled, dpi=pdf_processor.dpi,
+        )
+        stages = [
+            AnalyzeStage(
+                page_table, image_analyzer, duplicate_detector,
+                workers=config["performance"]["analyze_workers"],
+            ),
+            BlankFilterStage(page_table, image_analyzer),
+        ]
+        if duplicate_detection_enabled:
+            stages.append(DedupeStage(page_table, duplicate_detector, page_store.images))
+        stages.append(writer)
+
+        def on_event(event: PipelineEvent):
+            """Log the end of each step."""
+            if event.index is not None:
+                return
+            stats.update(page_table.summary())
+            if event.stage == AnalyzeStage.name:
+                logger.info(f"Step 1/4: Extracted and analysed {len(page_table)} pages")
+            elif event.stage == BlankFilterStage.name:
+                logger.info(
+                    f"Step 2/4: Removed {stats['blank_pages']} blank pages, "
+                    f"{stats['non_blank_pages']} pages remaining"
+                )
+                if not duplicate_detection_enabled:
+                    logger.info("Step 3/4: Skipping duplicate detection (disabled)")
+            elif event.stage == DedupeStage.name:
+                logger.info(
+                    f"Step 3/4: Found {stats['duplicate_pages']} duplicate pages, "
+                    f"{stats['unique_pages']} unique pages remaining"
+                )
+            elif event.stage == WriteStage.name and writer.saved:
+                logger.info("Step 4/4: Saved processed PDF")
+
+        # Render, analyse, filter, deduplicate and save (see src.pipeline)
+        logger.info("Processing pages...")
+        pipeline = Pipeline(stages, config["performance"]["pipeline_queue_size"], on_event)
+        pipeline.run(render_pages(pdf_processor, input_path, page_store), len(page_table))
 
-        # Create metadata for the processed PDF
-        metadata = {
-            "original_page_indices": list(range(len(unique_pages))),
-            "total_pages": stats["total_pages"],
-            "blank_pages_removed": stats["blank_pages"],
-            "duplicate_pages_removed": stats["duplicate_pages"],
-            "processing_mode": "blank_removal_and_deduplication" if duplicate_detection_enabled else "blank_removal_only",
-        }
+        # Check if any pages remain
+        if writer.saved is None:
+            logger.warning("No non-blank pages found. Nothing to process.")
+            stats["error"] = "No non-blank pages found"
+            return stats
 
-        # Save as single processed PDF
-        saved = file_manager.save_report(unique_pages, 1, metadata, original_filename)
-        saved_files = [saved]
-        stats["saved_files"] = saved_files
+        stats["saved_files"] = [writer.saved]
 
         # Create processing log
         file_manager.create_processing_log(stats)
@@ -182,6 +192,9 @@ def process_pdf(input_path: str, output_dir: str, config: dict) -> dict:
         stats["error"] = str(e)
         stats["success"] = False
 
+    finally:
+        page_store.close()
+
     return stats
 
 
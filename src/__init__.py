@@ -12,6 +12,12 @@ from .image_analyzer import ImageAnalyzer
 from .report_splitter import ReportSplitter, Report
 from .duplicate_detector import DuplicateDetector
 from .file_manager import FileManager
+from .ocr_pool import OCRWorkerPool
+from .feature_cache import FeatureCache
+from .pdf_writer import StreamingPDFWriter
+from .page_store import PageStore
+from .page_table import PageTable
+from .pipeline import Pipeline
 
 __all__ = [
     "PDFProcessor",
@@ -20,4 +26,10 @@ __all__ = [
     "Report",
     "DuplicateDetector",
     "FileManager",
+    "OCRWorkerPool",
+    "FeatureCache",
+    "StreamingPDFWriter",
+    "PageStore",
+    "PageTable",
+    "Pipeline",
 ]
@@ -3,15 +3,115 @@ Duplicate Detector module for identifying duplicate reports using perceptual has
 
 This module uses imagehash library to generate perceptual hashes and compare
 reports to identify duplicates based on visual similarity.
+
+Detection can optionally run as a two-stage cascade: the configured (cheap)
+hash generates candidate pairs, and a more expensive verification step
+(a larger phash or normalised cross-correlation of small thumbnails) confirms
+them. The verification stage only runs on pages that appear in a candidate pair.
 """
 
 import logging
-from typing import List, Tuple, Set, Dict
+from typing import List, Tuple, Dict, Optional, NamedTuple, Callable, Sequence
+import numpy as np
 from PIL import Image
 import imagehash
 
 logger = logging.getLogger(__name__)
 
+# Number of set bits for every byte value, used for vectorised Hamming distances
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class SimilarityPairs(NamedTuple):
+    """Sparse (COO) list of report pairs with their Hamming distances."""
+
+    rows: np.ndarray
+    cols: np.ndarray
+    distances: np.ndarray
+
+
+def pack_hashes(hashes: List[Optional[imagehash.ImageHash]]) -> np.ndarray:
+    """
+    Pack ImageHash bit arrays into a compact uint8 matrix.
+
+    Args:
+        hashes: List of ImageHash objects (None entries are allowed)
+
+    Returns:
+        (n, bytes_per_hash + 1) uint8 matrix; the last column is 1 for valid rows
+    """
+    template = next((h for h in hashes if h is not None), None)
+    nbytes = 0 if template is None else (template.hash.size + 7) // 8
+    packed = np.zeros((len(hashes), nbytes + 1), dtype=np.uint8)
+
+    for idx, h in enumerate(hashes):
+        if h is not None:
+            packed[idx, :nbytes] = np.packbits(h.hash.flatten())
+            packed[idx, nbytes] = 1
+
+    return packed
+
+
+def packed_valid_mask(packed: np.ndarray) -> np.ndarray:
+    """Return a boolean mask of rows in a packed hash matrix that hold a hash."""
+    return packed[:, -1].astype(bool)
+
+
+def hash_bit_count(hashes: List[Optional[imagehash.ImageHash]]) -> int:
+    """Return the number of bits per hash (0 if no hash is available)."""
+    template = next((h for h in hashes if h is not None), None)
+    return 0 if template is None else int(template.hash.size)
+
+
+def hamming_distances(row: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """
+    Compute Hamming distances between one packed hash and many others.
+
+    Args:
+        row: Packed hash (one row of pack_hashes output)
+        others: Packed hashes to compare against
+
+    Returns:
+        uint16 array of Hamming distances
+    """
+    xor = np.bitwise_xor(others[:, :-1], row[:-1])
+    return _POPCOUNT_TABLE[xor].sum(axis=1, dtype=np.uint16)
+
+
+def cluster_pairs(n: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Merge pairs into groups with union-find.
+
+    Args:
+        n: Number of items
+        rows: First item of each pair
+        cols: Second item of each pair
+
+    Returns:
+        int32 array mapping every item to its group's lowest index
+    """
+    parent = np.arange(n, dtype=np.int32)
+
+    def find(x: int) -> int:
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for a, b in zip(rows, cols):
+        root_a, root_b = find(int(a)), find(int(b))
+        if root_a != root_b:
+            # Keep the lowest index as the canonical representative
+            if root_a < root_b:
+                parent[root_b] = root_a
+            else:
+                parent[root_a] = root_b
+
+    return np.array([find(i) for i in range(n)], dtype=np.int32)
+
 
 class DuplicateDetector:
     """
@@ -25,6 +125,11 @@ class DuplicateDetector:
         similarity_threshold: float = 0.95,
         hamming_distance_threshold: int = 5,
         compare_first_page_only: bool = False,
+        verify_method: Optional[str] = None,
+        verify_hash_size: int = 16,
+        verify_distance_threshold: Optional[int] = None,
+        ncc_threshold: float = 0.95,
+        ncc_size: int = 32,
     ):
         """
         Initialize the Duplicate Detector.
@@ -35,6 +140,15 @@ class DuplicateDetector:
             similarity_threshold: Similarity ratio above this = duplicate (0-1)
             hamming_distance_threshold: Max Hamming distance for duplicates
             compare_first_page_only: Only compare first pages of reports
+            verify_method: Optional verification stage for candidate pairs
+                (None, "phash" or "ncc")
+            verify_hash_size: Hash size for the "phash" verification stage
+            verify_distance_threshold: Max Hamming distance in the "phash"
+                verification stage (default: candidate threshold scaled to
+                the larger hash)
+            ncc_threshold: Min normalised cross-correlation for the "ncc"
+                verification stage (-1 to 1)
+            ncc_size: Thumbnail edge length for the "ncc" verification stage
         """
         self.hash_algorithm = hash_algorithm
         self.hash_size = hash_size
@@ -45,9 +159,27 @@ class DuplicateDetector:
         # Select hash function
         self.hash_func = self._get_hash_function(hash_algorithm)
 
+        # Verification stage (cascade)
+        if isinstance(verify_method, str) and verify_method.lower() in ("", "none"):
+            verify_method = None
+        if verify_method not in (None, "phash", "ncc"):
+            raise ValueError(
+                f"Unsupported verify method: {verify_method}. "
+                f"Choose from [None, 'phash', 'ncc']"
+            )
+        self.verify_method = verify_method
+        self.verify_hash_size = verify_hash_size
+        if verify_distance_threshold is None:
+            scale = (verify_hash_size / hash_size) ** 2
+            verify_distance_threshold = int(round(hamming_distance_threshold * scale))
+        self.verify_distance_threshold = verify_distance_threshold
+        self.ncc_threshold = ncc_threshold
+        self.ncc_size = ncc_size
+
         logger.info(
             f"DuplicateDetector initialized: algorithm={hash_algorithm}, "
-            f"hash_size={hash_size}, threshold={hamming_distance_threshold}"
+            f"hash_size={hash_size}, threshold={hamming_distance_threshold}, "
+            f"verify_method={verify_method}"
         )
 
     def _get_hash_function(self, algorithm: str):
@@ -120,6 +252,57 @@ class DuplicateDetector:
                 return hashes[0]  # For now, use first page hash
                 # TODO: Implement proper multi-page hash combination
 
+    def compute_verification_feature(self, pages: List[Image.Image]):
+        """
+        Compute the expensive verification feature for a report.
+
+        Like compute_report_hash, only the first page is used.
+
+        Args:
+            pages: List of PIL Images representing report pages
+
+        Returns:
+            ImageHash for "phash" verification, or a zero-mean, unit-norm
+            float32 vector (None for a flat page) for "ncc" verification
+        """
+        if not pages:
+            raise ValueError("Cannot compute verification feature for empty report")
+
+        page = pages[0]
+        if self.verify_method == "phash":
+            return imagehash.phash(page, hash_size=self.verify_hash_size)
+
+        thumb = page.convert("L").resize((self.ncc_size, self.ncc_size), Image.BILINEAR)
+        vector = np.asarray(thumb, dtype=np.float32).ravel()
+        vector = vector - vector.mean()
+        norm = np.linalg.norm(vector)
+        if norm < 1e-6:
+            return None
+        return vector / norm
+
+    def verify_pair(self, feature1, feature2) -> Tuple[bool, float]:
+        """
+        Confirm a candidate pair using the verification features.
+
+        Args:
+            feature1: Verification feature of the first report
+            feature2: Verification feature of the second report
+
+        Returns:
+            Tuple of (confirmed: bool, score: float)
+        """
+        if self.verify_method == "phash":
+            distance = feature1 - feature2
+            max_distance = len(feature1.hash.flatten())
+            return distance <= self.verify_distance_threshold, 1 - (distance / max_distance)
+
+        # Flat pages carry no structure to correlate; two flat pages match
+        if feature1 is None or feature2 is None:
+            score = 1.0 if feature1 is None and feature2 is None else 0.0
+        else:
+            score = float(np.dot(feature1, feature2))
+        return score >= self.ncc_threshold, score
+
     def are_duplicates(
         self, hash1: imagehash.ImageHash, hash2: imagehash.ImageHash
     ) -> Tuple[bool, int, float]:
@@ -150,6 +333,162 @@ class DuplicateDetector:
 
         return is_duplicate, hamming_dist, similarity
 
+    def compute_page_hashes(
+        self,
+        pages: Sequence[Image.Image],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Optional[imagehash.ImageHash]]:
+        """
+        Compute the hash of each page, treating every page as a one-page report.
+
+        Pages are taken one at a time, so a lazy sequence (e.g. from
+        PageStore.images) is never loaded all at once.
+
+        Args:
+            pages: Sequence of PIL Images
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
+
+        Returns:
+            List of ImageHash objects (None where hashing failed)
+        """
+        hashes = []
+        for idx, page in enumerate(pages):
+            try:
+                hashes.append(self.compute_report_hash([page]))
+            except Exception as e:
+                logger.error(f"Error computing hash for page {idx}: {e}")
+                hashes.append(None)
+
+            if progress_callback:
+                progress_callback(idx + 1, len(pages))
+
+        return hashes
+
+    def compute_hashes(
+        self,
+        report_pages_list: List[List[Image.Image]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Optional[imagehash.ImageHash]]:
+        """
+        Compute report hashes for a list of reports.
+
+        Args:
+            report_pages_list: List of reports, where each report is a list of pages
+            progress_callback: Optional callback(reports_done, total_reports) called
+                after each report
+
+        Returns:
+            List of ImageHash objects (None where hashing failed)
+        """
+        hashes = []
+        for idx, pages in enumerate(report_pages_list):
+            try:
+                hashes.append(self.compute_report_hash(pages))
+            except Exception as e:
+                logger.error(f"Error computing hash for report {idx}: {e}")
+                hashes.append(None)
+
+            if progress_callback:
+                progress_callback(idx + 1, len(report_pages_list))
+        return hashes
+
+    def find_candidate_pairs(
+        self, packed: np.ndarray, max_distance: int
+    ) -> SimilarityPairs:
+        """
+        Find all pairs of packed hashes within a Hamming distance cap.
+
+        Args:
+            packed: Packed hash matrix from pack_hashes
+            max_distance: Maximum Hamming distance to keep
+
+        Returns:
+            SimilarityPairs in COO form with row < col
+        """
+        valid = packed_valid_mask(packed)
+        rows, cols, dists = [], [], []
+
+        for i in range(len(packed) - 1):
+            if not valid[i]:
+                continue
+            row_dist = hamming_distances(packed[i], packed[i + 1:])
+            hits = np.nonzero((row_dist <= max_distance) & valid[i + 1:])[0]
+            if hits.size:
+                rows.append(np.full(hits.size, i, dtype=np.int32))
+                cols.append((hits + i + 1).astype(np.int32))
+                dists.append(row_dist[hits])
+
+        if not rows:
+            empty = np.empty(0, dtype=np.int32)
+            return SimilarityPairs(empty, empty.copy(), np.empty(0, dtype=np.uint16))
+
+        return SimilarityPairs(
+            np.concatenate(rows), np.concatenate(cols), np.concatenate(dists)
+        )
+
+    def find_duplicate_pairs(
+        self,
+        report_pages_list: List[List[Image.Image]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[SimilarityPairs, int]:
+        """
+        Find confirmed duplicate pairs, running the verification cascade if enabled.
+
+        Args:
+            report_pages_list: List of reports, where each report is a list of pages
+            progress_callback: Optional callback(reports_hashed, total_reports)
+
+        Returns:
+            Tuple of (confirmed SimilarityPairs, number of hash bits)
+        """
+        hashes = self.compute_hashes(report_pages_list, progress_callback)
+        pairs = self.find_packed_duplicate_pairs(
+            pack_hashes(hashes), report_pages_list.__getitem__
+        )
+        return pairs, hash_bit_count(hashes)
+
+    def find_packed_duplicate_pairs(
+        self,
+        packed: np.ndarray,
+        report_loader: Optional[Callable[[int], List[Image.Image]]] = None,
+    ) -> SimilarityPairs:
+        """
+        Find confirmed duplicate pairs from precomputed packed hashes.
+
+        Args:
+            packed: Packed hashes from pack_hashes
+            report_loader: Callable returning the pages of report i; only
+                called for candidate pairs when a verification stage is enabled
+
+        Returns:
+            Confirmed SimilarityPairs
+
+        Raises:
+            ValueError: If verification is enabled but no report_loader is given
+        """
+        pairs = self.find_candidate_pairs(packed, self.hamming_distance_threshold)
+
+        if self.verify_method and len(pairs.rows):
+            if report_loader is None:
+                raise ValueError("Verification requires a report_loader")
+            # Cascade: confirm each candidate with the expensive check
+            verify_features = {}
+            keep = np.array(
+                [
+                    self._verify_candidate(report_loader, int(i), int(j), verify_features)
+                    for i, j in zip(pairs.rows, pairs.cols)
+                ],
+                dtype=bool,
+            )
+            logger.info(
+                f"Verification ({self.verify_method}) confirmed {int(keep.sum())} of "
+                f"{len(keep)} candidate pairs using {len(verify_features)} reports"
+            )
+            pairs = SimilarityPairs(pairs.rows[keep], pairs.cols[keep], pairs.distances[keep])
+
+        return pairs
+
     def find_duplicates(
         self, report_pages_list: List[List[Image.Image]]
     ) -> Tuple[List[int], List[Tuple[int, int, float]]]:
@@ -169,41 +508,23 @@ class DuplicateDetector:
         if not report_pages_list:
             return [], []
 
-        # Compute hashes for all reports
-        hashes = []
-        for idx, pages in enumerate(report_pages_list):
-            try:
-                report_hash = self.compute_report_hash(pages)
-                hashes.append(report_hash)
-            except Exception as e:
-                logger.error(f"Error computing hash for report {idx}: {e}")
-                hashes.append(None)
+        pairs, bits = self.find_duplicate_pairs(report_pages_list)
 
-        # Find duplicates
         duplicates = []
         unique_indices = set(range(len(report_pages_list)))
 
-        for i in range(len(hashes)):
-            if hashes[i] is None:
-                continue
-
-            for j in range(i + 1, len(hashes)):
-                if hashes[j] is None:
-                    continue
-
-                is_dup, hamming_dist, similarity = self.are_duplicates(hashes[i], hashes[j])
+        for i, j, dist in zip(pairs.rows, pairs.cols, pairs.distances):
+            similarity = 1 - (int(dist) / bits)
+            duplicates.append((int(i), int(j), similarity))
+            # Remove the later duplicate from unique set
+            if j in unique_indices:
+                unique_indices.remove(j)
+                logger.info(
+                    f"Reports {i + 1} and {j + 1} are duplicates "
+                    f"(similarity: {similarity:.2%})"
+                )
 
-                if is_dup:
-                    duplicates.append((i, j, similarity))
-                    # Remove the later duplicate from unique set
-                    if j in unique_indices:
-                        unique_indices.remove(j)
-                        logger.info(
-                            f"Reports {i + 1} and {j + 1} are duplicates "
-                            f"(similarity: {similarity:.2%})"
-                        )
-
-        unique_list = sorted(list(unique_indices))
+        unique_list = sorted(int(i) for i in unique_indices)
 
         logger.info(
             f"Found {len(duplicates)} duplicate pairs. "
@@ -212,6 +533,95 @@ class DuplicateDetector:
 
         return unique_list, duplicates
 
+    def find_duplicate_groups(
+        self,
+        report_pages_list: List[List[Image.Image]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> np.ndarray:
+        """
+        Cluster duplicate reports into groups with canonical representatives.
+
+        Duplicate pairs are merged with union-find, so duplicates are grouped
+        transitively. Each group is represented by its lowest index.
+
+        Args:
+            report_pages_list: List of reports, where each report is a list of pages
+            progress_callback: Optional callback(reports_hashed, total_reports)
+
+        Returns:
+            int32 array where element i is the representative of report i's group
+            (reports with labels[i] == i are the ones to keep)
+        """
+        logger.info(f"Grouping {len(report_pages_list)} reports by duplicate similarity")
+
+        if not report_pages_list:
+            return np.empty(0, dtype=np.int32)
+
+        hashes = self.compute_hashes(report_pages_list, progress_callback)
+        return self.group_packed_hashes(pack_hashes(hashes), report_pages_list.__getitem__)
+
+    def group_packed_hashes(
+        self,
+        packed: np.ndarray,
+        report_loader: Optional[Callable[[int], List[Image.Image]]] = None,
+    ) -> np.ndarray:
+        """
+        Cluster duplicate reports from precomputed packed hashes.
+
+        Hashes do not depend on the distance threshold, so stored hashes can be
+        re-grouped with new thresholds without touching the page images.
+
+        Args:
+            packed: Packed hashes from pack_hashes
+            report_loader: Callable returning the pages of report i, needed
+                only when a verification stage is enabled
+
+        Returns:
+            int32 array where element i is the representative of report i's group
+        """
+        if len(packed) == 0:
+            return np.empty(0, dtype=np.int32)
+
+        pairs = self.find_packed_duplicate_pairs(packed, report_loader)
+        labels = cluster_pairs(len(packed), pairs.rows, pairs.cols)
+
+        unique_count = int(np.count_nonzero(labels == np.arange(len(labels))))
+        logger.info(
+            f"Found {len(pairs.rows)} duplicate pairs in {len(labels) - unique_count} "
+            f"duplicate reports. {unique_count} unique reports remaining."
+        )
+
+        return labels
+
+    def _verify_candidate(
+        self,
+        report_loader: Callable[[int], List[Image.Image]],
+        i: int,
+        j: int,
+        features: Dict[int, object],
+    ) -> bool:
+        """
+        Run the verification stage on a candidate pair, caching features per report.
+
+        Args:
+            report_loader: Callable returning the pages of a report
+            i: Index of the first report
+            j: Index of the second report
+            features: Cache of verification features keyed by report index
+
+        Returns:
+            True if the candidate pair is confirmed as a duplicate
+        """
+        for idx in (i, j):
+            if idx not in features:
+                features[idx] = self.compute_verification_feature(report_loader(idx))
+
+        confirmed, score = self.verify_pair(features[i], features[j])
+        logger.debug(
+            f"Verifying reports {i + 1} and {j + 1}: score={score:.3f}, confirmed={confirmed}"
+        )
+        return confirmed
+
     def filter_duplicates(
         self, report_pages_list: List[List[Image.Image]]
     ) -> List[List[Image.Image]]:
@@ -255,38 +665,67 @@ class DuplicateDetector:
 
         is_dup, hamming_dist, similarity = self.are_duplicates(hash1, hash2)
 
+        if is_dup and self.verify_method:
+            is_dup = self._verify_candidate([pages1, pages2].__getitem__, 0, 1, {})
+
         return is_dup, similarity
 
     def get_similarity_matrix(
         self, report_pages_list: List[List[Image.Image]]
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
-        Generate a similarity matrix for all reports.
+        Generate a Hamming distance matrix for all reports.
+
+        Similarity can be derived as 1 - distance / hash_bits. Reports whose
+        hash could not be computed get the maximum distance to every other report.
 
         Args:
             report_pages_list: List of reports
 
         Returns:
-            2D list of similarity scores (0-1)
+            Symmetric n x n matrix of Hamming distances (uint8, or uint16 for
+            hashes longer than 255 bits)
         """
-        n = len(report_pages_list)
-        matrix = [[0.0] * n for _ in range(n)]
+        hashes = self.compute_hashes(report_pages_list)
+        packed = pack_hashes(hashes)
+        bits = hash_bit_count(hashes)
+        valid = packed_valid_mask(packed)
 
-        # Compute hashes
-        hashes = [self.compute_report_hash(pages) for pages in report_pages_list]
+        n = len(report_pages_list)
+        dtype = np.uint8 if bits <= np.iinfo(np.uint8).max else np.uint16
+        matrix = np.full((n, n), bits, dtype=dtype)
 
-        # Fill similarity matrix
         for i in range(n):
-            for j in range(n):
-                if i == j:
-                    matrix[i][j] = 1.0
-                elif i < j:
-                    _, _, similarity = self.are_duplicates(hashes[i], hashes[j])
-                    matrix[i][j] = similarity
-                    matrix[j][i] = similarity
+            matrix[i, i] = 0
+            if not valid[i]:
+                continue
+            row_dist = hamming_distances(packed[i], packed[i + 1:])
+            row_dist[~valid[i + 1:]] = bits
+            matrix[i, i + 1:] = row_dist
+            matrix[i + 1:, i] = row_dist
 
         return matrix
 
+    def get_similarity_pairs(
+        self, report_pages_list: List[List[Image.Image]], max_distance: Optional[int] = None
+    ) -> SimilarityPairs:
+        """
+        Generate a sparse (COO) list of report pairs under a distance cap.
+
+        Args:
+            report_pages_list: List of reports
+            max_distance: Maximum Hamming distance to keep
+                (default: hamming_distance_threshold)
+
+        Returns:
+            SimilarityPairs with row < col
+        """
+        if max_distance is None:
+            max_distance = self.hamming_distance_threshold
+
+        packed = pack_hashes(self.compute_hashes(report_pages_list))
+        return self.find_candidate_pairs(packed, max_distance)
+
 
 if __name__ == "__main__":
     # Setup basic logging for testing
@@ -0,0 +1,222 @@
+"""
+Feature Cache module for storing per-page analysis features.
+
+Blank page metrics and perceptual hashes only depend on the PDF, the render
+settings, the Canny settings and the hash settings - not on the thresholds
+applied to them. Storing them per document lets a reprocess with different
+thresholds skip rendering and analysis entirely.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Metrics stored per page (edge_count is -1 when edge detection is disabled)
+METRIC_FIELDS = ("variance", "white_ratio", "edge_count", "mean_pixel", "std_dev")
+
+
+class PageFeatures(NamedTuple):
+    """Stored features of every page of a document."""
+    metrics: List[dict]  # compute_metrics output, one per page
+    packed_hashes: Optional[np.ndarray]  # pack_hashes output, one row per page
+
+
+def metrics_to_arrays(metrics: List[dict]) -> Dict[str, np.ndarray]:
+    """
+    Convert per-page metrics into one typed array per metric, for storage.
+
+    Args:
+        metrics: compute_metrics output, one per page
+
+    Returns:
+        Dictionary of arrays keyed by METRIC_FIELDS
+    """
+    return {
+        "variance": np.array([m["variance"] for m in metrics], dtype=np.float64),
+        "white_ratio": np.array([m["white_ratio"] for m in metrics], dtype=np.float64),
+        "edge_count": np.array(
+            [-1 if m["edge_count"] is None else m["edge_count"] for m in metrics],
+            dtype=np.int64,
+        ),
+        "mean_pixel": np.array([m["mean_pixel"] for m in metrics], dtype=np.float64),
+        "std_dev": np.array([m["std_dev"] for m in metrics], dtype=np.float64),
+    }
+
+
+def arrays_to_metrics(columns: Dict[str, np.ndarray]) -> List[dict]:
+    """
+    Convert stored metric arrays back into per-page metrics.
+
+    Args:
+        columns: Arrays keyed by METRIC_FIELDS, see metrics_to_arrays
+
+    Returns:
+        compute_metrics output, one per page
+    """
+    metrics = []
+    for idx in range(len(columns["variance"])):
+        page = {field: columns[field][idx].item() for field in METRIC_FIELDS}
+        if page["edge_count"] < 0:
+            page["edge_count"] = None
+        metrics.append(page)
+    return metrics
+
+
+def feature_key(input_digest: str, config: Dict) -> str:
+    """
+    Build the cache key for a document's features.
+
+    Args:
+        input_digest: SHA-256 digest of the PDF
+        config: Processing configuration (pdf, blank_detection and
+            duplicate_detection sections are used)
+
+    Returns:
+        Cache key
+    """
+    blank = config.get("blank_detection", {})
+    dedup = config.get("duplicate_detection", {})
+    params = {
+        "input": input_digest,
+        "pdf": config.get("pdf", {}),
+        "use_edge_detection": blank.get("use_edge_detection", True),
+        "canny_low": blank.get("canny_low", 50),
+        "canny_high": blank.get("canny_high", 150),
+        "hash_algorithm": dedup.get("hash_algorithm", "phash"),
+        "hash_size": dedup.get("hash_size", 8),
+    }
+    canonical = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FeatureCache:
+    """
+    On-disk store of per-page metrics and hashes (one .npz file per document).
+    """
+
+    def __init__(self, path: str, max_size_mb: int = 512, enabled: bool = True):
+        """
+        Initialize the Feature Cache.
+
+        Args:
+            path: Cache directory
+            max_size_mb: Maximum total size of stored features in MB
+            enabled: Whether features are stored and loaded
+        """
+        self.cache_dir = Path(path)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.enabled = enabled
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def load(self, key: str) -> Optional[PageFeatures]:
+        """
+        Load the stored features of a document.
+
+        Args:
+            key: Key from feature_key
+
+        Returns:
+            PageFeatures, or None if nothing is stored
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                columns = {field: data[field] for field in METRIC_FIELDS}
+                packed = data["packed_hashes"] if "packed_hashes" in data.files else None
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+
+        metrics = arrays_to_metrics(columns)
+
+        # Mark as recently used for eviction
+        os.utime(path)
+        logger.info(f"Loaded stored features for {len(metrics)} pages")
+        return PageFeatures(metrics, packed)
+
+    def save(self, key: str, features: PageFeatures) -> bool:
+        """
+        Store the features of a document.
+
+        Args:
+            key: Key from feature_key
+            features: Page metrics and (optionally) packed hashes
+
+        Returns:
+            True if stored
+        """
+        if not self.enabled:
+            return False
+
+        arrays = metrics_to_arrays(features.metrics)
+        if features.packed_hashes is not None:
+            arrays["packed_hashes"] = features.packed_hashes
+
+        path = self._path(key)
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.npz")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not store page features: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used feature files over the size limit.
+
+        Returns:
+            Number of files removed
+        """
+        files = [(f.stat(), f) for f in self.cache_dir.glob("*/*.npz")]
+        total = sum(stat.st_size for stat, _ in files)
+        removed = 0
+        for stat, path in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    import sys
+    import tempfile
+
+    if len(sys.argv) > 1:
+        from src.pdf_processor import PDFProcessor
+        from src.image_analyzer import ImageAnalyzer
+
+        images = PDFProcessor().extract_pages(sys.argv[1])
+        analyzer = ImageAnalyzer()
+        cache = FeatureCache(tempfile.mkdtemp())
+        key = feature_key("example", {})
+        cache.save(key, PageFeatures([analyzer.compute_metrics(img) for img in images], None))
+
+        stored = cache.load(key)
+        print(f"Stored metrics for {len(stored.metrics)} pages")
+        non_blank = np.flatnonzero(~analyzer.blank_mask(metrics_to_arrays(stored.metrics)))
+        print(f"Non-blank pages: {non_blank.tolist()}")
+    else:
+        print("Usage: python -m src.feature_cache <pdf_file>")
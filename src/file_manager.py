@@ -6,13 +6,17 @@ along with metadata and processing logs.
 """
 
 import logging
+import shutil
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Sequence
 from datetime import datetime
 import json
 from PIL import Image
 import img2pdf
 
+from .pdf_writer import StreamingPDFWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,7 +62,7 @@ class FileManager:
 
     def save_report(
         self,
-        pages: List[Image.Image],
+        pages: Sequence[Image.Image],
         index: int,
         metadata: Optional[Dict] = None,
         original_filename: Optional[str] = None,
@@ -67,7 +71,8 @@ class FileManager:
         Save a single report to disk.
 
         Args:
-            pages: List of PIL Images comprising the report
+            pages: PIL Images comprising the report; a lazy sequence (e.g. from
+                PageStore.images) is read one page at a time
             index: Report index/number
             metadata: Optional metadata dictionary
             original_filename: Original input PDF filename (without extension)
@@ -97,7 +102,99 @@ class FileManager:
 
         # Save metadata if requested
         if self.include_metadata:
-            metadata_path = self._save_metadata(filename, pages, metadata)
+            dimensions = [{"width": p.width, "height": p.height} for p in pages]
+            metadata_path = self._save_metadata(filename, dimensions, metadata)
+            saved_files["metadata"] = str(metadata_path)
+
+        return saved_files
+
+    def _remove_report(self, filename: str):
+        """Remove the (possibly partial) files of a report."""
+        (self.output_dir / f"{filename}.pdf").unlink(missing_ok=True)
+        shutil.rmtree(self.output_dir / filename, ignore_errors=True)
+        logger.info(f"Removed partially saved report {filename}")
+
+    def report_filename(self, index: int, original_filename: Optional[str] = None) -> str:
+        """
+        Choose the filename (without extension) a report will be saved under.
+
+        Args:
+            index: Report index/number
+            original_filename: Original input PDF filename (without extension)
+
+        Returns:
+            Filename (without extension)
+        """
+        return self._generate_filename(index, original_filename)
+
+    def save_report_stream(
+        self,
+        pages: Iterable[Image.Image],
+        filename: str,
+        metadata: Optional[Dict] = None,
+        dpi: float = 72,
+        output_format: str = "pdf",
+    ) -> Dict[str, str]:
+        """
+        Save a report, writing each page as soon as it is produced.
+
+        Unlike save_report, pages are consumed one at a time and never held
+        together in memory, and the PDF can be read while it is being written.
+        If writing fails or is cancelled (an exception raised while producing
+        the pages, e.g. JobCancelledError), the partially written files are
+        removed.
+
+        Args:
+            pages: Iterable of PIL Images comprising the report
+            filename: Base filename (without extension), see report_filename
+            metadata: Optional metadata dictionary
+            dpi: Resolution the pages were rendered at
+            output_format: Output format (pdf, images, both); pass
+                self.output_format to honour the configured format
+
+        Returns:
+            Dictionary with paths to saved files
+
+        Raises:
+            ValueError: If there are no pages
+        """
+        formats = [fmt for fmt in ("pdf", "images") if output_format.lower() in (fmt, "both")]
+        pdf_path = self.output_dir / f"{filename}.pdf"
+        image_dir = self.output_dir / filename
+        dimensions = []
+
+        try:
+            with ExitStack() as stack:
+                writer = None
+                if "pdf" in formats:
+                    pdf_file = stack.enter_context(open(pdf_path, "wb"))
+                    writer = stack.enter_context(StreamingPDFWriter(pdf_file))
+                if "images" in formats:
+                    image_dir.mkdir(exist_ok=True)
+
+                for page in pages:
+                    if writer is not None:
+                        writer.add_page(page, dpi=dpi)
+                    if "images" in formats:
+                        page.save(image_dir / f"page_{len(dimensions) + 1:03d}.png", "PNG")
+                    dimensions.append({"width": page.width, "height": page.height})
+
+                if not dimensions:
+                    raise ValueError("A report needs at least one page")
+        except Exception:
+            self._remove_report(filename)
+            raise
+
+        saved_files = {}
+        if "pdf" in formats:
+            logger.info(f"Saved {len(dimensions)}-page report as PDF: {pdf_path}")
+            saved_files["pdf"] = str(pdf_path)
+        if "images" in formats:
+            logger.info(f"Saved {len(dimensions)}-page report as images: {image_dir}")
+            saved_files["images"] = str(image_dir)
+
+        if self.include_metadata:
+            metadata_path = self._save_metadata(filename, dimensions, metadata)
             saved_files["metadata"] = str(metadata_path)
 
         return saved_files
@@ -164,7 +261,11 @@ class FileManager:
 
         return filename
 
-    def _save_as_pdf(self, pages: List[Image.Image], filename: str) -> Path:
+    def _save_as_pdf(
+        self,
+        pages: Sequence[Image.Image],
+        filename: str,
+    ) -> Path:
         """
         Save report pages as a PDF file.
 
@@ -197,7 +298,11 @@ class FileManager:
 
         return pdf_path
 
-    def _save_as_images(self, pages: List[Image.Image], filename: str) -> Path:
+    def _save_as_images(
+        self,
+        pages: Sequence[Image.Image],
+        filename: str,
+    ) -> Path:
         """
         Save report pages as individual image files.
 
@@ -220,14 +325,14 @@ class FileManager:
         return image_dir
 
     def _save_metadata(
-        self, filename: str, pages: List[Image.Image], metadata: Optional[Dict]
+        self, filename: str, dimensions: List[Dict[str, int]], metadata: Optional[Dict]
     ) -> Path:
         """
         Save metadata as a JSON file.
 
         Args:
             filename: Base filename
-            pages: List of pages (for extracting info)
+            dimensions: Width and height of each page
             metadata: Metadata dictionary
 
         Returns:
@@ -238,9 +343,9 @@ class FileManager:
         # Build metadata
         meta = {
             "filename": filename,
-            "page_count": len(pages),
+            "page_count": len(dimensions),
             "processed_at": datetime.now().isoformat(),
-            "image_dimensions": [{"width": p.width, "height": p.height} for p in pages],
+            "image_dimensions": dimensions,
         }
 
         # Add user-provided metadata
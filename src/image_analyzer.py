@@ -8,7 +8,7 @@ This module uses multiple techniques to identify blank or nearly-blank pages:
 """
 
 import logging
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Callable, Union
 import numpy as np
 import cv2
 from PIL import Image
@@ -64,8 +64,34 @@ class ImageAnalyzer:
             Tuple of (is_blank: bool, metrics: dict)
             metrics contains variance, edge_count, white_ratio, and reasons
         """
+        # Calculate metrics
+        metrics = self.compute_metrics(image)
+
+        # Determine if blank based on multiple criteria
+        is_blank, reasons = self.evaluate_metrics(metrics)
+
+        logger.debug(
+            f"Image analysis: blank={is_blank}, variance={metrics['variance']:.2f}, "
+            f"edges={metrics['edge_count']}, white_ratio={metrics['white_ratio']:.2f}"
+        )
+
+        return is_blank, metrics
+
+    def compute_metrics(self, image: Union[Image.Image, np.ndarray]) -> dict:
+        """
+        Calculate the threshold-independent metrics of an image.
+
+        The result only depends on the image and the Canny settings, so it can
+        be stored and re-evaluated with evaluate_metrics when thresholds change.
+
+        Args:
+            image: PIL Image, or uint8 array (e.g. a PageStore view, read without copying)
+
+        Returns:
+            Dictionary with variance, white_ratio, edge_count, mean_pixel and std_dev
+        """
         # Convert PIL Image to numpy array
-        img_array = np.array(image)
+        img_array = np.asarray(image)
 
         # Convert to grayscale if needed
         if len(img_array.shape) == 3:
@@ -73,21 +99,47 @@ class ImageAnalyzer:
         else:
             gray = img_array
 
-        # Calculate metrics
-        metrics = self._calculate_metrics(gray)
+        return self._calculate_metrics(gray)
 
-        # Determine if blank based on multiple criteria
-        is_blank, reasons = self._evaluate_blank(metrics)
+    def evaluate_metrics(self, metrics: dict) -> Tuple[bool, List[str]]:
+        """
+        Apply the blank page thresholds to previously computed metrics.
+
+        Sets "is_blank" and "reasons" on the metrics dictionary.
 
+        Args:
+            metrics: Dictionary from compute_metrics
+
+        Returns:
+            Tuple of (is_blank: bool, reasons: List[str])
+        """
+        is_blank, reasons = self._evaluate_blank(metrics)
         metrics["is_blank"] = is_blank
         metrics["reasons"] = reasons
+        return is_blank, reasons
 
-        logger.debug(
-            f"Image analysis: blank={is_blank}, variance={metrics['variance']:.2f}, "
-            f"edges={metrics['edge_count']}, white_ratio={metrics['white_ratio']:.2f}"
-        )
+    def blank_mask(self, columns) -> np.ndarray:
+        """
+        Apply the blank page thresholds to the metrics of many pages at once.
 
-        return is_blank, metrics
+        Vectorised equivalent of evaluate_metrics that builds no reason
+        strings; use evaluate_metrics on a single page to explain its verdict.
+
+        Args:
+            columns: Metric arrays addressable by name, e.g. a PageTable's rows
+                or metrics_to_arrays output (edge_count is -1 when unavailable)
+
+        Returns:
+            Boolean array, True for blank pages
+        """
+        indicators = (np.asarray(columns["variance"]) < self.variance_threshold).astype(np.int8)
+        indicators += np.asarray(columns["white_ratio"]) > self.white_pixel_ratio
+        if self.use_edge_detection:
+            edge_count = np.asarray(columns["edge_count"])
+            indicators += (edge_count >= 0) & (edge_count < self.edge_threshold)
+
+        # Consider page blank if at least 2 indicators suggest it
+        return indicators >= 2
 
     def _calculate_metrics(self, gray_image: np.ndarray) -> dict:
         """
@@ -163,13 +215,17 @@ class ImageAnalyzer:
         return is_blank, reasons
 
     def filter_blank_pages(
-        self, images: List[Image.Image]
+        self,
+        images: List[Image.Image],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
     ) -> Tuple[List[Image.Image], List[int], List[dict]]:
         """
         Filter out blank pages from a list of images.
 
         Args:
             images: List of PIL Images to analyze
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
 
         Returns:
             Tuple of:
@@ -193,6 +249,9 @@ class ImageAnalyzer:
             else:
                 logger.info(f"Page {idx + 1} identified as blank: {metrics['reasons']}")
 
+            if progress_callback:
+                progress_callback(idx + 1, len(images))
+
         logger.info(
             f"Filtered {len(images)} pages: {len(non_blank_images)} non-blank, "
             f"{len(images) - len(non_blank_images)} blank"
@@ -0,0 +1,240 @@
+"""
+OCR Pool module for running Tesseract over many page regions efficiently.
+
+Calling pytesseract.image_to_string per page starts a new tesseract process,
+writes a temp image and reloads the language model every time. This module
+keeps long-lived workers instead:
+
+- tesserocr backend: one persistent Tesseract API instance per worker thread
+  (tesserocr releases the GIL, so threads OCR in parallel across cores)
+- cli backend: each worker OCRs a whole batch of images with a single
+  tesseract invocation driven by an image list, so the model loads once per batch
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image
+
+# Optional persistent Tesseract API
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Tesseract separates pages of a multi-image input with a form feed
+PAGE_SEPARATOR = "\f"
+
+
+def get_tesseract_cmd() -> str:
+    """
+    Get the tesseract executable, honouring the pytesseract configuration.
+
+    Returns:
+        Path or name of the tesseract executable
+    """
+    try:
+        import pytesseract
+        return pytesseract.pytesseract.tesseract_cmd
+    except ImportError:
+        return "tesseract"
+
+
+def tesseract_available() -> bool:
+    """Check whether any OCR backend is usable."""
+    if TESSEROCR_AVAILABLE:
+        return True
+    cmd = get_tesseract_cmd()
+    return os.path.exists(cmd) or shutil.which(cmd) is not None
+
+
+class OCRWorkerPool:
+    """
+    Pool of long-lived Tesseract workers for OCR of many images.
+    """
+
+    def __init__(
+        self,
+        language: str = "eng",
+        psm: int = 6,
+        max_workers: Optional[int] = None,
+        batch_size: int = 16,
+        backend: str = "auto",
+    ):
+        """
+        Initialize the OCR worker pool.
+
+        Args:
+            language: Tesseract language code
+            psm: Tesseract page segmentation mode
+            max_workers: Number of OCR workers (default: CPU count)
+            batch_size: Images per tesseract invocation (cli backend)
+            backend: OCR backend (auto, tesserocr, cli)
+
+        Raises:
+            ValueError: If backend is not supported or not installed
+        """
+        if backend == "auto":
+            backend = "tesserocr" if TESSEROCR_AVAILABLE else "cli"
+        if backend not in ("tesserocr", "cli"):
+            raise ValueError(
+                f"Unsupported OCR backend: {backend}. Choose from ['auto', 'tesserocr', 'cli']"
+            )
+        if backend == "tesserocr" and not TESSEROCR_AVAILABLE:
+            raise ValueError("OCR backend 'tesserocr' requested but tesserocr is not installed")
+
+        self.language = language
+        self.psm = psm
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.backend = backend
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._apis = []
+        self._apis_lock = threading.Lock()
+
+        logger.info(
+            f"OCRWorkerPool initialized: backend={backend}, workers={self.max_workers}, "
+            f"language={language}, psm={psm}"
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the worker threads on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ocr-worker"
+            )
+        return self._executor
+
+    def image_to_string(self, image: Image.Image) -> str:
+        """
+        OCR a single image.
+
+        Args:
+            image: PIL Image
+
+        Returns:
+            Recognised text
+        """
+        return self.map_images([image])[0]
+
+    def map_images(self, images: List[Image.Image]) -> List[str]:
+        """
+        OCR many images in parallel across the pool's workers.
+
+        Args:
+            images: List of PIL Images
+
+        Returns:
+            List of recognised texts, in input order (empty string on OCR error)
+        """
+        if not images:
+            return []
+
+        executor = self._get_executor()
+
+        if self.backend == "tesserocr":
+            return list(executor.map(self._ocr_tesserocr, images))
+
+        # Split into at least one batch per worker so all cores are used
+        batch_size = min(self.batch_size, -(-len(images) // self.max_workers))
+        batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+
+        texts = []
+        for batch_texts in executor.map(self._ocr_cli_batch, batches):
+            texts.extend(batch_texts)
+        return texts
+
+    def _ocr_tesserocr(self, image: Image.Image) -> str:
+        """OCR one image with this thread's persistent Tesseract API."""
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=self.language, psm=self.psm)
+            self._local.api = api
+            with self._apis_lock:
+                self._apis.append(api)
+
+        try:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        except Exception as e:
+            logger.error(f"OCR error: {e}")
+            return ""
+
+    def _ocr_cli_batch(self, images: List[Image.Image]) -> List[str]:
+        """OCR a batch of images with a single tesseract process."""
+        with tempfile.TemporaryDirectory(prefix="ocr_batch_") as temp_dir:
+            temp_path = Path(temp_dir)
+            image_paths = []
+            for idx, image in enumerate(images):
+                image_path = temp_path / f"region_{idx:04d}.png"
+                image.save(image_path, "PNG")
+                image_paths.append(str(image_path))
+
+            list_path = temp_path / "images.txt"
+            list_path.write_text("\n".join(image_paths) + "\n")
+
+            try:
+                completed = subprocess.run(
+                    [
+                        get_tesseract_cmd(),
+                        str(list_path),
+                        "stdout",
+                        "-l",
+                        self.language,
+                        "--psm",
+                        str(self.psm),
+                    ],
+                    capture_output=True,
+                    check=True,
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.error(f"OCR error: {e}")
+                return [""] * len(images)
+
+        texts = completed.stdout.decode("utf-8", errors="replace").split(PAGE_SEPARATOR)
+        if len(texts) < len(images):
+            logger.warning(
+                f"Tesseract returned {len(texts)} pages for a batch of {len(images)} images"
+            )
+            texts.extend([""] * (len(images) - len(texts)))
+        return texts[:len(images)]
+
+    def close(self):
+        """Shut down the worker threads and release Tesseract API instances."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        with self._apis_lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    # Example usage
+    with OCRWorkerPool(max_workers=2) as pool:
+        test_images = [Image.new("RGB", (800, 200), color="white") for _ in range(4)]
+        print(pool.map_images(test_images))
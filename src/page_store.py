@@ -0,0 +1,248 @@
+"""
+Page Store module for holding rendered pages within a fixed RAM budget.
+
+Rendered pages are kept as uint8 arrays addressed by page index. The most
+recently used pages stay in RAM; once their total size exceeds the budget,
+the least recently used ones are written to a spill file and read back
+through a memory map. Arrays are returned as zero-copy views (of the
+in-memory array or of the memory-mapped file), so the analysis stages read
+spilled pages without loading them into RAM first.
+"""
+
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class SpilledPage(NamedTuple):
+    """Location of a page in the spill file."""
+    offset: int
+    shape: tuple
+
+
+class PageStore:
+    """
+    Rendered pages addressed by index, spilled to a memory-mapped file beyond a RAM budget.
+    """
+
+    def __init__(self, max_resident_mb: float = 256, spill_dir: Optional[str] = None):
+        """
+        Initialize the page store. The spill file is created on first spill.
+
+        Args:
+            max_resident_mb: RAM budget for page rasters in MB (the most
+                recently used page always stays in RAM)
+            spill_dir: Directory of the spill file (default: the system temp
+                directory)
+        """
+        self.max_resident_bytes = int(max_resident_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+
+        self._resident: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._spilled: Dict[int, SpilledPage] = {}
+        self._resident_bytes = 0
+        self._spill_file = None
+        self._spill_path: Optional[Path] = None
+        self._spill_size = 0
+        self._map: Optional[np.memmap] = None
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes of page rasters held in RAM."""
+        return self._resident_bytes
+
+    @property
+    def spilled_bytes(self) -> int:
+        """Bytes of page rasters written to the spill file."""
+        return self._spill_size
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._spilled)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._resident or index in self._spilled
+
+    def indices(self) -> List[int]:
+        """Stored page indices, in ascending order."""
+        return sorted(list(self._resident) + list(self._spilled))
+
+    def put(self, index: int, image: Union[Image.Image, np.ndarray]):
+        """
+        Store a page, spilling the least recently used pages if over budget.
+
+        Args:
+            index: Page index
+            image: PIL Image or uint8 array (H x W grayscale or H x W x 3 RGB)
+        """
+        if isinstance(image, Image.Image) and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        array = np.ascontiguousarray(image, dtype=np.uint8)
+
+        self.discard(index)
+        self._resident[index] = array
+        self._resident_bytes += array.nbytes
+        while self._resident_bytes > self.max_resident_bytes and len(self._resident) > 1:
+            self._spill_oldest()
+
+    def array(self, index: int) -> np.ndarray:
+        """
+        Get a page's raster without copying it.
+
+        Spilled pages are returned as read-only views of the memory-mapped
+        spill file; in-memory pages are marked as recently used.
+
+        Args:
+            index: Page index
+
+        Returns:
+            uint8 array (H x W for grayscale, H x W x 3 for RGB pages)
+
+        Raises:
+            KeyError: If the page is not stored
+        """
+        if index in self._resident:
+            self._resident.move_to_end(index)
+            return self._resident[index]
+
+        page = self._spilled[index]
+        nbytes = int(np.prod(page.shape))
+        return self._spill_map()[page.offset:page.offset + nbytes].reshape(page.shape)
+
+    def image(self, index: int) -> Image.Image:
+        """
+        Get a page as a PIL Image.
+
+        Args:
+            index: Page index
+
+        Returns:
+            PIL Image (L or RGB)
+
+        Raises:
+            KeyError: If the page is not stored
+        """
+        return Image.fromarray(self.array(index))
+
+    def images(self, indices: Optional[Iterable[int]] = None) -> "PageSequence":
+        """
+        Get a lazy sequence of pages as PIL Images, loaded one at a time.
+
+        Args:
+            indices: Page indices, in order (default: all stored pages)
+
+        Returns:
+            PageSequence
+        """
+        return PageSequence(self, self.indices() if indices is None else list(indices))
+
+    def discard(self, index: int):
+        """
+        Forget a page (its spill file space is not reclaimed).
+
+        Args:
+            index: Page index
+        """
+        array = self._resident.pop(index, None)
+        if array is not None:
+            self._resident_bytes -= array.nbytes
+        self._spilled.pop(index, None)
+
+    def close(self):
+        """Drop every page and delete the spill file."""
+        self._resident.clear()
+        self._spilled.clear()
+        self._resident_bytes = 0
+        self._map = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            if self._spill_path is not None:
+                self._spill_path.unlink(missing_ok=True)
+        self._spill_size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _spill_oldest(self):
+        """Write the least recently used in-memory page to the spill file."""
+        index, array = self._resident.popitem(last=False)
+        self._resident_bytes -= array.nbytes
+
+        if self._spill_file is None:
+            if self.spill_dir:
+                Path(self.spill_dir).mkdir(parents=True, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="pages_", suffix=".raw", dir=self.spill_dir)
+            self._spill_file = os.fdopen(fd, "w+b")
+            self._spill_path = Path(path)
+            if os.name == "posix":
+                # Unlinked while open: the space is freed even if the process dies
+                self._spill_path.unlink()
+                self._spill_path = None
+            logger.info(
+                f"Page rasters exceed {self.max_resident_bytes // (1024 * 1024)} MB, "
+                "spilling to disk"
+            )
+
+        self._spill_file.seek(self._spill_size)
+        array.tofile(self._spill_file)
+        self._spilled[index] = SpilledPage(self._spill_size, array.shape)
+        self._spill_size += array.nbytes
+
+    def _spill_map(self) -> np.memmap:
+        """Map the spill file, remapping once it has grown past the current map."""
+        if self._map is None or len(self._map) < self._spill_size:
+            self._spill_file.flush()
+            self._map = np.memmap(
+                self._spill_file, dtype=np.uint8, mode="r", shape=(self._spill_size,)
+            )
+        return self._map
+
+
+class PageSequence(Sequence):
+    """
+    Read-only sequence of stored pages as PIL Images, created on access.
+
+    Lets code written for lists of pages (e.g. FileManager.save_report) work
+    through a PageStore without holding every page in memory.
+    """
+
+    def __init__(self, store: PageStore, indices: List[int]):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return PageSequence(self.store, self.indices[position])
+        return self.store.image(self.indices[position])
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        for index in self.indices:
+            yield self.store.image(index)
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    with PageStore(max_resident_mb=1) as store:
+        for i in range(10):
+            store.put(i, np.full((512, 512, 3), i, dtype=np.uint8))
+        print(
+            f"{len(store)} pages: {store.resident_bytes} bytes in RAM, "
+            f"{store.spilled_bytes} spilled"
+        )
+        print(f"Page 0 mean: {store.array(0).mean()}")
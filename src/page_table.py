@@ -0,0 +1,293 @@
+"""
+Page Table module holding the per-page state of a job in columns.
+
+Every page of a document gets one row of a NumPy structured array: its
+original index, the threshold-independent metrics, the blank verdict, the
+page it duplicates and whether it has been rendered. Perceptual hashes are
+kept alongside as one packed uint8 matrix (see pack_hashes). The pipeline
+stages read and write these columns instead of passing parallel lists of
+dictionaries around, so a 100k page document costs a few MB of bookkeeping,
+and the blank thresholds are applied to all pages in one vectorised pass.
+
+Human-readable reasons are only built when asked for (see reasons()).
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .feature_cache import METRIC_FIELDS, arrays_to_metrics, metrics_to_arrays
+
+logger = logging.getLogger(__name__)
+
+# Render states
+PAGE_PENDING = 0  # Not analysed yet
+PAGE_RENDERED = 1  # Rendered in this run (held in the job's PageStore)
+PAGE_RESTORED = 2  # Analysis loaded from a checkpoint or the feature cache
+
+NO_PAGE = -1  # duplicate_of of pages that duplicate nothing
+
+PAGE_DTYPE = np.dtype(
+    [
+        ("page_index", np.int32),
+        ("variance", np.float64),
+        ("white_ratio", np.float64),
+        ("edge_count", np.int64),  # -1 when edge detection is disabled
+        ("mean_pixel", np.float64),
+        ("std_dev", np.float64),
+        ("is_blank", np.bool_),
+        ("duplicate_of", np.int32),  # page_index of the kept page, or NO_PAGE
+        ("render_state", np.uint8),
+    ]
+)
+
+
+class PageTable:
+    """
+    Columnar per-page state of one document.
+    """
+
+    def __init__(self, page_count: int):
+        """
+        Initialize an empty table (every page pending).
+
+        Args:
+            page_count: Number of pages of the document
+        """
+        self.rows = np.zeros(page_count, dtype=PAGE_DTYPE)
+        self.rows["page_index"] = np.arange(page_count)
+        self.rows["edge_count"] = -1
+        self.rows["duplicate_of"] = NO_PAGE
+        # pack_hashes layout: one row per page, last column is 1 for valid rows
+        self.packed_hashes: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_metrics(
+        cls, metrics: List[dict], packed_hashes: Optional[np.ndarray] = None
+    ) -> "PageTable":
+        """
+        Build a table from stored page analysis (e.g. PageFeatures).
+
+        Args:
+            metrics: compute_metrics output, one per page
+            packed_hashes: pack_hashes output, one row per page (optional)
+
+        Returns:
+            PageTable with every page restored
+        """
+        table = cls(len(metrics))
+        table.set_metrics(0, metrics, PAGE_RESTORED)
+        if packed_hashes is not None:
+            table.set_hashes(0, packed_hashes)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the table, in bytes."""
+        hashes = 0 if self.packed_hashes is None else self.packed_hashes.nbytes
+        return self.rows.nbytes + hashes
+
+    def set_metrics(self, start: int, metrics: List[dict], state: int = PAGE_RENDERED):
+        """
+        Record the metrics of consecutive pages.
+
+        Args:
+            start: Index of the first page
+            metrics: compute_metrics output, one per page
+            state: Render state of the pages
+        """
+        end = start + len(metrics)
+        for field, column in metrics_to_arrays(metrics).items():
+            self.rows[field][start:end] = column
+        self.rows["render_state"][start:end] = state
+
+    def set_page_metrics(self, index: int, metrics: dict, state: int = PAGE_RENDERED):
+        """
+        Record the metrics of one page.
+
+        Args:
+            index: Page index
+            metrics: compute_metrics output
+            state: Render state of the page
+        """
+        row = self.rows[index:index + 1]
+        for field in METRIC_FIELDS:
+            value = metrics[field]
+            row[field] = -1 if value is None else value
+        row["render_state"] = state
+
+    def metrics(self, start: int = 0, end: Optional[int] = None) -> List[dict]:
+        """
+        Get the metrics of consecutive pages as dictionaries, for storage.
+
+        Args:
+            start: Index of the first page
+            end: Index after the last page (default: the last page)
+
+        Returns:
+            compute_metrics output, one per page
+        """
+        rows = self.rows[start:end]
+        return arrays_to_metrics({field: rows[field] for field in METRIC_FIELDS})
+
+    def set_hashes(self, start: int, packed: np.ndarray):
+        """
+        Record the packed hashes of consecutive pages.
+
+        The hash matrix is allocated on first use; rows packed without any
+        valid hash (one column wide) are stored as invalid rows.
+
+        Args:
+            start: Index of the first page
+            packed: pack_hashes output, one row per page
+        """
+        width = packed.shape[1]
+        if self.packed_hashes is None:
+            self.packed_hashes = np.zeros((len(self), max(width, 1)), dtype=np.uint8)
+        elif width > self.packed_hashes.shape[1]:
+            if self.packed_hashes[:, -1].any():
+                raise ValueError("Packed hashes of different sizes")
+            widened = np.zeros((len(self), width), dtype=np.uint8)
+            widened[:, -1] = self.packed_hashes[:, -1]
+            self.packed_hashes = widened
+
+        end = start + len(packed)
+        if width == self.packed_hashes.shape[1]:
+            self.packed_hashes[start:end] = packed
+        elif packed[:, -1].any():
+            raise ValueError("Packed hashes of different sizes")
+        else:
+            self.packed_hashes[start:end] = 0
+
+    def apply_blank_thresholds(self, image_analyzer) -> np.ndarray:
+        """
+        Mark pages blank or not with the analyzer's current thresholds.
+
+        Duplicate marks are reset, as they depend on which pages are blank.
+        Reasons of blank pages are only built when debug logging is enabled.
+
+        Args:
+            image_analyzer: ImageAnalyzer holding the thresholds
+
+        Returns:
+            Indices of non-blank pages, ascending
+        """
+        self.rows["is_blank"] = image_analyzer.blank_mask(self.rows)
+        self.rows["duplicate_of"] = NO_PAGE
+
+        blank = np.flatnonzero(self.rows["is_blank"])
+        if logger.isEnabledFor(logging.DEBUG):
+            for index in blank:
+                reasons = self.reasons(index, image_analyzer)
+                logger.debug(f"Page {index + 1} identified as blank: {reasons}")
+        logger.info(
+            f"Evaluated {len(self)} pages: {len(self) - len(blank)} non-blank, {len(blank)} blank"
+        )
+        return self.non_blank_indices()
+
+    def reasons(self, index: int, image_analyzer) -> List[str]:
+        """
+        Explain a page's blank verdict.
+
+        Args:
+            index: Page index
+            image_analyzer: ImageAnalyzer holding the thresholds
+
+        Returns:
+            Human-readable reasons (see ImageAnalyzer.evaluate_metrics)
+        """
+        _, reasons = image_analyzer.evaluate_metrics(self.metrics(index, index + 1)[0])
+        return reasons
+
+    def non_blank_indices(self) -> np.ndarray:
+        """Indices of non-blank pages, ascending."""
+        return np.flatnonzero(~self.rows["is_blank"])
+
+    def set_duplicate_groups(self, indices: Sequence[int], labels: Sequence[int]):
+        """
+        Record duplicate groups found among some pages.
+
+        Args:
+            indices: Page indices that were grouped
+            labels: Group label of each page, as a position in indices (the
+                group's kept page has its own position as label)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        labels = np.asarray(labels, dtype=np.int64)
+        kept = labels == np.arange(len(labels))
+        self.rows["duplicate_of"][indices] = np.where(kept, NO_PAGE, indices[labels])
+
+    def unique_indices(self) -> np.ndarray:
+        """Indices of pages that are neither blank nor a duplicate, ascending."""
+        return np.flatnonzero(~self.rows["is_blank"] & (self.rows["duplicate_of"] == NO_PAGE))
+
+    def pending_indices(self, indices: Sequence[int]) -> List[int]:
+        """
+        Select the pages not rendered in this run.
+
+        Args:
+            indices: Page indices
+
+        Returns:
+            The indices whose render state is not PAGE_RENDERED, in order
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return indices[self.rows["render_state"][indices] != PAGE_RENDERED].tolist()
+
+    def mark_rendered(self, indices: Sequence[int]):
+        """
+        Mark pages as rendered in this run.
+
+        Args:
+            indices: Page indices
+        """
+        self.rows["render_state"][np.asarray(indices, dtype=np.int64)] = PAGE_RENDERED
+
+    @property
+    def blank_count(self) -> int:
+        """Number of blank pages."""
+        return int(np.count_nonzero(self.rows["is_blank"]))
+
+    @property
+    def duplicate_count(self) -> int:
+        """Number of non-blank pages that duplicate another page."""
+        return int(np.count_nonzero(self.rows["duplicate_of"] != NO_PAGE))
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count pages by outcome.
+
+        Returns:
+            Dictionary with total_pages, blank_pages, non_blank_pages,
+            duplicate_pages and unique_pages
+        """
+        blank = self.blank_count
+        duplicates = self.duplicate_count
+        return {
+            "total_pages": len(self),
+            "blank_pages": blank,
+            "non_blank_pages": len(self) - blank,
+            "duplicate_pages": duplicates,
+            "unique_pages": len(self) - blank - duplicates,
+        }
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    from .image_analyzer import ImageAnalyzer
+
+    table = PageTable(100_000)
+    blank_page = {
+        "variance": 5.0, "white_ratio": 0.99, "edge_count": 3, "mean_pixel": 250.0, "std_dev": 2.2
+    }
+    table.set_metrics(0, [blank_page] * len(table))
+    non_blank = table.apply_blank_thresholds(ImageAnalyzer())
+    size_mb = table.nbytes / (1024 * 1024)
+    print(f"{len(table)} pages in {size_mb:.1f} MB, {len(non_blank)} non-blank")
+    print(f"Page 1: {table.reasons(0, ImageAnalyzer())}")
@@ -6,13 +6,62 @@ This module uses PyMuPDF (fitz) for efficient PDF processing and image extractio
 
 import logging
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, NamedTuple, Dict, Callable, Iterable, Iterator
 import fitz  # PyMuPDF
 from PIL import Image
 import io
 
+from .page_store import PageStore
+
 logger = logging.getLogger(__name__)
 
+# Working memory per pixel of the page being rendered and analysed: pixmap and
+# decoded image (3 bytes each), encoded image, and grayscale/float64 arrays
+WORKING_BYTES_PER_PIXEL = 16
+
+
+class PageRef(NamedTuple):
+    """Reference to a single page of a source PDF."""
+
+    pdf_path: str
+    page_index: int
+
+
+def group_page_refs(page_refs: List[PageRef]) -> Dict[str, List[int]]:
+    """
+    Group page references by source file, so each PDF is opened only once.
+
+    Args:
+        page_refs: Page references
+
+    Returns:
+        Dictionary mapping each PDF path to positions in page_refs
+    """
+    by_path: Dict[str, List[int]] = {}
+    for pos, ref in enumerate(page_refs):
+        by_path.setdefault(ref.pdf_path, []).append(pos)
+    return by_path
+
+
+def region_rect(page: "fitz.Page", region: Tuple[float, float, float, float]) -> "fitz.Rect":
+    """
+    Convert a region given as page-size ratios into a page rectangle.
+
+    Args:
+        page: PDF page
+        region: Region (x1, y1, x2, y2 as ratios of the page size)
+
+    Returns:
+        Rectangle in page coordinates
+    """
+    rect = page.rect
+    return fitz.Rect(
+        rect.x0 + rect.width * region[0],
+        rect.y0 + rect.height * region[1],
+        rect.x0 + rect.width * region[2],
+        rect.y0 + rect.height * region[3],
+    )
+
 
 class PDFProcessor:
     """
@@ -34,12 +83,16 @@ class PDFProcessor:
         self.zoom = dpi / 72  # PDF default is 72 DPI
         logger.info(f"PDFProcessor initialized with DPI={dpi}, format={image_format}")
 
-    def extract_pages(self, pdf_path: str) -> List[Image.Image]:
+    def extract_pages(
+        self, pdf_path: str, progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[Image.Image]:
         """
         Extract all pages from a PDF file as images.
 
         Args:
             pdf_path: Path to the PDF file
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
 
         Returns:
             List of PIL Image objects, one per page
@@ -65,23 +118,10 @@ class PDFProcessor:
                 logger.debug(f"Processing page {page_num + 1}/{len(doc)}")
                 page = doc[page_num]
 
-                # Create transformation matrix for desired DPI
-                mat = fitz.Matrix(self.zoom, self.zoom)
+                images.append(self._render_page(page))
 
-                # Render page to pixmap
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-
-                # Convert pixmap to PIL Image
-                img_data = pix.tobytes(self.image_format.lower())
-                img = Image.open(io.BytesIO(img_data))
-
-                # Convert to desired color space
-                if self.color_space == "GRAY" and img.mode != "L":
-                    img = img.convert("L")
-                elif self.color_space == "RGB" and img.mode != "RGB":
-                    img = img.convert("RGB")
-
-                images.append(img)
+                if progress_callback:
+                    progress_callback(page_num + 1, len(doc))
 
             doc.close()
             logger.info(f"Successfully extracted {len(images)} pages")
@@ -117,6 +157,60 @@ class PDFProcessor:
             logger.error(f"Error getting page count: {e}")
             raise
 
+    def estimate_memory_mb(
+        self,
+        pdf_path: str,
+        page_indices: Optional[Iterable[int]] = None,
+        held_pages: Optional[int] = None,
+        max_held_mb: Optional[float] = None,
+        working_pages: int = 1,
+    ) -> float:
+        """
+        Estimate the peak memory needed to render and analyse pages, without rendering.
+
+        Pixel sizes follow from each page's size and the DPI. Rendered pages
+        held at once take width x height x channels bytes each; on top of
+        that, the page being rendered and analysed needs working copies
+        (pixmap, encoded image, grayscale and float arrays).
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_indices: Pages that will be rendered (default: all pages)
+            held_pages: Number of rendered pages kept in memory at once
+                (default: all of them)
+            max_held_mb: RAM budget of the held pages, e.g. a PageStore's,
+                beyond which they are spilled to disk
+            working_pages: Number of pages analysed at once (e.g. by the
+                pipeline's analysis threads), each with its own working copies
+
+        Returns:
+            Estimated peak memory in MB
+
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+        """
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        with fitz.open(pdf_path) as doc:
+            indices = range(len(doc)) if page_indices is None else page_indices
+            pixels = []
+            for idx in indices:
+                rect = doc.page_cropbox(idx)
+                pixels.append(int(rect.width * self.zoom) * int(rect.height * self.zoom))
+
+        if not pixels:
+            return 0.0
+        channels = 1 if self.color_space == "GRAY" else 3
+        held = sorted(pixels, reverse=True)[:held_pages] if held_pages is not None else pixels
+        held_bytes = sum(held) * channels
+        if max_held_mb is not None:
+            # The most recent page always stays in RAM
+            held_bytes = min(held_bytes, max(max_held_mb * 1024 * 1024, max(pixels) * channels))
+        peak_bytes = held_bytes + max(pixels) * WORKING_BYTES_PER_PIXEL * max(working_pages, 1)
+        return peak_bytes / (1024 * 1024)
+
     def extract_page_range(
         self, pdf_path: str, start_page: int, end_page: int
     ) -> List[Image.Image]:
@@ -152,18 +246,7 @@ class PDFProcessor:
             images = []
 
             for page_num in range(start_page, end_page):
-                page = doc[page_num]
-                mat = fitz.Matrix(self.zoom, self.zoom)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img_data = pix.tobytes(self.image_format.lower())
-                img = Image.open(io.BytesIO(img_data))
-
-                if self.color_space == "GRAY" and img.mode != "L":
-                    img = img.convert("L")
-                elif self.color_space == "RGB" and img.mode != "RGB":
-                    img = img.convert("RGB")
-
-                images.append(img)
+                images.append(self._render_page(doc[page_num]))
 
             doc.close()
             logger.info(f"Successfully extracted {len(images)} pages")
@@ -173,6 +256,299 @@ class PDFProcessor:
             logger.error(f"Error extracting page range: {e}")
             raise
 
+    def extract_pages_by_index(
+        self,
+        pdf_path: str,
+        page_indices: List[int],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Image.Image]:
+        """
+        Extract selected pages from a PDF, rendered exactly as extract_pages does.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_indices: Page indices to render (0-indexed), in output order
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
+
+        Returns:
+            List of PIL Image objects, one per requested index
+
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If a page index is out of range
+        """
+        return list(self.iter_pages_by_index(pdf_path, page_indices, progress_callback))
+
+    def render_to_store(
+        self,
+        pdf_path: str,
+        store: "PageStore",
+        page_indices: Optional[Iterable[int]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> "PageStore":
+        """
+        Render pages into a page store, one at a time, so RAM use is bounded by the store's budget.
+
+        Args:
+            pdf_path: Path to the PDF file
+            store: Page store receiving each page under its page index
+            page_indices: Page indices to render (default: all pages)
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
+
+        Returns:
+            The page store
+
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If a page index is out of range
+        """
+        if page_indices is None:
+            page_indices = range(self.get_page_count(pdf_path))
+        page_indices = list(page_indices)
+        pages = self.iter_pages_by_index(pdf_path, page_indices, progress_callback)
+        for idx, page in zip(page_indices, pages):
+            store.put(idx, page)
+        return store
+
+    def iter_pages_by_index(
+        self,
+        pdf_path: str,
+        page_indices: Iterable[int],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[Image.Image]:
+        """
+        Render selected pages one at a time, so only one page is held in memory.
+
+        The file and the indices are checked before the first page is yielded.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_indices: Page indices to render (0-indexed), in output order
+            progress_callback: Optional callback(pages_done, total_pages) called
+                after each page
+
+        Yields:
+            PIL Image objects, one per requested index
+
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If a page index is out of range
+        """
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        page_indices = list(page_indices)
+        doc = fitz.open(pdf_path)
+        total_pages = len(doc)
+        invalid = [idx for idx in page_indices if not 0 <= idx < total_pages]
+        if invalid:
+            doc.close()
+            raise ValueError(f"Invalid page indices: {invalid} (total pages: {total_pages})")
+
+        return self._iter_rendered(doc, page_indices, progress_callback)
+
+    def _iter_rendered(
+        self,
+        doc: "fitz.Document",
+        page_indices: List[int],
+        progress_callback: Optional[Callable[[int, int], None]],
+    ) -> Iterator[Image.Image]:
+        """Render pages of an open document lazily, closing it when done."""
+        logger.info(f"Extracting {len(page_indices)} of {len(doc)} pages from {doc.name}")
+        with doc:
+            for done, page_num in enumerate(page_indices, start=1):
+                yield self._render_page(doc[page_num])
+                if progress_callback:
+                    progress_callback(done, len(page_indices))
+
+    def _render_page(self, page: "fitz.Page") -> Image.Image:
+        """
+        Render a full page at the configured DPI, format and color space.
+
+        Args:
+            page: PyMuPDF page
+
+        Returns:
+            PIL Image
+        """
+        # Create transformation matrix for desired DPI
+        mat = fitz.Matrix(self.zoom, self.zoom)
+
+        # Render page to pixmap
+        pix = page.get_pixmap(matrix=mat, alpha=False)
+
+        # Convert pixmap to PIL Image
+        img_data = pix.tobytes(self.image_format.lower())
+        img = Image.open(io.BytesIO(img_data))
+
+        # Convert to desired color space
+        if self.color_space == "GRAY" and img.mode != "L":
+            img = img.convert("L")
+        elif self.color_space == "RGB" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        return img
+
+    def get_page_refs(self, pdf_path: str) -> List[PageRef]:
+        """
+        Get references to every page of a PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            List of PageRef objects, one per page
+        """
+        return [PageRef(str(pdf_path), idx) for idx in range(self.get_page_count(pdf_path))]
+
+    def extract_region_text(
+        self, page_refs: List[PageRef], region: Tuple[float, float, float, float]
+    ) -> List[Optional[str]]:
+        """
+        Read the text inside a page region from the PDF text layer.
+
+        Args:
+            page_refs: Pages to read
+            region: Region to read (x1, y1, x2, y2 as ratios of the page size)
+
+        Returns:
+            List with the region's text for each page, or None for pages
+            without a text layer (image-only scans that need OCR)
+
+        Raises:
+            FileNotFoundError: If a PDF file doesn't exist
+        """
+        texts: List[Optional[str]] = [None] * len(page_refs)
+
+        # Open each source document once
+        for pdf_path, positions in group_page_refs(page_refs).items():
+            if not Path(pdf_path).exists():
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+            try:
+                doc = fitz.open(pdf_path)
+                for pos in positions:
+                    page = doc[page_refs[pos].page_index]
+                    if not page.get_text("text").strip():
+                        continue
+
+                    texts[pos] = page.get_text("text", clip=region_rect(page, region))
+                doc.close()
+            except Exception as e:
+                logger.error(f"Error extracting region text: {e}")
+                raise
+
+        return texts
+
+    def render_regions(
+        self,
+        page_refs: List[PageRef],
+        regions: List[Tuple[float, float, float, float]],
+        dpi: Optional[int] = None,
+    ) -> List[List[Image.Image]]:
+        """
+        Render only the given regions of each page, without rendering the full page.
+
+        Args:
+            page_refs: Pages to render
+            regions: Regions to render (x1, y1, x2, y2 as ratios of the page size)
+            dpi: Resolution for the regions (default: the processor's DPI)
+
+        Returns:
+            One list per region, each holding a PIL Image for every page
+
+        Raises:
+            FileNotFoundError: If a PDF file doesn't exist
+        """
+        zoom = (dpi or self.dpi) / 72
+        mat = fitz.Matrix(zoom, zoom)
+        rendered = [[None] * len(page_refs) for _ in regions]
+
+        # Open each source document once
+        for pdf_path, positions in group_page_refs(page_refs).items():
+            if not Path(pdf_path).exists():
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+            try:
+                doc = fitz.open(pdf_path)
+                for pos in positions:
+                    page = doc[page_refs[pos].page_index]
+                    for region_idx, region in enumerate(regions):
+                        clip = region_rect(page, region)
+                        pix = page.get_pixmap(matrix=mat, clip=clip, alpha=False)
+                        rendered[region_idx][pos] = self._pixmap_to_image(pix)
+                doc.close()
+            except Exception as e:
+                logger.error(f"Error rendering page regions: {e}")
+                raise
+
+        return rendered
+
+    def render_thumbnails(
+        self,
+        pdf_path: str,
+        page_indices: List[int],
+        max_size: Tuple[int, int] = (300, 400),
+    ) -> List[Image.Image]:
+        """
+        Render pages directly at thumbnail resolution.
+
+        Each page is rendered at the zoom that fits it into max_size, which is
+        far cheaper than rendering at full DPI and downscaling.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_indices: Page indices to render (0-indexed)
+            max_size: Maximum (width, height) of a thumbnail in pixels
+
+        Returns:
+            List of PIL Images, one per requested index
+
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If a page index is out of range
+        """
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        thumbnails = []
+        with fitz.open(pdf_path) as doc:
+            invalid = [idx for idx in page_indices if not 0 <= idx < len(doc)]
+            if invalid:
+                raise ValueError(f"Invalid page indices: {invalid} (total pages: {len(doc)})")
+
+            for page_num in page_indices:
+                page = doc[page_num]
+                zoom = min(max_size[0] / page.rect.width, max_size[1] / page.rect.height)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                thumbnails.append(self._pixmap_to_image(pix))
+
+        return thumbnails
+
+    def _pixmap_to_image(self, pix: "fitz.Pixmap") -> Image.Image:
+        """
+        Convert a pixmap to a PIL Image in the configured color space.
+
+        Args:
+            pix: Rendered pixmap (RGB or grayscale, without alpha)
+
+        Returns:
+            PIL Image
+        """
+        mode = "L" if pix.n == 1 else "RGB"
+        img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+        if self.color_space == "GRAY" and img.mode != "L":
+            img = img.convert("L")
+        elif self.color_space == "RGB" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        return img
+
     def get_metadata(self, pdf_path: str) -> dict:
         """
         Extract metadata from a PDF file.
@@ -0,0 +1,186 @@
+"""
+Streaming PDF Writer module for building image PDFs page by page.
+
+img2pdf needs every page up front and returns the whole document at once.
+StreamingPDFWriter instead writes each page to the output as soon as it is
+added, so memory use is bounded by one page and the file can be sent to a
+client while later pages are still being rendered.
+"""
+
+import logging
+import zlib
+from typing import BinaryIO, List
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Object numbers of the document catalog and page tree; pages follow
+CATALOG_OBJ = 1
+PAGES_OBJ = 2
+
+
+class StreamingPDFWriter:
+    """
+    Writes a PDF with one full-page image per page, incrementally.
+
+    Each page is stored as a Flate-compressed image (with the PNG "Up"
+    predictor, as PNG-embedding writers do). The page tree, cross-reference
+    table and trailer are written by close().
+    """
+
+    def __init__(self, stream: BinaryIO, compress_level: int = 6):
+        """
+        Initialize the writer and write the PDF header.
+
+        Args:
+            stream: Binary output stream
+            compress_level: zlib compression level (1-9)
+        """
+        self.stream = stream
+        self.compress_level = compress_level
+        self._offsets = {}
+        self._page_objs: List[int] = []
+        self._next_obj = PAGES_OBJ + 1
+        self._position = 0
+        self._closed = False
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages written so far."""
+        return len(self._page_objs)
+
+    def add_page(self, image: Image.Image, dpi: float = 72) -> None:
+        """
+        Write one image as a page.
+
+        Args:
+            image: Page image (converted to RGB or grayscale if needed)
+            dpi: Resolution the image was rendered at, which sets the page size
+
+        Raises:
+            ValueError: If the writer is already closed
+        """
+        if self._closed:
+            raise ValueError("Cannot add pages to a closed PDF")
+
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("L" if image.mode in ("1", "LA", "I", "F") else "RGB")
+        colors = 3 if image.mode == "RGB" else 1
+        color_space = "/DeviceRGB" if colors == 3 else "/DeviceGray"
+        width, height = image.size
+
+        # PNG "Up" filter: each row minus the row above, prefixed with filter type 2
+        rows = np.asarray(image, dtype=np.uint8).reshape(height, width * colors)
+        filtered = np.empty((height, width * colors + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        filtered[0, 1:] = rows[0]
+        np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+        data = zlib.compress(filtered.tobytes(), self.compress_level)
+
+        image_obj, content_obj, page_obj = self._allocate(3)
+
+        self._write_object(
+            image_obj,
+            (
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /FlateDecode "
+                f"/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 "
+                f"/Columns {width} >> /Length {len(data)} >>"
+            ).encode(),
+            data,
+        )
+
+        page_width = width * 72 / dpi
+        page_height = height * 72 / dpi
+        content = f"q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q".encode()
+        self._write_object(content_obj, f"<< /Length {len(content)} >>".encode(), content)
+
+        self._write_object(
+            page_obj,
+            (
+                f"<< /Type /Page /Parent {PAGES_OBJ} 0 R "
+                f"/MediaBox [0 0 {page_width:.4f} {page_height:.4f}] "
+                f"/Resources << /XObject << /Im0 {image_obj} 0 R >> >> "
+                f"/Contents {content_obj} 0 R >>"
+            ).encode(),
+        )
+        self._page_objs.append(page_obj)
+        self.stream.flush()
+
+    def close(self) -> None:
+        """
+        Write the page tree, cross-reference table and trailer.
+
+        Raises:
+            ValueError: If no page was added
+        """
+        if self._closed:
+            return
+        if not self._page_objs:
+            raise ValueError("A PDF needs at least one page")
+
+        kids = " ".join(f"{obj} 0 R" for obj in self._page_objs)
+        self._write_object(
+            PAGES_OBJ, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_objs)} >>".encode()
+        )
+        self._write_object(CATALOG_OBJ, f"<< /Type /Catalog /Pages {PAGES_OBJ} 0 R >>".encode())
+
+        xref_position = self._position
+        lines = [f"xref\n0 {self._next_obj}\n", "0000000000 65535 f \n"]
+        lines += [f"{self._offsets[obj]:010d} 00000 n \n" for obj in range(1, self._next_obj)]
+        lines.append(
+            f"trailer\n<< /Size {self._next_obj} /Root {CATALOG_OBJ} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        self._write("".join(lines).encode())
+        self.stream.flush()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Leave a failed document unterminated rather than hiding the error
+        if exc_type is None:
+            self.close()
+
+    def _allocate(self, count: int) -> List[int]:
+        numbers = list(range(self._next_obj, self._next_obj + count))
+        self._next_obj += count
+        return numbers
+
+    def _write_object(self, number: int, dictionary: bytes, stream_data: bytes = None):
+        self._offsets[number] = self._position
+        parts = [f"{number} 0 obj\n".encode(), dictionary]
+        if stream_data is not None:
+            parts += [b"\nstream\n", stream_data, b"\nendstream"]
+        parts.append(b"\nendobj\n")
+        self._write(b"".join(parts))
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self._position += len(data)
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    import sys
+
+    if len(sys.argv) > 2:
+        from src.pdf_processor import PDFProcessor
+
+        processor = PDFProcessor()
+        with open(sys.argv[2], "wb") as f, StreamingPDFWriter(f) as writer:
+            for page in processor.iter_pages_by_index(
+                sys.argv[1], range(processor.get_page_count(sys.argv[1]))
+            ):
+                writer.add_page(page, dpi=processor.dpi)
+        print(f"Wrote {writer.page_count} pages to {sys.argv[2]}")
+    else:
+        print("Usage: python -m src.pdf_writer <input_pdf> <output_pdf>")
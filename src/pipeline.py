@@ -0,0 +1,553 @@
+"""
+Pipeline module: the streaming page-processing engine shared by the CLI,
+the web app and the tools.
+
+A pipeline is a source of pages (usually render_pages) followed by stages.
+Stages with workers run on their own threads and are connected by bounded
+queues, so rendering, analysis and filtering of different pages overlap in
+time; a full queue blocks the stage feeding it (back-pressure), and the
+number of pages in flight is capped, so memory stays bounded whatever the
+document size. Inline stages (workers=0) run on the thread that called
+run(), in page order, after the threaded ones.
+
+Every stage reads and writes the job's PageTable. Work that needs all pages
+at once (applying blank thresholds to restored pages, grouping duplicates,
+writing the output) happens in Stage.finish(), called in stage order once
+every page has passed through.
+
+Progress is reported through PipelineEvent callbacks, always delivered on
+the calling thread: an exception raised by the callback (e.g. a cancelled
+job) stops the pipeline and propagates out of run().
+"""
+
+import logging
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from .duplicate_detector import pack_hashes
+from .page_store import PageStore
+from .page_table import PAGE_RENDERED, PageTable
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the stop flag while blocked on a queue
+_POLL_INTERVAL = 0.1
+
+_DONE = object()  # End of stream marker between stages
+_DROPPED = object()  # Placeholder of a page removed by a stage
+
+
+class PipelineEvent(NamedTuple):
+    """Progress of one stage."""
+    stage: str  # Stage name
+    done: int  # Pages the stage has handled so far
+    total: Optional[int]  # Pages expected, if known
+    index: Optional[int]  # Page the event is about, or None once the stage has finished
+
+
+class PageItem:
+    """A page flowing through the pipeline."""
+
+    __slots__ = ("index", "image")
+
+    def __init__(self, index: int, image: np.ndarray):
+        self.index = index
+        self.image = image  # uint8 raster (see PageStore.array)
+
+
+class Stage:
+    """
+    Base class of pipeline stages.
+
+    Subclasses override process() to handle one page and/or finish() for
+    work over all pages.
+    """
+
+    name = "stage"
+
+    def __init__(self, workers: int = 1):
+        """
+        Initialize the stage.
+
+        Args:
+            workers: Threads processing pages concurrently (0 = inline, on
+                the caller's thread in page order)
+        """
+        self.workers = workers
+
+    def process(self, item: PageItem) -> Optional[PageItem]:
+        """
+        Handle one page.
+
+        Args:
+            item: Page to handle
+
+        Returns:
+            The page to pass on, or None to drop it
+        """
+        return item
+
+    def finish(self):
+        """Complete the stage once every page has passed through."""
+
+
+class Pipeline:
+    """
+    Runs pages from a source through a list of stages.
+    """
+
+    SOURCE_STAGE = "render"  # Stage name of the events reported for the source
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        queue_size: int = 4,
+        on_event: Optional[Callable[[PipelineEvent], None]] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in order; inline stages (workers=0) must come last
+            queue_size: Capacity of the queue in front of each threaded stage
+            on_event: Optional progress callback, called on the caller's thread
+
+        Raises:
+            ValueError: If a threaded stage follows an inline stage
+        """
+        self.threaded = [stage for stage in stages if stage.workers > 0]
+        self.inline = [stage for stage in stages if stage.workers <= 0]
+        if list(stages) != self.threaded + self.inline:
+            raise ValueError("Inline stages (workers=0) must follow all threaded stages")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.on_event = on_event
+
+    @property
+    def max_in_flight(self) -> int:
+        """Most pages held between the source and the inline stages at once."""
+        return sum(self.queue_size + stage.workers for stage in self.threaded) + 1
+
+    def run(self, source: Iterable[PageItem], total: Optional[int] = None) -> List[int]:
+        """
+        Run every page of the source through the stages, then finish them.
+
+        Args:
+            source: Pages in order, e.g. render_pages output
+            total: Number of pages in the source, for progress events
+
+        Returns:
+            Indices of the pages that passed every stage, in order
+        """
+        passed = [item.index for item in self._stream(source, total)]
+        for stage in self.stages:
+            stage.finish()
+            self._emit(PipelineEvent(stage.name, len(passed), total, None))
+        return passed
+
+    def _emit(self, event: PipelineEvent):
+        if self.on_event:
+            self.on_event(event)
+
+    def _stream(self, source: Iterable[PageItem], total: Optional[int]) -> Iterator[PageItem]:
+        """Run the source and threaded stages, yielding pages after the inline stages."""
+        results: "queue.Queue" = queue.Queue()  # To the caller: items, drops, events, errors
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.threaded]
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        stop = threading.Event()
+        counts = [0] * len(self.threaded)
+        remaining = [stage.workers for stage in self.threaded]
+        lock = threading.Lock()
+
+        def put(target: "queue.Queue", message) -> bool:
+            """Put with back-pressure; gives up once the pipeline stops."""
+            while not stop.is_set():
+                try:
+                    target.put(message, timeout=_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def forward(position: int, message):
+            """Pass a message to the stage after the given one (or to the caller)."""
+            if position + 1 < len(queues):
+                return put(queues[position + 1], message)
+            results.put(("item",) + message if message is not _DONE else ("end",))
+            return True
+
+        def run_source():
+            pages = iter(source)
+            seq = 0
+            try:
+                for item in pages:
+                    while not in_flight.acquire(timeout=_POLL_INTERVAL):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    event = PipelineEvent(self.SOURCE_STAGE, seq + 1, total, item.index)
+                    results.put(("event", event))
+                    if not forward(-1, (seq, item)):
+                        return
+                    seq += 1
+                for _ in range(self.threaded[0].workers if self.threaded else 1):
+                    forward(-1, _DONE)
+            except BaseException as e:
+                results.put(("error", e))
+            finally:
+                close = getattr(pages, "close", None)
+                if close:
+                    close()
+
+        def run_worker(position: int):
+            stage = self.threaded[position]
+            try:
+                while not stop.is_set():
+                    try:
+                        message = queues[position].get(timeout=_POLL_INTERVAL)
+                    except queue.Empty:
+                        continue
+                    if message is _DONE:
+                        with lock:
+                            remaining[position] -= 1
+                            last = remaining[position] == 0
+                        if last:
+                            following = len(queues) > position + 1
+                            for _ in range(self.threaded[position + 1].workers if following else 1):
+                                forward(position, _DONE)
+                        return
+                    seq, item = message
+                    passed = stage.process(item)
+                    with lock:
+                        counts[position] += 1
+                        done = counts[position]
+                    results.put(("event", PipelineEvent(stage.name, done, total, item.index)))
+                    if passed is None:
+                        results.put(("drop", seq))
+                    elif not forward(position, (seq, passed)):
+                        return
+            except BaseException as e:
+                results.put(("error", e))
+
+        threads = [threading.Thread(target=run_source, name="pipeline-source", daemon=True)]
+        for position, stage in enumerate(self.threaded):
+            for worker in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=run_worker,
+                        args=(position,),
+                        name=f"pipeline-{stage.name}-{worker}",
+                        daemon=True,
+                    )
+                )
+
+        # Pages leave the threaded stages in any order; they are put back in
+        # source order before the inline stages
+        pending: Dict[int, object] = {}
+        next_seq = 0
+        inline_counts = [0] * len(self.inline)
+        try:
+            for thread in threads:
+                thread.start()
+            while True:
+                message = results.get()
+                kind = message[0]
+                if kind == "event":
+                    self._emit(message[1])
+                    continue
+                if kind == "error":
+                    raise message[1]
+                if kind == "end":
+                    break
+                pending[message[1]] = message[2] if kind == "item" else _DROPPED
+
+                while next_seq in pending:
+                    item = pending.pop(next_seq)
+                    next_seq += 1
+                    in_flight.release()
+                    if item is _DROPPED:
+                        continue
+                    for position, stage in enumerate(self.inline):
+                        index = item.index
+                        item = stage.process(item)
+                        inline_counts[position] += 1
+                        self._emit(PipelineEvent(stage.name, inline_counts[position], total, index))
+                        if item is None:
+                            break
+                    if item is not None:
+                        yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                if thread.is_alive():
+                    thread.join()
+
+
+def render_pages(
+    pdf_processor,
+    pdf_path: str,
+    store: PageStore,
+    page_indices: Optional[Iterable[int]] = None,
+) -> Iterator[PageItem]:
+    """
+    Render pages into a page store, as a pipeline source.
+
+    Args:
+        pdf_processor: PDFProcessor holding the render settings
+        pdf_path: Path to the PDF file
+        store: PageStore receiving the pages (used by the source thread only
+            while the pipeline streams)
+        page_indices: Pages to render (default: all pages)
+
+    Yields:
+        PageItem of each rendered page, in order
+    """
+    if page_indices is None:
+        page_indices = range(pdf_processor.get_page_count(pdf_path))
+    page_indices = list(page_indices)
+    for index, page in zip(page_indices, pdf_processor.iter_pages_by_index(pdf_path, page_indices)):
+        store.put(index, page)
+        yield PageItem(index, store.array(index))
+
+
+class AnalyzeStage(Stage):
+    """
+    Computes each page's blank metrics and, for duplicate detection, its hash.
+    """
+
+    name = "analyze"
+
+    def __init__(
+        self,
+        table: PageTable,
+        image_analyzer,
+        duplicate_detector=None,
+        hash_all: bool = False,
+        workers: int = 1,
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            table: PageTable receiving metrics and packed hashes
+            image_analyzer: ImageAnalyzer computing the metrics
+            duplicate_detector: DuplicateDetector computing hashes (None:
+                pages are not hashed)
+            hash_all: Hash blank pages too (e.g. when features are stored for
+                a later run with other blank thresholds)
+            workers: Threads analysing pages concurrently
+        """
+        super().__init__(workers)
+        self.table = table
+        self.image_analyzer = image_analyzer
+        self.duplicate_detector = duplicate_detector
+        self.hash_all = hash_all
+        self._lock = threading.Lock()
+
+    def process(self, item: PageItem) -> PageItem:
+        index = item.index
+        metrics = self.image_analyzer.compute_metrics(item.image)
+        self.table.set_page_metrics(index, metrics, PAGE_RENDERED)
+        if self.duplicate_detector is not None:
+            page_hash = None
+            blank = self.image_analyzer.blank_mask(self.table.rows[index:index + 1])[0]
+            if self.hash_all or not blank:
+                image = Image.fromarray(item.image)
+                page_hash = self.duplicate_detector.compute_page_hashes([image])[0]
+            with self._lock:
+                self.table.set_hashes(index, pack_hashes([page_hash]))
+        return item
+
+
+class BlankFilterStage(Stage):
+    """
+    Drops blank pages; on finish, applies the thresholds to every page of the table.
+    """
+
+    name = "blank_filter"
+
+    def __init__(self, table: PageTable, image_analyzer, workers: int = 0):
+        """
+        Initialize the stage.
+
+        Args:
+            table: PageTable holding the metrics
+            image_analyzer: ImageAnalyzer holding the thresholds
+            workers: Threads (default: inline)
+        """
+        super().__init__(workers)
+        self.table = table
+        self.image_analyzer = image_analyzer
+        self.non_blank_indices: List[int] = []
+
+    def process(self, item: PageItem) -> Optional[PageItem]:
+        index = item.index
+        if self.image_analyzer.blank_mask(self.table.rows[index:index + 1])[0]:
+            return None
+        return item
+
+    def finish(self):
+        # Covers pages that never streamed (restored from a checkpoint or cache)
+        self.non_blank_indices = self.table.apply_blank_thresholds(self.image_analyzer).tolist()
+
+
+class DedupeStage(Stage):
+    """
+    Groups duplicate non-blank pages by their packed hashes, on finish.
+    """
+
+    name = "dedupe"
+
+    def __init__(
+        self,
+        table: PageTable,
+        duplicate_detector,
+        page_images: Optional[Callable[[List[int]], Sequence[Image.Image]]] = None,
+        workers: int = 0,
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            table: PageTable holding hashes and blank flags
+            duplicate_detector: DuplicateDetector holding the thresholds
+            page_images: Callable returning pages by index, needed only when
+                a verification stage is enabled
+            workers: Threads (default: inline)
+        """
+        super().__init__(workers)
+        self.table = table
+        self.duplicate_detector = duplicate_detector
+        self.page_images = page_images
+
+    def finish(self):
+        non_blank = self.table.non_blank_indices()
+        if len(non_blank) == 0:
+            return
+        if self.table.packed_hashes is None:
+            self.table.set_hashes(0, np.zeros((len(self.table), 1), dtype=np.uint8))
+
+        def load_page(position: int) -> List[Image.Image]:
+            return list(self.page_images([int(non_blank[position])]))
+
+        labels = self.duplicate_detector.group_packed_hashes(
+            self.table.packed_hashes[non_blank],
+            load_page if self.page_images is not None else None,
+        )
+        self.table.set_duplicate_groups(non_blank, labels)
+
+
+class WriteStage(Stage):
+    """
+    Saves the pages that are neither blank nor duplicates as one report, on finish.
+    """
+
+    name = "write"
+
+    def __init__(
+        self,
+        table: PageTable,
+        file_manager,
+        page_images: Callable[[List[int]], Sequence[Image.Image]],
+        original_filename: str = "",
+        deduplicated: bool = True,
+        defer_if_duplicates: bool = False,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        dpi: float = 72,
+        workers: int = 0,
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            table: PageTable holding the blank and duplicate marks
+            file_manager: FileManager writing the output
+            page_images: Callable returning pages by index (e.g. PageStore.images)
+            original_filename: Input file name without extension, used in the output name
+            deduplicated: Whether duplicate detection ran (recorded in the metadata)
+            defer_if_duplicates: Write nothing when duplicates were found (the
+                caller lets a user choose the pages instead)
+            progress_callback: Optional callback(pages_done, total_pages)
+            dpi: Resolution the pages were rendered at
+            workers: Threads (default: inline)
+        """
+        super().__init__(workers)
+        self.table = table
+        self.file_manager = file_manager
+        self.page_images = page_images
+        self.original_filename = original_filename
+        self.deduplicated = deduplicated
+        self.defer_if_duplicates = defer_if_duplicates
+        self.progress_callback = progress_callback
+        self.dpi = dpi
+        self.saved: Optional[Dict[str, str]] = None
+        self.page_count = 0
+
+    def finish(self):
+        unique_indices = self.table.unique_indices().tolist()
+        if not unique_indices or (self.defer_if_duplicates and self.table.duplicate_count):
+            return
+
+        summary = self.table.summary()
+        if self.deduplicated:
+            mode = "blank_removal_and_deduplication"
+        else:
+            mode = "blank_removal_only"
+        metadata = {
+            "original_page_indices": list(range(len(unique_indices))),
+            "total_pages": summary["total_pages"],
+            "blank_pages_removed": summary["blank_pages"],
+            "duplicate_pages_removed": summary["duplicate_pages"],
+            "processing_mode": mode,
+        }
+        # Streamed: only the page being written is held in memory
+        self.saved = self.file_manager.save_report_stream(
+            self._written_pages(unique_indices),
+            self.file_manager.report_filename(1, self.original_filename),
+            metadata,
+            dpi=self.dpi,
+            output_format=self.file_manager.output_format,
+        )
+        self.page_count = len(unique_indices)
+
+    def _written_pages(self, indices: List[int]) -> Iterator[Image.Image]:
+        """Yield pages to the writer, reporting each once it has been written."""
+        for done, image in enumerate(self.page_images(indices), 1):
+            yield image
+            if self.progress_callback:
+                self.progress_callback(done, len(indices))
+
+
+if __name__ == "__main__":
+    # Setup basic logging for testing
+    logging.basicConfig(level=logging.INFO)
+
+    import sys
+
+    from .image_analyzer import ImageAnalyzer
+    from .pdf_processor import PDFProcessor
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.pipeline <pdf>")
+        sys.exit(1)
+
+    def print_finished(event: PipelineEvent):
+        """Print the end of each stage."""
+        if event.index is None:
+            print(event)
+
+    processor = PDFProcessor(dpi=100)
+    analyzer = ImageAnalyzer()
+    with PageStore() as store:
+        table = PageTable(processor.get_page_count(sys.argv[1]))
+        pipeline = Pipeline(
+            [AnalyzeStage(table, analyzer, workers=2), BlankFilterStage(table, analyzer)],
+            on_event=print_finished,
+        )
+        non_blank = pipeline.run(render_pages(processor, sys.argv[1], store), len(table))
+        print(f"Non-blank pages: {non_blank}")
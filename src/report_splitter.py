@@ -2,7 +2,9 @@
 Report Splitter module for identifying report boundaries in a sequence of pages.
 
 This module uses OCR and pattern detection to identify where individual reports
-begin and end in a multi-report PDF document.
+begin and end in a multi-report PDF document. When page references are given,
+header text is read from the PDF text layer first; only image-only pages are
+OCR'd, in parallel by a pool of long-lived Tesseract workers (see ocr_pool).
 """
 
 import logging
@@ -11,16 +13,14 @@ import numpy as np
 from PIL import Image
 import re
 
-# Optional OCR import
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-    logging.warning("pytesseract not available. OCR-based splitting will be disabled.")
+from .ocr_pool import OCRWorkerPool, tesseract_available
+from .pdf_processor import PDFProcessor, PageRef
 
 logger = logging.getLogger(__name__)
 
+# Header regions are compared at this fixed size (width, height) in grayscale
+HEADER_SIGNATURE_SIZE = (256, 64)
+
 
 class Report:
     """Represents a single report with its pages and metadata."""
@@ -58,6 +58,11 @@ class ReportSplitter:
         footer_detection_region: Tuple[float, float, float, float] = (0, 0.8, 1.0, 1.0),
         header_keywords: List[str] = None,
         min_confidence: int = 60,
+        ocr_workers: Optional[int] = None,
+        ocr_batch_size: int = 16,
+        ocr_dpi: int = 150,
+        heuristic_dpi: int = 72,
+        ocr_backend: str = "auto",
     ):
         """
         Initialize the Report Splitter.
@@ -69,8 +74,15 @@ class ReportSplitter:
             footer_detection_region: Region to search for footers
             header_keywords: Keywords that indicate a report header
             min_confidence: Minimum OCR confidence score (0-100)
+            ocr_workers: Number of persistent OCR workers (default: CPU count)
+            ocr_batch_size: Header crops per tesseract invocation (cli backend)
+            ocr_dpi: Resolution for header regions rendered for OCR
+            heuristic_dpi: Resolution for header regions rendered for the
+                heuristic layout comparison
+            ocr_backend: OCR backend of the worker pool (auto, tesserocr, cli)
         """
-        self.use_ocr = use_ocr and TESSERACT_AVAILABLE
+        ocr_available = tesseract_available()
+        self.use_ocr = use_ocr and ocr_available
         self.ocr_language = ocr_language
         self.header_detection_region = header_detection_region
         self.footer_detection_region = footer_detection_region
@@ -83,33 +95,71 @@ class ReportSplitter:
             "clinic",
         ]
         self.min_confidence = min_confidence
+        self.ocr_workers = ocr_workers
+        self.ocr_batch_size = ocr_batch_size
+        self.ocr_dpi = ocr_dpi
+        self.heuristic_dpi = heuristic_dpi
+        self.ocr_backend = ocr_backend
+        self._ocr_pool: Optional[OCRWorkerPool] = None
+        self._pdf_processor = PDFProcessor()
 
-        if self.use_ocr and not TESSERACT_AVAILABLE:
-            logger.warning("OCR requested but pytesseract not available. Disabling OCR.")
-            self.use_ocr = False
+        if use_ocr and not ocr_available:
+            logger.warning("OCR requested but Tesseract not available. Disabling OCR.")
 
         logger.info(
             f"ReportSplitter initialized: use_ocr={self.use_ocr}, "
             f"language={ocr_language}, keywords={len(self.header_keywords)}"
         )
 
-    def split_reports(self, images: List[Image.Image]) -> List[Report]:
+    @property
+    def ocr_pool(self) -> OCRWorkerPool:
+        """OCR worker pool, started on first use and reused across documents."""
+        if self._ocr_pool is None:
+            self._ocr_pool = OCRWorkerPool(
+                language=self.ocr_language,
+                psm=6,
+                max_workers=self.ocr_workers,
+                batch_size=self.ocr_batch_size,
+                backend=self.ocr_backend,
+            )
+        return self._ocr_pool
+
+    def close(self):
+        """Stop the OCR workers."""
+        if self._ocr_pool is not None:
+            self._ocr_pool.close()
+            self._ocr_pool = None
+
+    def split_reports(
+        self, images: List[Image.Image], page_refs: Optional[List[PageRef]] = None
+    ) -> List[Report]:
         """
         Split a list of images into individual reports.
 
         Args:
             images: List of PIL Images to split
+            page_refs: Optional source PDF references for each image; pages with
+                a text layer are then checked without OCR
 
         Returns:
-            List of Report objects
+            List of Report objects (metadata["ocr_pages"] lists the page
+            indices of the report that went through OCR)
+
+        Raises:
+            ValueError: If page_refs does not match images
         """
         logger.info(f"Splitting {len(images)} pages into individual reports")
 
+        if page_refs is not None and len(page_refs) != len(images):
+            raise ValueError(
+                f"Got {len(page_refs)} page references for {len(images)} images"
+            )
+
         if not images:
             return []
 
         # Detect report boundaries
-        boundaries = self._detect_boundaries(images)
+        boundaries, ocr_pages = self._detect_boundaries(images, page_refs)
 
         # Create Report objects
         reports = []
@@ -119,7 +169,11 @@ class ReportSplitter:
             report = Report(
                 pages=report_pages,
                 page_indices=page_indices,
-                metadata={"start_page": start_idx + 1, "end_page": end_idx},
+                metadata={
+                    "start_page": start_idx + 1,
+                    "end_page": end_idx,
+                    "ocr_pages": [idx for idx in page_indices if idx in ocr_pages],
+                },
             )
             reports.append(report)
             logger.info(f"Created report: pages {start_idx + 1} to {end_idx}")
@@ -127,44 +181,86 @@ class ReportSplitter:
         logger.info(f"Split into {len(reports)} reports")
         return reports
 
-    def _detect_boundaries(self, images: List[Image.Image]) -> List[Tuple[int, int]]:
+    def _detect_boundaries(
+        self, images: List[Image.Image], page_refs: Optional[List[PageRef]] = None
+    ) -> Tuple[List[Tuple[int, int]], set]:
         """
         Detect report boundaries in the image sequence.
 
         Args:
             images: List of PIL Images
+            page_refs: Optional source PDF references for each image
 
         Returns:
-            List of (start_index, end_index) tuples for each report
+            Tuple of:
+            - List of (start_index, end_index) tuples for each report
+            - Set of page indices that went through OCR
         """
         if self.use_ocr:
-            return self._detect_boundaries_ocr(images)
+            return self._detect_boundaries_ocr(images, page_refs)
         else:
-            return self._detect_boundaries_heuristic(images)
+            return self._detect_boundaries_heuristic(images, page_refs), set()
 
-    def _detect_boundaries_ocr(self, images: List[Image.Image]) -> List[Tuple[int, int]]:
+    def _read_header_texts(
+        self, images: List[Image.Image], page_refs: Optional[List[PageRef]] = None
+    ) -> Tuple[List[str], set]:
         """
-        Detect report boundaries using OCR to find headers.
+        Read header text for every page, preferring the PDF text layer over OCR.
 
         Args:
             images: List of PIL Images
+            page_refs: Optional source PDF references for each image
 
         Returns:
-            List of (start_index, end_index) tuples
+            Tuple of (header text per page, set of page indices that were OCR'd)
+        """
+        texts: List[Optional[str]] = [None] * len(images)
+        if page_refs is not None:
+            texts = self._pdf_processor.extract_region_text(
+                page_refs, self.header_detection_region
+            )
+
+        # OCR only the image-only pages, in parallel on the worker pool
+        ocr_indices = [idx for idx, text in enumerate(texts) if text is None]
+        if ocr_indices:
+            header_regions = self._header_regions(images, page_refs, ocr_indices, self.ocr_dpi)
+            for idx, text in zip(ocr_indices, self.ocr_pool.map_images(header_regions)):
+                texts[idx] = text
+
+        logger.info(
+            f"Header text: {len(images) - len(ocr_indices)} pages from text layer, "
+            f"{len(ocr_indices)} pages via OCR"
+        )
+        return texts, set(ocr_indices)
+
+    def _detect_boundaries_ocr(
+        self, images: List[Image.Image], page_refs: Optional[List[PageRef]] = None
+    ) -> Tuple[List[Tuple[int, int]], set]:
         """
-        logger.info("Detecting boundaries using OCR")
+        Detect report boundaries by finding header keywords in page headers.
+
+        Args:
+            images: List of PIL Images
+            page_refs: Optional source PDF references for each image
+
+        Returns:
+            Tuple of (list of (start_index, end_index) tuples, set of OCR'd pages)
+        """
+        logger.info("Detecting boundaries using header text")
+
+        texts, ocr_pages = self._read_header_texts(images, page_refs)
 
         # Find pages with headers
         header_pages = []
-        for idx, image in enumerate(images):
-            if self._has_header(image):
+        for idx, text in enumerate(texts):
+            if self._text_has_header(text):
                 header_pages.append(idx)
                 logger.debug(f"Header detected on page {idx + 1}")
 
         # If no headers found, treat entire sequence as one report
         if not header_pages:
             logger.warning("No headers detected. Treating all pages as single report.")
-            return [(0, len(images))]
+            return [(0, len(images))], ocr_pages
 
         # Create boundaries based on header positions
         boundaries = []
@@ -179,9 +275,11 @@ class ReportSplitter:
         if header_pages[0] > 0:
             boundaries.insert(0, (0, header_pages[0]))
 
-        return boundaries
+        return boundaries, ocr_pages
 
-    def _detect_boundaries_heuristic(self, images: List[Image.Image]) -> List[Tuple[int, int]]:
+    def _detect_boundaries_heuristic(
+        self, images: List[Image.Image], page_refs: Optional[List[PageRef]] = None
+    ) -> List[Tuple[int, int]]:
         """
         Detect report boundaries using heuristic methods (without OCR).
 
@@ -191,18 +289,26 @@ class ReportSplitter:
 
         Args:
             images: List of PIL Images
+            page_refs: Optional source PDF references for each image
 
         Returns:
             List of (start_index, end_index) tuples
         """
         logger.info("Detecting boundaries using heuristic methods (no OCR)")
 
+        # Each page's header signature is computed once and reused for both
+        # of its consecutive-page comparisons
+        header_regions = self._header_regions(
+            images, page_refs, range(len(images)), self.heuristic_dpi
+        )
+        signatures = [self._header_signature(region) for region in header_regions]
+
         # Simple heuristic: look for pages with significantly different top regions
         # This can indicate a new report starting
         boundary_indices = [0]  # Always start at page 0
 
         for idx in range(1, len(images)):
-            if self._is_likely_new_report(images[idx - 1], images[idx]):
+            if self._is_likely_new_report(signatures[idx - 1], signatures[idx]):
                 boundary_indices.append(idx)
                 logger.debug(f"Potential boundary detected at page {idx + 1}")
 
@@ -219,66 +325,116 @@ class ReportSplitter:
 
         return boundaries
 
-    def _has_header(self, image: Image.Image) -> bool:
+    def _header_regions(
+        self,
+        images: List[Image.Image],
+        page_refs: Optional[List[PageRef]],
+        indices,
+        dpi: int,
+    ) -> List[Image.Image]:
         """
-        Check if an image has a report header using OCR.
+        Get header region images for the given pages.
+
+        With page references, only the header clip rectangle is rendered from
+        the source PDF at the requested DPI; otherwise the header is cropped
+        from the already rendered page image.
 
         Args:
-            image: PIL Image to check
+            images: List of PIL Images
+            page_refs: Optional source PDF references for each image
+            indices: Indices of the pages to get headers for
+            dpi: Resolution for rendered header regions
 
         Returns:
-            True if header detected
+            List of PIL Images of the header regions
+        """
+        indices = list(indices)
+        if page_refs is not None:
+            refs = [page_refs[idx] for idx in indices]
+            return self._pdf_processor.render_regions(refs, [self.header_detection_region], dpi)[0]
+        return [self._crop_header(images[idx]) for idx in indices]
+
+    def _crop_header(self, image: Image.Image) -> Image.Image:
+        """
+        Crop the header detection region of a page.
+
+        Args:
+            image: PIL Image of the page
+
+        Returns:
+            PIL Image of the header region
         """
-        # Extract header region
         width, height = image.size
         x1 = int(width * self.header_detection_region[0])
         y1 = int(height * self.header_detection_region[1])
         x2 = int(width * self.header_detection_region[2])
         y2 = int(height * self.header_detection_region[3])
 
-        header_region = image.crop((x1, y1, x2, y2))
+        return image.crop((x1, y1, x2, y2))
 
-        # Perform OCR
-        try:
-            text = pytesseract.image_to_string(
-                header_region, lang=self.ocr_language, config="--psm 6"
-            ).lower()
+    def _text_has_header(self, text: str) -> bool:
+        """
+        Check if header text contains any of the header keywords.
+
+        Args:
+            text: Text read from the header region
 
-            # Check for keywords
-            for keyword in self.header_keywords:
-                if keyword.lower() in text:
-                    logger.debug(f"Header keyword found: {keyword}")
-                    return True
+        Returns:
+            True if a header keyword is present
+        """
+        text = text.lower()
+        for keyword in self.header_keywords:
+            if keyword.lower() in text:
+                logger.debug(f"Header keyword found: {keyword}")
+                return True
+        return False
+
+    def _has_header(self, image: Image.Image) -> bool:
+        """
+        Check if an image has a report header using OCR.
+
+        Args:
+            image: PIL Image to check
 
+        Returns:
+            True if header detected
+        """
+        try:
+            text = self.ocr_pool.image_to_string(self._crop_header(image))
         except Exception as e:
             logger.error(f"OCR error: {e}")
+            return False
 
-        return False
+        return self._text_has_header(text)
 
-    def _is_likely_new_report(self, prev_image: Image.Image, current_image: Image.Image) -> bool:
+    def _header_signature(self, header_region: Image.Image) -> np.ndarray:
         """
-        Determine if current image likely starts a new report (heuristic method).
+        Compute a compact signature of a header region for layout comparison.
 
         Args:
-            prev_image: Previous page image
-            current_image: Current page image
+            header_region: PIL Image of the header region
 
         Returns:
-            True if current page likely starts a new report
+            Grayscale float32 array of size HEADER_SIGNATURE_SIZE
         """
-        # Compare header regions of consecutive pages
-        width, height = current_image.size
-        x1 = int(width * self.header_detection_region[0])
-        y1 = int(height * self.header_detection_region[1])
-        x2 = int(width * self.header_detection_region[2])
-        y2 = int(height * self.header_detection_region[3])
+        thumb = header_region.convert("L").resize(HEADER_SIGNATURE_SIZE, Image.BILINEAR)
+        return np.asarray(thumb, dtype=np.float32)
+
+    def _is_likely_new_report(
+        self, prev_signature: np.ndarray, current_signature: np.ndarray
+    ) -> bool:
+        """
+        Determine if current page likely starts a new report (heuristic method).
 
-        prev_header = np.array(prev_image.crop((x1, y1, x2, y2)))
-        curr_header = np.array(current_image.crop((x1, y1, x2, y2)))
+        Args:
+            prev_signature: Header signature of the previous page
+            current_signature: Header signature of the current page
 
-        # Calculate difference
-        diff = np.abs(prev_header.astype(float) - curr_header.astype(float))
-        mean_diff = np.mean(diff)
+        Returns:
+            True if current page likely starts a new report
+        """
+        # Calculate difference between header regions of consecutive pages
+        mean_diff = np.mean(np.abs(prev_signature - current_signature))
 
         # If headers are significantly different, might be a new report
         threshold = 30  # Adjust based on testing
@@ -0,0 +1,47 @@
+"""
+Shared pytest fixtures.
+"""
+
+import io
+import os
+
+import fitz
+import pytest
+from PIL import Image
+
+
+def pytest_configure(config):
+    """Keep jobs in memory for tests instead of the shared SQLite database."""
+    # Runs before test modules (and so config.config) are imported
+    os.environ.setdefault("JOB_STORE_BACKEND", "memory")
+
+
+def _image_bytes(color: str = "gray") -> bytes:
+    """Encode a solid-colour PNG for embedding in test PDFs."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (200, 260), color=color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """
+    Create a 3-page PDF: a born-digital page with a header, a scanned
+    (image-only) page, and a born-digital page with body text only.
+    """
+    pdf_path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((50, 60), "Patient Name: Jane Doe")
+    page.insert_text((50, 400), "Findings: unremarkable")
+
+    page = doc.new_page(width=595, height=842)
+    page.insert_image(page.rect, stream=_image_bytes())
+
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((50, 500), "Continued from previous page")
+
+    doc.save(pdf_path)
+    doc.close()
+    return str(pdf_path)
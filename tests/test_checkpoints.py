@@ -0,0 +1,166 @@
+"""
+Unit tests for job checkpoints and resuming interrupted jobs.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+import copy
+import shutil
+
+import fitz
+import numpy as np
+import pytest
+
+from app.api import routes
+from app.api.models import ProcessingStatus
+from app.core import processor
+from app.core.checkpoints import CheckpointStore, JobCheckpoint, PageBatch
+from app.core.executor import JobCancelledError
+from app.core.job_store import InMemoryJobStore
+from app.core.processor import _process_pdf_sync
+from app.core.tasks import JobManager
+from config.config import get_config
+
+
+@pytest.fixture
+def report_pdf(tmp_path):
+    """Create a 4-page PDF: two reports, a blank page, and the first report again."""
+    pdf_path = tmp_path / "reports.pdf"
+    doc = fitz.open()
+    for text in ["Report A", "Report B", None, "Report A"]:
+        page = doc.new_page(width=595, height=842)
+        if text:
+            for line in range(30):
+                page.insert_text((50, 60 + 24 * line), f"{text} line {line} " * 4, fontsize=11)
+        if text == "Report B":
+            page.draw_rect(fitz.Rect(50, 50, 545, 420), color=(0, 0, 0), fill=(0, 0, 0))
+    doc.save(pdf_path)
+    doc.close()
+    return str(pdf_path)
+
+
+def test_batches_round_trip_and_claims_are_exclusive(tmp_path):
+    """Test that stored batches load back and a held checkpoint cannot be claimed again."""
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    checkpoint = store.claim("job1")
+    assert checkpoint is not None
+
+    metrics = [{
+        "variance": 1.5,
+        "white_ratio": 0.9,
+        "edge_count": None,
+        "mean_pixel": 250.0,
+        "std_dev": 3.0,
+    }]
+    packed = np.array([[7, 1]], dtype=np.uint8)
+    checkpoint.save_batch("key", 10, PageBatch(metrics, packed))
+    checkpoint.write_job({"job_id": "job1", "input_path": "in.pdf"})
+
+    batches = JobCheckpoint(str(tmp_path / "checkpoints" / "job1")).load_batches("key")
+    assert list(batches) == [10]
+    assert batches[10].metrics == metrics
+    assert batches[10].packed_hashes.tolist() == packed.tolist()
+    assert checkpoint.load_batches("other settings") == {}
+    assert store.job_ids() == ["job1"]
+
+    # Another holder (e.g. another worker) is refused until the lock is released
+    assert JobCheckpoint(str(tmp_path / "checkpoints" / "job1")).claim() is False
+    store.release("job1", clear=False)
+    assert store.claim("job1").read_job()["input_path"] == "in.pdf"
+
+    store.release("job1")
+    assert store.job_ids() == []
+
+
+def test_clear_keeps_the_lock_until_the_checkpoint_is_removed(tmp_path, monkeypatch):
+    """Test that a checkpoint being cleared cannot be claimed until its lock file goes."""
+    path = tmp_path / "checkpoints" / "job1"
+    checkpoint = JobCheckpoint(str(path))
+    assert checkpoint.claim()
+    checkpoint.write_job({"job_id": "job1"})
+    checkpoint.save_batch("key", 0, PageBatch([], None))
+
+    claimed_during_removal = []
+    rmtree = shutil.rmtree
+
+    def checking_rmtree(target, *args, **kwargs):
+        rmtree(target, *args, **kwargs)
+        claimed_during_removal.append(JobCheckpoint(str(path)).claim())
+
+    monkeypatch.setattr(shutil, "rmtree", checking_rmtree)
+    checkpoint.clear()
+
+    assert claimed_during_removal == [False]
+    assert not path.exists()
+    assert JobCheckpoint(str(path)).claim()
+
+
+def test_interrupted_job_resumes_after_last_batch(report_pdf, tmp_path):
+    """Test that a rerun skips checkpointed batches and a finished job returns its stored result."""
+    config = copy.deepcopy(get_config())
+    config["pdf"]["dpi"] = 50
+    config["performance"]["batch_size"] = 2
+    config["feature_cache"]["enabled"] = False
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    out_dir = str(tmp_path / "out")
+
+    steps = []
+
+    def crash_in_second_batch():
+        if "Analyzing pages (3/4)" in steps:
+            raise JobCancelledError("worker stopped")
+
+    with pytest.raises(JobCancelledError):
+        _process_pdf_sync(
+            "job1", report_pdf, out_dir, config, None, checkpoint_dir,
+            progress_callback=lambda progress, step: steps.append(step),
+            check_cancelled=crash_in_second_batch,
+        )
+
+    resumed_steps = []
+    result = _process_pdf_sync(
+        "job1", report_pdf, out_dir, config, None, checkpoint_dir,
+        progress_callback=lambda progress, step: resumed_steps.append(step),
+    )
+
+    # Only the second batch is rendered again
+    assert "Extracting pages (1/4)" not in resumed_steps
+    assert "Extracting pages (3/4)" in resumed_steps
+    assert result.total_pages == 4
+    assert result.blank_pages == 1
+    assert [p.duplicate_of for p in result.pages] == [None, None, 0]
+
+    # A job interrupted after finishing returns the stored result without rendering
+    final_steps = []
+    stored = _process_pdf_sync(
+        "job1", report_pdf, out_dir, config, None, checkpoint_dir,
+        progress_callback=lambda progress, step: final_steps.append(step),
+    )
+    assert final_steps == []
+    assert stored.model_dump() == result.model_dump()
+
+
+def test_job_claimed_by_another_worker_is_left_alone(report_pdf, tmp_path, monkeypatch):
+    """Test that a worker losing the claim neither fails nor completes the job."""
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    manager = JobManager(store=InMemoryJobStore())
+    monkeypatch.setattr(processor, "checkpoint_store", store)
+    monkeypatch.setattr(processor, "job_manager", manager)
+    monkeypatch.setattr(processor.result_cache, "enabled", False)
+    monkeypatch.setattr(routes, "job_manager", manager)
+
+    job_id = asyncio.run(manager.create_job("reports.pdf"))
+    holder = JobCheckpoint(str(tmp_path / "checkpoints" / job_id))
+    assert holder.claim() is True
+
+    asyncio.run(routes._process_and_update(job_id, report_pdf, str(tmp_path / "out"), {}, 4))
+
+    job = asyncio.run(manager.get_job(job_id))
+    assert job["status"] == ProcessingStatus.PENDING
+    assert job["error"] is None
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_checkpoints.py -v
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+"""
+Unit tests for the Duplicate Detector module.
+
+Run with: pytest tests/
+"""
+
+import pytest
+from PIL import Image
+import numpy as np
+from src.duplicate_detector import DuplicateDetector, cluster_pairs
+
+
+def make_page(seed: int, size=(400, 500)) -> Image.Image:
+    """Create a page with random block content determined by the seed."""
+    rng = np.random.default_rng(seed)
+    arr = np.full((size[1], size[0]), 255, dtype=np.uint8)
+    for _ in range(12):
+        x, y = rng.integers(0, size[0] - 80), rng.integers(0, size[1] - 40)
+        arr[y:y + 30, x:x + 70] = rng.integers(0, 120)
+    return Image.fromarray(arr).convert("RGB")
+
+
+class TestDuplicateDetector:
+    """Test cases for DuplicateDetector class."""
+
+    @pytest.fixture
+    def pages(self):
+        """Two distinct pages plus an exact copy of the first."""
+        page_a = make_page(1)
+        page_b = make_page(2)
+        return [page_a, page_b, page_a.copy()]
+
+    def test_find_duplicates(self, pages):
+        """Test that an exact copy is reported as a duplicate of the original."""
+        detector = DuplicateDetector(hash_algorithm="phash")
+
+        unique, pairs = detector.find_duplicates([[p] for p in pages])
+
+        assert unique == [0, 1]
+        assert [(i, j) for i, j, _ in pairs] == [(0, 2)]
+
+    @pytest.mark.parametrize("method", ["phash", "ncc"])
+    def test_cascade_confirms_true_duplicates(self, pages, method):
+        """Test that the verification stage keeps real duplicates."""
+        detector = DuplicateDetector(hash_algorithm="dhash", verify_method=method)
+
+        unique, pairs = detector.find_duplicates([[p] for p in pages])
+
+        assert unique == [0, 1]
+        assert [(i, j) for i, j, _ in pairs] == [(0, 2)]
+
+    @pytest.mark.parametrize("method", ["phash", "ncc"])
+    def test_cascade_rejects_false_candidates(self, pages, method):
+        """Test that a permissive candidate stage is tightened by verification."""
+        loose = DuplicateDetector(hash_algorithm="dhash", hamming_distance_threshold=64)
+        cascade = DuplicateDetector(
+            hash_algorithm="dhash",
+            hamming_distance_threshold=64,
+            verify_method=method,
+            verify_distance_threshold=5,
+        )
+        reports = [[p] for p in pages]
+
+        assert loose.find_duplicates(reports)[0] == [0]
+        assert cascade.find_duplicates(reports)[0] == [0, 1]
+
+    def test_verification_runs_only_on_candidates(self, pages, monkeypatch):
+        """Test that verification features are computed only for candidate pages."""
+        detector = DuplicateDetector(hash_algorithm="phash", verify_method="ncc")
+        calls = []
+        original = detector.compute_verification_feature
+
+        def counting(report_pages):
+            calls.append(report_pages)
+            return original(report_pages)
+
+        monkeypatch.setattr(detector, "compute_verification_feature", counting)
+        detector.find_duplicates([[p] for p in pages])
+
+        # Only pages 0 and 2 form a candidate pair
+        assert len(calls) == 2
+
+    def test_flat_pages_ncc(self):
+        """Test that NCC verification treats two flat pages as matching."""
+        detector = DuplicateDetector(verify_method="ncc")
+        white = Image.new("RGB", (200, 300), color="white")
+
+        is_dup, _ = detector.compare_two_reports([white], [white.copy()])
+
+        assert is_dup is True
+
+    def test_invalid_verify_method(self):
+        """Test that unknown verification methods are rejected."""
+        with pytest.raises(ValueError):
+            DuplicateDetector(verify_method="sift")
+
+    def test_none_string_disables_verification(self):
+        """Test that "none" (e.g. from an env var) disables verification."""
+        detector = DuplicateDetector(verify_method="none")
+
+        assert detector.verify_method is None
+
+    def test_similarity_matrix(self, pages):
+        """Test that the similarity matrix holds compact, symmetric distances."""
+        detector = DuplicateDetector(hash_algorithm="phash")
+
+        matrix = detector.get_similarity_matrix([[p] for p in pages])
+
+        assert matrix.shape == (3, 3)
+        assert matrix.dtype == np.uint8
+        assert (matrix == matrix.T).all()
+        assert (np.diag(matrix) == 0).all()
+        assert matrix[0, 2] == 0
+        assert matrix[0, 1] > detector.hamming_distance_threshold
+
+    def test_similarity_matrix_large_hash(self, pages):
+        """Test that hashes longer than 255 bits use a wider dtype."""
+        detector = DuplicateDetector(hash_algorithm="phash", hash_size=16)
+
+        matrix = detector.get_similarity_matrix([[p] for p in pages])
+
+        assert matrix.dtype == np.uint16
+
+    def test_similarity_pairs(self, pages):
+        """Test the sparse pair output under a distance cap."""
+        detector = DuplicateDetector(hash_algorithm="phash")
+        reports = [[p] for p in pages]
+
+        pairs = detector.get_similarity_pairs(reports)
+        all_pairs = detector.get_similarity_pairs(reports, max_distance=64)
+
+        assert list(zip(pairs.rows, pairs.cols)) == [(0, 2)]
+        assert len(all_pairs.rows) == 3
+        assert (all_pairs.rows < all_pairs.cols).all()
+
+    def test_find_duplicate_groups(self, pages):
+        """Test that duplicate groups use the lowest index as representative."""
+        detector = DuplicateDetector(hash_algorithm="phash")
+
+        labels = detector.find_duplicate_groups([[p] for p in pages] + [[pages[1]]])
+
+        assert labels.tolist() == [0, 1, 0, 1]
+
+    def test_cluster_pairs_transitive(self):
+        """Test that union-find merges chains of pairs into one group."""
+        labels = cluster_pairs(6, np.array([3, 1, 4]), np.array([5, 3, 5]))
+
+        assert labels.tolist() == [0, 1, 2, 1, 1, 1]
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_duplicate_detector.py -v
+    pytest.main([__file__, "-v"])
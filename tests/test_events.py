@@ -0,0 +1,142 @@
+"""
+Unit tests for multiplexed job event streams.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.models import ProcessingStatus
+from app.core.events import JobEventStream
+from app.core.job_store import InMemoryJobStore
+from app.core.tasks import JobManager
+
+
+async def take(stream: JobEventStream, count: int):
+    """Collect the next events of a stream as (job_id, progress) pairs."""
+    events = []
+    async for event in stream:
+        events.append((event.job_id, event.progress))
+        if len(events) == count:
+            break
+    return events
+
+
+def test_stream_follows_selected_jobs():
+    """Test the initial snapshot, live events and job set changes."""
+    manager = JobManager(store=InMemoryJobStore())
+    a = asyncio.run(manager.create_job("a.pdf"))
+    b = asyncio.run(manager.create_job("b.pdf"))
+
+    async def run():
+        stream = JobEventStream(manager, [a], poll_interval=60)
+        events = stream.__aiter__()
+        first = await events.__anext__()
+
+        await manager.update_progress(b, 10, "Ignored", ProcessingStatus.PROCESSING)
+        await manager.update_progress(a, 20, "Working", ProcessingStatus.PROCESSING)
+        await manager.update_progress(a, 20, "Working")  # Unchanged state is not repeated
+        await stream.add_jobs([b])
+        await manager.complete_job(a, None)
+        rest = await take(stream, 3)
+        stream.close()
+        return first, rest
+
+    first, rest = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert (first.job_id, first.status) == (a, ProcessingStatus.PENDING)
+    assert rest == [(a, 20), (b, 10), (a, 100)]
+
+
+def test_stream_follows_all_jobs_of_a_client():
+    """Test that a client stream gets that client's jobs, including jobs created later."""
+    manager = JobManager(store=InMemoryJobStore())
+    mine = asyncio.run(manager.create_job("mine.pdf", client_id="me"))
+    asyncio.run(manager.create_job("other.pdf", client_id="someone-else"))
+
+    async def run():
+        stream = JobEventStream(manager, client_id="me", poll_interval=60)
+        events = stream.__aiter__()
+        snapshot = await events.__anext__()
+
+        other = await manager.create_job("late-other.pdf", client_id="someone-else")
+        late = await manager.create_job("late.pdf", client_id="me")
+        await manager.update_progress(other, 50, "Working", ProcessingStatus.PROCESSING)
+        await manager.update_progress(late, 30, "Working", ProcessingStatus.PROCESSING)
+        live = await take(stream, 1)
+        await manager.complete_job(late, None)
+        live += await take(stream, 1)
+        owners = dict(stream._owners)
+        stream.close()
+        return snapshot.job_id, live, late, owners
+
+    snapshot_job, live, late, owners = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert snapshot_job == mine
+    assert live == [(late, 30), (late, 100)]
+    assert late not in owners  # Finished jobs are not cached
+
+
+def test_stream_polls_store_for_other_workers():
+    """Test that changes written to the store by another worker are delivered."""
+    manager = JobManager(store=InMemoryJobStore())
+    job_id = asyncio.run(manager.create_job("a.pdf", client_id="me"))
+
+    async def run():
+        stream = JobEventStream(manager, client_id="me", poll_interval=0.05)
+        events = stream.__aiter__()
+        await events.__anext__()  # Snapshot
+
+        # Another worker updates the shared store without publishing locally
+        manager.store.update(job_id, progress=70, current_step="Hashing", updated_at=datetime.now())
+        polled = await take(stream, 1)
+        stream.close()
+        return polled
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) == [(job_id, 70)]
+
+
+def test_client_snapshot_only_has_active_jobs():
+    """Test that a client stream starts with the client's active jobs only."""
+    manager = JobManager(store=InMemoryJobStore())
+    active = asyncio.run(manager.create_job("active.pdf", client_id="me"))
+    done = asyncio.run(manager.create_job("done.pdf", client_id="me"))
+    asyncio.run(manager.complete_job(done, None))
+
+    async def run():
+        stream = JobEventStream(manager, client_id="me", poll_interval=60)
+        events = stream.__aiter__()
+        snapshot = await events.__anext__()
+        pending = stream._subscription.get_nowait()
+        stream.close()
+        return snapshot.job_id, pending
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) == (active, [])
+
+
+def test_poll_catches_rows_committed_late():
+    """Test that a row stamped before the previous poll but written after it is delivered."""
+    manager = JobManager(store=InMemoryJobStore())
+    job_id = asyncio.run(manager.create_job("a.pdf"))
+
+    async def run():
+        stream = JobEventStream(manager, [job_id], poll_interval=0.05)
+        events = stream.__aiter__()
+        await events.__anext__()  # Snapshot
+        await asyncio.sleep(0.2)  # A few polls go by
+
+        # Stamped by another worker before the polls, committed after them
+        stamped_at = datetime.now() - timedelta(seconds=1)
+        manager.store.update(job_id, progress=60, current_step="Hashing", updated_at=stamped_at)
+        polled = await take(stream, 1)
+        stream.close()
+        return polled
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) == [(job_id, 60)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,358 @@
+"""
+Unit tests for the job executor.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.api.models import ProcessingStatus
+from app.core.executor import (
+    JobCancelledError,
+    JobExecutor,
+    JobQueueFullError,
+    worker_memory_limit_mb,
+)
+from app.core.processor import _process_pdf_sync
+from app.core.tasks import job_manager
+from config.config import get_config
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_run_relays_page_progress(sample_pdf, tmp_path, use_processes):
+    """Test that a job runs in the pool and page-level progress reaches the job manager."""
+    executor = JobExecutor(max_workers=1, max_concurrent_jobs=1, use_processes=use_processes)
+    job_id = asyncio.run(job_manager.create_job("sample.pdf"))
+    updates = []
+
+    async def on_progress(update):
+        updates.append(update.current_step)
+
+    async def run():
+        job_manager.register_progress_callback(job_id, on_progress)
+        try:
+            async with executor.slot(job_id, page_count=3):
+                result = await executor.run(
+                    job_id, _process_pdf_sync, job_id, sample_pdf, str(tmp_path), get_config()
+                )
+            # Let relayed updates drain onto the loop
+            await asyncio.sleep(0.5)
+            return result
+        finally:
+            job_manager.unregister_progress_callbacks(job_id)
+            executor.shutdown()
+
+    result = asyncio.run(run())
+
+    assert result.status is ProcessingStatus.COMPLETED
+    assert result.total_pages == 3
+    assert "Extracting pages (1/3)" in updates
+    assert "Analyzing pages (3/3)" in updates
+    assert asyncio.run(job_manager.get_job(job_id))["progress"] > 0
+
+
+def test_generation_progress_leaves_job_progress_alone():
+    """Test that PDF generation progress is kept apart from the completed job's progress."""
+    executor = JobExecutor(max_workers=1, max_concurrent_jobs=1, use_processes=False)
+    job_id = asyncio.run(job_manager.create_job("sample.pdf"))
+    asyncio.run(job_manager.update_progress(job_id, 100, "Waiting for user to select pages..."))
+
+    def generate(progress_callback, yield_point, check_cancelled):
+        progress_callback(50, "Writing pages (1/2)")
+
+    async def run():
+        try:
+            async with executor.slot(job_id, page_count=2):
+                await executor.run(job_id, generate, generation=True)
+            # Let relayed updates drain onto the loop
+            await asyncio.sleep(0.2)
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
+
+    job = asyncio.run(job_manager.get_job(job_id))
+    assert job["progress"] == 100
+    assert job["current_step"] == "Waiting for user to select pages..."
+    assert job["generation"] == {"progress": 50, "current_step": "Writing pages (1/2)"}
+
+
+def test_queue_limit():
+    """Test that jobs beyond the concurrency and queue limits are rejected."""
+    executor = JobExecutor(
+        max_workers=1, max_concurrent_jobs=1, max_queued_jobs=1, use_processes=False
+    )
+
+    async def run():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold_slot(job_id):
+            async with executor.slot(job_id, page_count=5):
+                started.set()
+                await release.wait()
+
+        holder = asyncio.create_task(hold_slot("holder"))
+        await started.wait()
+        waiter = asyncio.create_task(hold_slot("waiter"))
+        await asyncio.sleep(0)
+
+        assert executor.stats()["running_jobs"] == 1
+        assert executor.stats()["queued_jobs"] == 1
+        with pytest.raises(JobQueueFullError):
+            async with executor.slot("rejected", page_count=5):
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        executor.shutdown()
+
+    asyncio.run(run())
+
+
+class TestCancellation:
+    """Test cases for cooperative job cancellation."""
+
+    def test_waiting_job_leaves_the_queue(self, tmp_path):
+        """Test that cancelling a queued job fails its slot() at once."""
+        executor = JobExecutor(
+            max_workers=1, max_concurrent_jobs=1, use_processes=False, cancel_dir=str(tmp_path)
+        )
+
+        async def run():
+            release = asyncio.Event()
+
+            async def hold_slot(job_id):
+                async with executor.slot(job_id, page_count=5):
+                    await release.wait()
+
+            holder = asyncio.create_task(hold_slot("holder"))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(hold_slot("waiter"))
+            await asyncio.sleep(0)
+
+            executor.cancel("waiter")
+            with pytest.raises(JobCancelledError):
+                await waiter
+            assert executor.stats()["queued_jobs"] == 0
+
+            release.set()
+            await holder
+            executor.shutdown()
+
+        asyncio.run(run())
+
+    def test_running_job_stops_at_next_page(self, tmp_path):
+        """Test that a running job stops at its next check and the flag can be cleared."""
+        executor = JobExecutor(
+            max_workers=1, max_concurrent_jobs=1, use_processes=False, cancel_dir=str(tmp_path)
+        )
+        pages_done = []
+        started = threading.Event()
+
+        def job(progress_callback=None, yield_point=None, check_cancelled=None):
+            for page in range(1000):
+                time.sleep(0.005)
+                pages_done.append(page)
+                started.set()
+                check_cancelled()
+            return "done"
+
+        async def run():
+            async with executor.slot("job", page_count=1000):
+                task = asyncio.create_task(executor.run("job", job))
+                await asyncio.to_thread(started.wait, 5)
+                executor.cancel("job")
+                with pytest.raises(JobCancelledError):
+                    await task
+            executor.shutdown()
+
+        asyncio.run(run())
+
+        assert len(pages_done) < 1000
+        assert executor.is_cancelled("job")
+        executor.clear_cancelled("job")
+        assert not executor.is_cancelled("job")
+
+
+class TestScheduling:
+    """Test cases for fast-lane and fair-share scheduling."""
+
+    @staticmethod
+    async def _start_jobs(executor, jobs, order, release):
+        """Queue (job_id, page_count, client_id) jobs; record the order they start."""
+
+        async def job(job_id, page_count, client_id):
+            async with executor.slot(job_id, page_count, client_id):
+                order.append(job_id)
+                await release.wait()
+
+        tasks = []
+        for spec in jobs:
+            tasks.append(asyncio.create_task(job(*spec)))
+            await asyncio.sleep(0)
+        return tasks
+
+    def test_fast_lane_is_reserved_and_goes_first(self):
+        """Test that bulk jobs leave a slot free and queued small jobs start first."""
+        executor = JobExecutor(
+            max_workers=2, max_concurrent_jobs=2, use_processes=False, small_job_max_pages=50
+        )
+        order = []
+
+        async def run():
+            release = asyncio.Event()
+            tasks = await self._start_jobs(
+                executor,
+                [("bulk1", 1000, "a"), ("bulk2", 800, "a"), ("small", 20, "b")],
+                order,
+                release,
+            )
+            # bulk2 may not take the reserved fast-lane slot
+            assert order == ["bulk1", "small"]
+            release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert order == ["bulk1", "small", "bulk2"]
+
+    def test_bulk_lane_is_fair_between_clients(self):
+        """Test that waiting bulk jobs are dispatched round-robin per client."""
+        executor = JobExecutor(max_workers=1, max_concurrent_jobs=1, use_processes=False)
+        order = []
+
+        async def run():
+            release = asyncio.Event()
+            tasks = await self._start_jobs(
+                executor,
+                [("a1", 900, "a"), ("a2", 900, "a"), ("a3", 900, "a"), ("b1", 900, "b")],
+                order,
+                release,
+            )
+            release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert order == ["a1", "a2", "b1", "a3"]
+
+    def test_jobs_wait_for_memory_budget(self):
+        """Test that jobs start only when their memory estimate fits, in queue order."""
+        executor = JobExecutor(
+            max_workers=3, max_concurrent_jobs=3, use_processes=False, memory_limit_mb=1000
+        )
+        order = []
+
+        async def job(job_id, memory_mb, release):
+            async with executor.slot(job_id, 10, memory_mb=memory_mb):
+                order.append(job_id)
+                await release.wait()
+
+        async def run():
+            releases = {job_id: asyncio.Event() for job_id in ("a", "b", "c", "huge")}
+            tasks = []
+            for job_id, memory_mb in [("a", 600), ("b", 600), ("c", 300)]:
+                tasks.append(asyncio.create_task(job(job_id, memory_mb, releases[job_id])))
+                await asyncio.sleep(0)
+
+            # c would fit, but does not overtake b
+            assert order == ["a"]
+            status = executor.memory_status()
+            assert status["reserved_mb"] == 600
+            assert status["available_mb"] == 400
+            assert {r["job_id"]: r["state"] for r in status["reservations"]} == {
+                "a": "running", "b": "waiting", "c": "waiting"
+            }
+
+            releases["a"].set()
+            await asyncio.sleep(0.01)
+            assert order == ["a", "b", "c"]
+            assert executor.reserved_memory_mb() == 900
+
+            # A job larger than the whole budget runs once nothing else holds memory
+            tasks.append(asyncio.create_task(job("huge", 5000, releases["huge"])))
+            await asyncio.sleep(0)
+            assert order == ["a", "b", "c"]
+            releases["b"].set()
+            releases["c"].set()
+            await asyncio.sleep(0.01)
+            assert order == ["a", "b", "c", "huge"]
+
+            releases["huge"].set()
+            await asyncio.gather(*tasks)
+            assert executor.memory_status()["reservations"] == []
+
+        asyncio.run(run())
+
+    def test_workers_split_the_host_memory_budget(self):
+        """Test that uvicorn workers together never reserve more than the host budget."""
+        assert worker_memory_limit_mb(1000, 4) == 250
+        assert worker_memory_limit_mb(1000, 0) == 1000
+        assert worker_memory_limit_mb(0, 4) == 0  # Still no limit
+
+        workers = [
+            JobExecutor(use_processes=False, memory_limit_mb=worker_memory_limit_mb(1000, 2))
+            for _ in range(2)
+        ]
+        started = []
+
+        async def job(executor, job_id):
+            async with executor.slot(job_id, 10, memory_mb=400):
+                started.append(job_id)
+                await asyncio.sleep(0.05)
+
+        async def run():
+            tasks = [
+                asyncio.create_task(job(executor, f"{name}{i}"))
+                for name, executor in zip("ab", workers)
+                for i in range(2)
+            ]
+            await asyncio.sleep(0.01)
+            # One 400 MB job per 500 MB worker share, not two per worker
+            assert sorted(started) == ["a0", "b0"]
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_bulk_job_parks_between_batches(self):
+        """Test that a running bulk job hands its slot to a small job at a batch boundary."""
+        executor = JobExecutor(max_workers=2, max_concurrent_jobs=1, use_processes=False)
+        events = []
+        small_queued = threading.Event()
+
+        def bulk_job(progress_callback=None, yield_point=None, check_cancelled=None):
+            for batch in range(3):
+                events.append(f"bulk batch {batch}")
+                if batch == 0:
+                    small_queued.wait(5)
+                    time.sleep(0.05)
+                yield_point()
+            return "bulk done"
+
+        def small_job(progress_callback=None, yield_point=None, check_cancelled=None):
+            events.append("small")
+            return "small done"
+
+        async def submit(job_id, page_count, func):
+            async with executor.slot(job_id, page_count):
+                return await executor.run(job_id, func)
+
+        async def run():
+            bulk = asyncio.create_task(submit("bulk", 1000, bulk_job))
+            await asyncio.sleep(0.05)
+            small = asyncio.create_task(submit("small", 10, small_job))
+            await asyncio.sleep(0)
+            small_queued.set()
+            results = await asyncio.gather(bulk, small)
+            executor.shutdown()
+            return results
+
+        results = asyncio.run(run())
+
+        assert results == ["bulk done", "small done"]
+        assert events == ["bulk batch 0", "small", "bulk batch 1", "bulk batch 2"]
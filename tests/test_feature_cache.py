@@ -0,0 +1,104 @@
+"""
+Unit tests for the Feature Cache module and threshold-only reprocessing.
+
+Run with: pytest tests/
+"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from app.api.models import ProcessingStatus
+from app.core.processor import _process_pdf_sync
+from config.config import get_config
+from src.feature_cache import FeatureCache, PageFeatures, feature_key
+from src.pdf_processor import PDFProcessor
+
+
+def make_metrics(variance: float, edge_count=10) -> dict:
+    """Build a metrics dictionary as ImageAnalyzer.compute_metrics does."""
+    return {
+        "variance": variance,
+        "white_ratio": 0.9,
+        "edge_count": edge_count,
+        "mean_pixel": 230.0,
+        "std_dev": variance ** 0.5,
+    }
+
+
+class TestFeatureCache:
+    """Test cases for FeatureCache class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that metrics and packed hashes are stored and loaded unchanged."""
+        cache = FeatureCache(str(tmp_path))
+        metrics = [make_metrics(12.5), make_metrics(400.0, edge_count=None)]
+        packed = np.array([[1, 2, 1], [3, 4, 1]], dtype=np.uint8)
+
+        assert cache.save("ab12", PageFeatures(metrics, packed)) is True
+        loaded = cache.load("ab12")
+
+        assert loaded.metrics == metrics
+        np.testing.assert_array_equal(loaded.packed_hashes, packed)
+        assert cache.load("cd34") is None
+
+    def test_key_ignores_thresholds(self):
+        """Test that thresholds do not change the key, render settings do."""
+        config = copy.deepcopy(get_config())
+        key = feature_key("digest", config)
+
+        config["blank_detection"]["variance_threshold"] = 1.0
+        config["duplicate_detection"]["hamming_distance_threshold"] = 12
+        assert feature_key("digest", config) == key
+
+        config["pdf"]["dpi"] = 100
+        assert feature_key("digest", config) != key
+
+    def test_eviction(self, tmp_path):
+        """Test that the least recently used files go first over the size limit."""
+        cache = FeatureCache(str(tmp_path), max_size_mb=1)
+        cache.max_bytes = 1
+        cache.save("aa01", PageFeatures([make_metrics(1.0)], None))
+
+        assert list(tmp_path.glob("*/*.npz")) == []
+
+
+def test_threshold_change_skips_rendering(sample_pdf, tmp_path, monkeypatch):
+    """Test that a threshold-only reprocess reuses stored features without a full render."""
+    config = copy.deepcopy(get_config())
+    config["feature_cache"] = {
+        "path": str(tmp_path / "features"), "max_size_mb": 10, "enabled": True
+    }
+
+    first = _process_pdf_sync("job1", sample_pdf, str(tmp_path / "out"), config, "digest")
+
+    rendered = []
+    original = PDFProcessor.iter_pages_by_index
+
+    def fail_full_render(self, *args, **kwargs):
+        raise AssertionError("all pages rendered again")
+
+    def counting_render(self, pdf_path, page_indices, progress_callback=None):
+        page_indices = list(page_indices)
+        rendered.extend(page_indices)
+        return original(self, pdf_path, page_indices, progress_callback)
+
+    monkeypatch.setattr(PDFProcessor, "extract_pages", fail_full_render)
+    monkeypatch.setattr(PDFProcessor, "iter_pages_by_index", counting_render)
+    # Nothing counts as blank any more
+    config["blank_detection"]["variance_threshold"] = 0
+    config["blank_detection"]["white_pixel_ratio"] = 1.0
+
+    second = _process_pdf_sync("job2", sample_pdf, str(tmp_path / "out"), config, "digest")
+
+    assert first.status is second.status is ProcessingStatus.COMPLETED
+    assert second.total_pages == 3
+    assert second.blank_pages == 0
+    # Only the pages needed for output were rendered
+    assert sorted(set(rendered)) == [0, 1, 2]
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_feature_cache.py -v
+    pytest.main([__file__, "-v"])
@@ -8,6 +8,7 @@ import pytest
 from PIL import Image
 import numpy as np
 from src.image_analyzer import ImageAnalyzer
+from src.feature_cache import metrics_to_arrays
 
 
 class TestImageAnalyzer:
@@ -99,6 +100,15 @@ class TestImageAnalyzer:
         # Should still be detected as blank
         assert is_blank is True
 
+    def test_blank_mask(self, analyzer, blank_image, content_image):
+        """Test that stored metrics re-evaluate to the same result as is_blank."""
+        images = [content_image, blank_image]
+        columns = metrics_to_arrays([analyzer.compute_metrics(img) for img in images])
+
+        assert analyzer.blank_mask(columns).tolist() == [False, True]
+        expected = [analyzer.is_blank(img)[0] for img in images]
+        assert analyzer.blank_mask(columns).tolist() == expected
+
     def test_custom_thresholds(self):
         """Test analyzer with custom thresholds."""
         strict_analyzer = ImageAnalyzer(
@@ -0,0 +1,197 @@
+"""
+Unit tests for the job store backends and JobManager.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.models import ProcessingStatus, ProcessingResult
+from app.core.job_store import InMemoryJobStore, JobStore, SQLiteJobStore, create_job_store
+from app.core.tasks import JobManager
+
+
+def make_job(job_id: str, status=ProcessingStatus.PENDING, created_at=None) -> dict:
+    """Build a job dictionary as JobManager.create_job does."""
+    now = created_at or datetime.now()
+    return {
+        "job_id": job_id,
+        "filename": f"{job_id}.pdf",
+        "status": status,
+        "progress": 0,
+        "current_step": "Queued for processing",
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "config": {"pdf_dpi": 150},
+        "client_id": "client-1",
+        "generation": None,
+    }
+
+
+def make_result(job_id: str) -> ProcessingResult:
+    """Build a minimal completed ProcessingResult."""
+    return ProcessingResult(
+        job_id=job_id,
+        status=ProcessingStatus.COMPLETED,
+        input_file="sample.pdf",
+        total_pages=3,
+        blank_pages=1,
+        reports_found=1,
+        duplicate_reports=0,
+        unique_reports=1,
+        reports=[],
+        processing_time_seconds=1.5,
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Create each job store backend."""
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+class TestJobStore:
+    """Test cases shared by all job store backends."""
+
+    def test_create_and_get(self, store):
+        """Test that a created job round-trips with its types intact."""
+        job = make_job("a")
+        store.create(job)
+
+        loaded = store.get("a")
+
+        assert loaded == job
+        assert loaded["status"] is ProcessingStatus.PENDING
+        assert store.get("missing") is None
+
+    def test_get_selected_fields(self, store):
+        """Test reading some fields of a job without its result."""
+        store.create(make_job("a"))
+        store.update("a", result=make_result("a"))
+
+        loaded = store.get("a", ["job_id", "status", "updated_at"])
+
+        assert set(loaded) == {"job_id", "status", "updated_at"}
+        assert loaded["status"] is ProcessingStatus.PENDING
+        assert isinstance(loaded["updated_at"], datetime)
+
+    def test_update(self, store):
+        """Test progress updates and result storage."""
+        store.create(make_job("a"))
+
+        assert store.update("a", progress=40, current_step="Analysing") is True
+        assert store.update("missing", progress=40) is False
+        store.update("a", status=ProcessingStatus.COMPLETED, result=make_result("a"))
+
+        loaded = store.get("a")
+        assert loaded["progress"] == 40
+        assert loaded["status"] is ProcessingStatus.COMPLETED
+        assert loaded["result"] == make_result("a")
+
+    def test_list_and_count_by_status(self, store):
+        """Test status-filtered, newest-first listing with pagination."""
+        base = datetime.now()
+        for idx, status in enumerate(
+            [ProcessingStatus.PENDING, ProcessingStatus.COMPLETED, ProcessingStatus.COMPLETED]
+        ):
+            store.create(make_job(f"job{idx}", status, base + timedelta(seconds=idx)))
+
+        completed = store.list([ProcessingStatus.COMPLETED])
+
+        assert [job["job_id"] for job in completed] == ["job2", "job1"]
+        assert [job["job_id"] for job in store.list(limit=1, offset=1)] == ["job1"]
+        assert store.count() == 3
+        assert store.count([ProcessingStatus.PENDING]) == 1
+
+    def test_find_updated_before_and_delete(self, store):
+        """Test finding stale jobs and deleting them."""
+        old = datetime.now() - timedelta(hours=48)
+        store.create(make_job("old", ProcessingStatus.COMPLETED, old))
+        store.create(make_job("new", ProcessingStatus.COMPLETED))
+
+        stale = store.find_updated_before(
+            [ProcessingStatus.COMPLETED], datetime.now() - timedelta(hours=24)
+        )
+
+        assert stale == ["old"]
+        assert store.delete("old") is True
+        assert store.delete("old") is False
+
+
+def test_list_updated_after(store):
+    """Test the cheap change query used by job event streams."""
+    base = datetime.now()
+    store.create(make_job("a", created_at=base))
+    store.create(make_job("b", created_at=base))
+    store.update("b", client_id="client-2")
+    store.update("a", progress=30, updated_at=base + timedelta(seconds=5))
+
+    changed = store.list_updated_after(base)
+
+    assert [(job["job_id"], job["progress"]) for job in changed] == [("a", 30)]
+    assert "result" not in changed[0]
+    assert changed[0]["status"] is ProcessingStatus.PENDING
+    since = base - timedelta(seconds=1)
+    assert store.list_updated_after(since, client_id="client-2")[0]["job_id"] == "b"
+    assert store.list_updated_after(since, job_ids=[]) == []
+    store.update("b", status=ProcessingStatus.COMPLETED)
+    active = store.list_updated_after(since, statuses=[ProcessingStatus.PENDING])
+    assert [job["job_id"] for job in active] == ["a"]
+
+
+def test_sqlite_store_is_shared(tmp_path):
+    """Test that two store instances (e.g. two workers) see the same jobs."""
+    path = str(tmp_path / "jobs.db")
+    worker_a = SQLiteJobStore(path)
+    worker_b = SQLiteJobStore(path)
+
+    worker_a.create(make_job("a"))
+    worker_a.update("a", progress=55)
+
+    assert worker_b.get("a")["progress"] == 55
+
+
+def test_create_job_store_rejects_unknown_backend():
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        create_job_store("redis")
+
+
+def test_incomplete_store_cannot_be_created():
+    """Test that a backend missing interface methods fails when created."""
+
+    class PartialStore(JobStore):
+        def create(self, job):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_job_manager_lifecycle():
+    """Test JobManager progress, completion and cleanup through the store."""
+    manager = JobManager(store=InMemoryJobStore())
+    job_id = asyncio.run(manager.create_job("sample.pdf"))
+    subscription = manager.subscribe([job_id])
+
+    async def run():
+        await manager.update_progress(job_id, 50, "Halfway", ProcessingStatus.PROCESSING)
+        await manager.complete_job(job_id, make_result(job_id))
+        manager.store.update(job_id, updated_at=datetime.now() - timedelta(hours=30))
+        return await manager.cleanup_old_jobs(max_age_hours=24)
+
+    deleted = asyncio.run(run())
+    updates = subscription.get_nowait()
+
+    assert [u.progress for u in updates] == [50, 100]
+    assert updates[0].status is ProcessingStatus.PROCESSING
+    assert updates[1].status is ProcessingStatus.COMPLETED
+    assert deleted == 1
+    assert asyncio.run(manager.get_job(job_id)) is None
@@ -0,0 +1,84 @@
+"""
+Unit tests for the Page Store module.
+
+Run with: pytest tests/
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.file_manager import FileManager
+from src.page_store import PageStore
+
+
+def _page(value: int, size: int = 256) -> Image.Image:
+    """Create a uniform RGB page."""
+    return Image.new("RGB", (size, size), (value, value, value))
+
+
+class TestPageStore:
+    """Test cases for PageStore class."""
+
+    def test_spills_oldest_pages_beyond_budget(self, tmp_path):
+        """Test that RAM use stays within budget and spilled pages read back unchanged."""
+        page_bytes = 256 * 256 * 3
+        store = PageStore(max_resident_mb=2.5 * page_bytes / (1024 * 1024), spill_dir=str(tmp_path))
+
+        for idx in range(6):
+            store.put(idx, _page(idx * 10))
+
+        assert len(store) == 6
+        assert store.resident_bytes == 2 * page_bytes
+        assert store.spilled_bytes == 4 * page_bytes
+
+        spilled = store.array(0)
+        assert isinstance(spilled, np.memmap)
+        assert not spilled.flags.writeable
+        assert spilled.shape == (256, 256, 3)
+        assert int(spilled[0, 0, 0]) == 0
+        assert store.image(3).getpixel((5, 5)) == (30, 30, 30)
+
+        # In-memory pages are returned without copying
+        assert store.array(5) is store.array(5)
+
+        store.close()
+        assert len(store) == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_grayscale_arrays_and_lazy_sequences(self, tmp_path):
+        """Test that arrays are stored as given and sequences load pages in index order."""
+        with PageStore(max_resident_mb=0, spill_dir=str(tmp_path)) as store:
+            store.put(2, np.full((10, 20), 200, dtype=np.uint8))
+            store.put(0, _page(50, size=16))
+
+            assert store.indices() == [0, 2]
+            pages = store.images([2, 0])
+            assert len(pages) == 2
+            assert [p.mode for p in pages] == ["L", "RGB"]
+            assert pages[0].size == (20, 10)
+            assert [p.size for p in pages[1:]] == [(16, 16)]
+
+            with pytest.raises(KeyError):
+                store.array(1)
+
+    def test_file_manager_saves_from_store(self, tmp_path):
+        """Test that a report is saved straight from a page store."""
+        with PageStore(max_resident_mb=0, spill_dir=str(tmp_path / "spill")) as store:
+            for idx in range(3):
+                store.put(idx, _page(idx * 80))
+            manager = FileManager(
+                str(tmp_path / "out"), output_format="images", include_metadata=False
+            )
+
+            saved = manager.save_report(store.images([2, 0]), 1)
+
+        saved_pages = sorted((tmp_path / "out").glob("*/page_*.png"))
+        assert len(saved_pages) == 2
+        assert Image.open(saved_pages[0]).getpixel((0, 0)) == (160, 160, 160)
+        assert saved["images"]
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_page_store.py -v
+    pytest.main([__file__, "-v"])
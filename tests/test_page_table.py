@@ -0,0 +1,97 @@
+"""
+Unit tests for the Page Table module.
+
+Run with: pytest tests/
+"""
+
+import numpy as np
+import pytest
+
+from src.duplicate_detector import pack_hashes
+from src.image_analyzer import ImageAnalyzer
+from src.page_table import NO_PAGE, PAGE_PENDING, PAGE_RENDERED, PAGE_RESTORED, PageTable
+
+
+def make_metrics(variance: float, white_ratio: float = 0.5, edge_count=500) -> dict:
+    """Build a metrics dictionary as ImageAnalyzer.compute_metrics does."""
+    return {
+        "variance": variance,
+        "white_ratio": white_ratio,
+        "edge_count": edge_count,
+        "mean_pixel": 200.0,
+        "std_dev": variance ** 0.5,
+    }
+
+
+class TestPageTable:
+    """Test cases for PageTable class."""
+
+    def test_blank_thresholds_match_evaluate_metrics(self):
+        """Test that the vectorised verdict matches the per-page evaluation."""
+        analyzer = ImageAnalyzer()
+        metrics = [
+            make_metrics(5.0, 0.99, 3),  # blank
+            make_metrics(5000.0),  # content
+            make_metrics(5.0, 0.99, None),  # blank without edge count
+            make_metrics(50.0, 0.5, 10),  # low variance and edges: blank
+            make_metrics(50.0, 0.5, None),  # only low variance: content
+        ]
+        table = PageTable.from_metrics(metrics)
+
+        non_blank = table.apply_blank_thresholds(analyzer)
+
+        expected = [i for i, m in enumerate(metrics) if not analyzer.evaluate_metrics(dict(m))[0]]
+        assert non_blank.tolist() == expected == [1, 4]
+        assert table.metrics() == metrics
+        assert table.reasons(1, analyzer) == ["Page contains content"]
+        assert table.reasons(0, analyzer)[0].startswith("Low variance")
+        assert set(table.rows["render_state"]) == {PAGE_RESTORED}
+
+    def test_duplicate_groups_and_summary(self):
+        """Test that duplicate marks refer to original page indices."""
+        table = PageTable(5)
+        table.set_metrics(0, [make_metrics(5000.0)] * 5)
+        table.rows["is_blank"][1] = True
+
+        # Pages 0, 2, 3, 4 grouped: page 3 duplicates page 0
+        table.set_duplicate_groups([0, 2, 3, 4], [0, 1, 0, 3])
+
+        assert table.rows["duplicate_of"].tolist() == [NO_PAGE, NO_PAGE, NO_PAGE, 0, NO_PAGE]
+        assert table.unique_indices().tolist() == [0, 2, 4]
+        assert table.summary() == {
+            "total_pages": 5,
+            "blank_pages": 1,
+            "non_blank_pages": 4,
+            "duplicate_pages": 1,
+            "unique_pages": 3,
+        }
+
+    def test_hashes_and_render_state(self):
+        """Test that hash batches of different widths are joined and render states tracked."""
+        table = PageTable(4)
+        assert table.pending_indices([0, 3]) == [0, 3]
+        assert table.rows["render_state"][0] == PAGE_PENDING
+
+        table.set_hashes(0, pack_hashes([None, None]))  # No valid hash: one column
+        packed = np.array([[7, 9, 1], [0, 0, 0]], dtype=np.uint8)
+        table.set_hashes(2, packed)
+
+        assert table.packed_hashes.shape == (4, 3)
+        assert table.packed_hashes[:, -1].tolist() == [0, 0, 1, 0]
+        np.testing.assert_array_equal(table.packed_hashes[2:], packed)
+
+        table.mark_rendered([3])
+        assert table.pending_indices([0, 3]) == [0]
+        assert table.rows["render_state"][3] == PAGE_RENDERED
+
+    def test_overhead_at_100k_pages(self):
+        """Test that the bookkeeping of a 100k page document stays small."""
+        table = PageTable(100_000)
+        table.set_hashes(0, np.zeros((100_000, 9), dtype=np.uint8))
+
+        assert table.nbytes < 8 * 1024 * 1024
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_page_table.py -v
+    pytest.main([__file__, "-v"])
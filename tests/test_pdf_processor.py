@@ -0,0 +1,92 @@
+"""
+Unit tests for the PDF Processor module.
+
+Run with: pytest tests/
+"""
+
+import pytest
+
+from src.pdf_processor import PDFProcessor, PageRef
+
+
+class TestPDFProcessor:
+    """Test cases for PDFProcessor class."""
+
+    def test_extract_pages(self, sample_pdf):
+        """Test that every page is rendered at the configured DPI."""
+        processor = PDFProcessor(dpi=72)
+
+        images = processor.extract_pages(sample_pdf)
+
+        assert len(images) == 3
+        assert images[0].size == (595, 842)
+        assert images[0].mode == "RGB"
+
+    def test_extract_pages_by_index(self, sample_pdf):
+        """Test that selected pages are rendered exactly like a full extraction."""
+        processor = PDFProcessor(dpi=36)
+
+        all_pages = processor.extract_pages(sample_pdf)
+        selected = processor.extract_pages_by_index(sample_pdf, [2, 0])
+
+        assert [p.tobytes() for p in selected] == [all_pages[2].tobytes(), all_pages[0].tobytes()]
+        with pytest.raises(ValueError):
+            processor.extract_pages_by_index(sample_pdf, [3])
+
+    def test_get_page_refs(self, sample_pdf):
+        """Test that page references cover the whole document."""
+        refs = PDFProcessor().get_page_refs(sample_pdf)
+
+        assert refs == [PageRef(sample_pdf, 0), PageRef(sample_pdf, 1), PageRef(sample_pdf, 2)]
+
+    def test_extract_region_text(self, sample_pdf):
+        """Test that header text comes from the text layer, clipped to the region."""
+        processor = PDFProcessor()
+
+        texts = processor.extract_region_text(
+            processor.get_page_refs(sample_pdf), (0, 0, 1.0, 0.2)
+        )
+
+        assert "Patient Name" in texts[0]
+        assert "Findings" not in texts[0]
+        assert texts[1] is None  # Image-only page needs OCR
+        assert texts[2].strip() == ""  # Text layer, but nothing in the header
+
+    def test_render_regions(self, sample_pdf):
+        """Test that only the requested clip rectangles are rendered."""
+        processor = PDFProcessor(dpi=200, color_space="GRAY")
+        refs = processor.get_page_refs(sample_pdf)
+
+        headers, footers = processor.render_regions(
+            refs, [(0, 0, 1.0, 0.2), (0, 0.8, 1.0, 1.0)], dpi=72
+        )
+
+        assert len(headers) == len(footers) == 3
+        assert headers[0].width == 595
+        assert abs(headers[0].height - 842 * 0.2) <= 1
+        assert headers[0].mode == "L"
+
+    def test_estimate_memory_mb(self, sample_pdf):
+        """Test that the memory estimate follows page size, DPI and held pages."""
+        processor = PDFProcessor(dpi=144)
+
+        all_held = processor.estimate_memory_mb(sample_pdf)
+        one_held = processor.estimate_memory_mb(sample_pdf, held_pages=1)
+        one_page = processor.estimate_memory_mb(sample_pdf, [0], held_pages=1)
+
+        # A 595x842pt page at 144 DPI is 1190x1684 RGB pixels
+        page_mb = 1190 * 1684 * 3 / (1024 * 1024)
+        assert all_held - one_held == pytest.approx(2 * page_mb)
+        assert one_page == one_held
+        low_dpi = PDFProcessor(dpi=72).estimate_memory_mb(sample_pdf)
+        assert low_dpi == pytest.approx(all_held / 4, rel=0.01)
+
+    def test_missing_file(self):
+        """Test that a missing PDF raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            PDFProcessor().get_page_count("does_not_exist.pdf")
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_pdf_processor.py -v
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,57 @@
+"""
+Unit tests for the StreamingPDFWriter module.
+
+Run with: pytest tests/
+"""
+
+import io
+
+import fitz
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.pdf_writer import StreamingPDFWriter
+
+
+def test_pages_round_trip():
+    """Test that RGB and grayscale pages keep their pixels and size."""
+    rng = np.random.default_rng(0)
+    rgb = Image.fromarray(rng.integers(0, 256, (40, 30, 3), dtype=np.uint8), "RGB")
+    gray = Image.fromarray(rng.integers(0, 256, (20, 50), dtype=np.uint8), "L")
+    buffer = io.BytesIO()
+
+    with StreamingPDFWriter(buffer) as writer:
+        writer.add_page(rgb, dpi=144)
+        writer.add_page(gray)
+
+    with fitz.open(stream=buffer.getvalue(), filetype="pdf") as doc:
+        assert len(doc) == 2
+        assert (doc[0].rect.width, doc[0].rect.height) == pytest.approx((15, 20))
+        assert (doc[1].rect.width, doc[1].rect.height) == pytest.approx((50, 20))
+
+        images = [fitz.Pixmap(doc, page.get_images()[0][0]) for page in doc]
+        assert images[0].samples == rgb.tobytes()
+        assert images[1].samples == gray.tobytes()
+
+
+def test_pages_are_written_before_close():
+    """Test that each page reaches the stream as soon as it is added."""
+    buffer = io.BytesIO()
+    writer = StreamingPDFWriter(buffer)
+    header_size = len(buffer.getvalue())
+
+    writer.add_page(Image.new("RGB", (100, 100), "white"))
+
+    assert len(buffer.getvalue()) > header_size
+    assert b"%%EOF" not in buffer.getvalue()
+
+
+def test_close_without_pages_fails():
+    """Test that an empty document is rejected."""
+    with pytest.raises(ValueError):
+        StreamingPDFWriter(io.BytesIO()).close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,164 @@
+"""
+Unit tests for the Pipeline module.
+
+Run with: pytest tests/
+"""
+
+import copy
+import threading
+import time
+
+import fitz
+import numpy as np
+import pytest
+
+from config.config import get_config
+from main import process_pdf
+from src.file_manager import FileManager
+from src.pipeline import PageItem, Pipeline, Stage
+
+
+class Slow(Stage):
+    """Stage that takes longer for even pages, so workers finish out of order."""
+
+    name = "slow"
+
+    def __init__(self, workers: int):
+        super().__init__(workers)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def process(self, item):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02 if item.index % 2 == 0 else 0.001)
+        with self.lock:
+            self.active -= 1
+        return item
+
+
+class DropOdd(Stage):
+    """Stage dropping odd pages."""
+
+    name = "drop_odd"
+
+    def process(self, item):
+        return None if item.index % 2 else item
+
+
+class Record(Stage):
+    """Inline stage recording pages and the thread it ran on."""
+
+    name = "record"
+
+    def __init__(self):
+        super().__init__(workers=0)
+        self.indices = []
+        self.threads = set()
+        self.finished = False
+
+    def process(self, item):
+        self.indices.append(item.index)
+        self.threads.add(threading.get_ident())
+        return item
+
+    def finish(self):
+        self.finished = True
+
+
+def source(count: int, produced: list = None):
+    for index in range(count):
+        if produced is not None:
+            produced.append(index)
+        yield PageItem(index, np.zeros((2, 2), dtype=np.uint8))
+
+
+class TestPipeline:
+    """Test cases for Pipeline class."""
+
+    def test_pages_keep_order_across_workers(self):
+        """Test that parallel workers run concurrently and pages come out in order."""
+        slow, record = Slow(workers=3), Record()
+        events = []
+        pipeline = Pipeline(
+            [slow, DropOdd(workers=2), record], queue_size=2, on_event=events.append
+        )
+
+        passed = pipeline.run(source(20), total=20)
+
+        assert passed == record.indices == list(range(0, 20, 2))
+        assert slow.max_active > 1
+        assert record.threads == {threading.get_ident()}
+        assert record.finished
+        finished = [event.stage for event in events if event.index is None]
+        assert finished == ["slow", "drop_odd", "record"]
+        assert sum(1 for event in events if event.stage == "render") == 20
+
+    def test_back_pressure_and_stop_on_callback_error(self):
+        """Test that the source never runs far ahead and an event error stops every thread."""
+        produced = []
+        pipeline = Pipeline([Slow(workers=1)], queue_size=1)
+
+        def on_event(event):
+            assert len(produced) - event.done <= pipeline.max_in_flight + 1
+            if event.stage == "slow" and event.done == 5:
+                raise RuntimeError("stop")
+
+        pipeline.on_event = on_event
+        threads_before = threading.active_count()
+        with pytest.raises(RuntimeError, match="stop"):
+            pipeline.run(source(1000, produced), total=1000)
+
+        assert len(produced) < 5 + pipeline.max_in_flight + 2
+        assert threading.active_count() == threads_before
+
+    def test_stage_errors_propagate(self):
+        """Test that an exception raised in a worker thread reaches the caller."""
+
+        class Fail(Stage):
+            def process(self, item):
+                raise ValueError(f"bad page {item.index}")
+
+        with pytest.raises(ValueError, match="bad page"):
+            Pipeline([Fail(workers=2)]).run(source(3))
+
+        with pytest.raises(ValueError, match="Inline stages"):
+            Pipeline([Record(), Slow(workers=1)])
+
+
+def test_cli_process_pdf_runs_the_pipeline(tmp_path, monkeypatch):
+    """Test that the CLI removes blank and duplicate pages and streams the output."""
+
+    def save_report(*args, **kwargs):
+        raise AssertionError("WriteStage must stream pages with save_report_stream")
+
+    monkeypatch.setattr(FileManager, "save_report", save_report)
+    pdf_path = tmp_path / "reports.pdf"
+    doc = fitz.open()
+    for text in ["Report A", None, "Report B", "Report A"]:
+        page = doc.new_page(width=595, height=842)
+        if text:
+            for line in range(30):
+                page.insert_text((50, 60 + 24 * line), f"{text} line {line} " * 4, fontsize=11)
+        if text == "Report B":
+            page.draw_rect(fitz.Rect(50, 50, 545, 420), color=(0, 0, 0), fill=(0, 0, 0))
+    doc.save(pdf_path)
+    doc.close()
+
+    config = copy.deepcopy(get_config())
+    config["pdf"]["dpi"] = 50
+    stats = process_pdf(str(pdf_path), str(tmp_path / "out"), config)
+
+    assert stats["success"] is True
+    assert (stats["total_pages"], stats["blank_pages"], stats["duplicate_pages"]) == (4, 1, 1)
+    with fitz.open(stats["saved_files"][0]["pdf"]) as out:
+        assert len(out) == 2
+        # Written at the rendering resolution, so pages keep their true size
+        assert abs(out[0].rect.width - 595) < 2
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_pipeline.py -v
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""
+Unit tests for on-demand page preview thumbnails.
+
+Run with: pytest tests/
+"""
+
+import fitz
+import pytest
+from PIL import Image
+
+from app.core.previews import PreviewCache
+from src.pdf_processor import PDFProcessor
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """Create a 5-page PDF and a selection manifest for its odd pages."""
+    pdf_path = tmp_path / "source.pdf"
+    doc = fitz.open()
+    for idx in range(5):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((50, 100), f"Page {idx}", fontsize=40)
+    doc.save(pdf_path)
+    doc.close()
+    return {
+        "source": str(pdf_path),
+        "source_sha256": "abc",
+        "non_blank_indices": [1, 3],
+        "render": {"dpi": 200, "image_format": "PNG", "color_space": "RGB"},
+    }
+
+
+def test_get_renders_once_at_thumbnail_size(manifest, tmp_path, monkeypatch):
+    """Test that a preview is rendered on first request and then served from disk."""
+    cache = PreviewCache(str(tmp_path / "previews"), max_width=150, max_height=200)
+    calls = []
+    render = PDFProcessor.render_thumbnails
+
+    def counting_render(self, pdf_path, page_indices, max_size):
+        calls.append(list(page_indices))
+        return render(self, pdf_path, page_indices, max_size)
+
+    monkeypatch.setattr(PDFProcessor, "render_thumbnails", counting_render)
+
+    first = cache.get(manifest, 1)
+    second = cache.get(manifest, 1)
+
+    assert first == second
+    assert calls == [[3]]
+    with Image.open(first) as image:
+        assert image.format == "JPEG"
+        assert image.width <= 150 and image.height <= 200
+        assert max(image.width - 150, image.height - 200) >= -1  # Fitted, not shrunk further
+
+    with pytest.raises(IndexError):
+        cache.get(manifest, 2)
+
+
+def test_prewarm_renders_leading_sheets_once(manifest, tmp_path):
+    """Test that prewarming renders the sheets of the first pages and skips cached ones."""
+    cache = PreviewCache(str(tmp_path / "previews"), prewarm_pages=10, sheet_pages=1)
+
+    assert cache.prewarm(manifest) == 2
+    assert cache.prewarm(manifest) == 0
+
+
+def test_sprite_sheet_matches_layout(manifest, tmp_path):
+    """Test that sheets tile thumbnails into the cells given by the layout."""
+    cache = PreviewCache(
+        str(tmp_path / "previews"), max_width=60, max_height=80, sheet_pages=2, sheet_columns=2
+    )
+    manifest["non_blank_indices"] = [0, 1, 2]
+
+    layout = cache.sprite_layout(3)
+
+    assert [(c["sheet"], c["x"], c["y"]) for c in layout] == [(0, 0, 0), (0, 60, 0), (1, 0, 0)]
+    assert (layout[0]["sheet_width"], layout[0]["sheet_height"]) == (120, 80)
+    assert (layout[2]["sheet_width"], layout[2]["sheet_height"]) == (60, 80)
+
+    with Image.open(cache.get_sheet(manifest, 0)) as sheet:
+        assert sheet.format == cache.sheet_format
+        assert sheet.size == (120, 80)
+    with pytest.raises(IndexError):
+        cache.get_sheet(manifest, 2)
+
+    # Sheets depend on which pages they hold
+    key = cache.sheet_key(manifest, 0)
+    manifest["non_blank_indices"] = [0, 2, 4]
+    assert cache.sheet_key(manifest, 0) != key
+
+
+def test_eviction_keeps_cache_bounded(manifest, tmp_path):
+    """Test that the least recently used previews are evicted over the size limit."""
+    cache = PreviewCache(str(tmp_path / "previews"))
+    first = cache.get(manifest, 0)
+    cache.max_bytes = first.stat().st_size * 3 // 2  # Room for one preview
+
+    second = cache.get(manifest, 1)
+
+    assert second.exists()
+    assert not first.exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+"""
+Unit tests for the processing pipeline's page selection flow.
+
+Run with: pytest tests/
+"""
+
+import copy
+
+import fitz
+import pytest
+
+from app.core.executor import JobCancelledError
+from app.core.processor import (
+    SELECTION_MANIFEST,
+    _generate_pdf_sync,
+    _process_pdf_sync,
+    read_selection_manifest,
+    render_selected_pages,
+)
+from config.config import get_config
+from src.pdf_processor import PDFProcessor
+
+
+@pytest.fixture
+def duplicate_pdf(tmp_path):
+    """Create a 4-page PDF: report A, a blank page, report B, and report A again."""
+    pdf_path = tmp_path / "duplicates.pdf"
+    doc = fitz.open()
+    for text in ["Report A", None, "Report B", "Report A"]:
+        page = doc.new_page(width=595, height=842)
+        if text:
+            for line in range(30):
+                page.insert_text((50, 60 + 24 * line), f"{text} line {line} " * 4, fontsize=11)
+        if text == "Report B":
+            page.draw_rect(fitz.Rect(50, 50, 545, 420), color=(0, 0, 0), fill=(0, 0, 0))
+    doc.save(pdf_path)
+    doc.close()
+    return str(pdf_path)
+
+
+def test_selection_uses_manifest_instead_of_page_cache(duplicate_pdf, tmp_path):
+    """Test that duplicates leave only a manifest and selected pages render from the source."""
+    config = copy.deepcopy(get_config())
+    config["pdf"]["dpi"] = 50
+
+    result = _process_pdf_sync("job1", duplicate_pdf, str(tmp_path), config)
+
+    job_dir = tmp_path / "temp" / "job_job1"
+    assert result.requires_user_selection is True
+    assert [p.duplicate_of for p in result.pages] == [None, None, 0]
+    assert [p.sprite.x for p in result.pages] == [0, 300, 600]
+    assert result.pages[0].sprite.url.startswith("/api/preview/job1/sheet_0.")
+    # Previews are rendered on request, not by the job
+    assert sorted(f.name for f in job_dir.iterdir()) == [SELECTION_MANIFEST]
+
+    manifest = read_selection_manifest(job_dir)
+    assert manifest["non_blank_indices"] == [0, 2, 3]
+    assert manifest["render"]["dpi"] == 50
+
+    # Selectable page 1 is original page 2; out-of-range selections are ignored
+    pages = render_selected_pages(manifest, [1, 7])
+    expected = PDFProcessor(dpi=50).extract_pages_by_index(duplicate_pdf, [2])
+    assert [p.tobytes() for p in pages] == [expected[0].tobytes()]
+
+
+def test_generate_pdf_sync_writes_selected_pages(duplicate_pdf, tmp_path):
+    """Test that the generation job streams the selected pages into a PDF at true page size."""
+    config = get_config()
+    updates = []
+
+    saved = _generate_pdf_sync(
+        duplicate_pdf,
+        {"dpi": 50, "image_format": "PNG", "color_space": "RGB"},
+        [3, 0],
+        str(tmp_path / "out"),
+        config["file_management"],
+        "selection",
+        {"user_selected": True},
+        progress_callback=lambda progress, step: updates.append(progress),
+    )
+
+    with fitz.open(saved["pdf"]) as doc:
+        assert len(doc) == 2
+        assert doc[0].rect.width == pytest.approx(595, abs=2)
+        assert doc[0].rect.height == pytest.approx(842, abs=2)
+    assert updates[-1] == 99
+    assert updates == sorted(updates)
+
+
+def test_cancelled_job_stops_and_removes_partial_output(duplicate_pdf, tmp_path):
+    """Test that cancellation during saving stops the job and leaves no report behind."""
+    config = copy.deepcopy(get_config())
+    config["pdf"]["dpi"] = 50
+    config["duplicate_detection"]["enabled"] = False
+    config["file_management"]["output_format"] = "images"
+    out_dir = tmp_path / "out"
+    steps = []
+
+    def check_cancelled():
+        if steps and steps[-1].startswith("Saving pages"):
+            raise JobCancelledError("cancelled")
+
+    with pytest.raises(JobCancelledError):
+        _process_pdf_sync(
+            "job1", duplicate_pdf, str(out_dir), config,
+            progress_callback=lambda progress, step: steps.append(step),
+            check_cancelled=check_cancelled,
+        )
+
+    assert steps[-1] == "Saving pages (1/3)"
+    assert not [path for path in out_dir.iterdir() if "_report_" in path.name]
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_processor.py -v
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Unit tests for the progress event bus.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+
+import pytest
+
+from app.api.models import ProcessingProgress, ProcessingStatus
+from app.core.progress_bus import ProgressBus
+
+
+def event(job_id: str, progress: int, status=ProcessingStatus.PROCESSING) -> ProcessingProgress:
+    """Build a progress event."""
+    return ProcessingProgress(job_id=job_id, status=status, progress=progress, current_step="step")
+
+
+def test_routing_by_job_and_all_jobs():
+    """Test that per-job subscriptions only get their jobs and wildcard ones get everything."""
+    bus = ProgressBus()
+    job_a = bus.subscribe(["a"])
+    everything = bus.subscribe()
+
+    bus.publish(event("a", 10))
+    bus.publish(event("b", 20))
+    bus.add_jobs(job_a, ["b"])
+    bus.publish(event("b", 30))
+
+    assert [(e.job_id, e.progress) for e in job_a.get_nowait()] == [("a", 10), ("b", 30)]
+    assert [e.progress for e in everything.get_nowait()] == [10, 20, 30]
+
+    bus.unsubscribe(job_a)
+    bus.publish(event("a", 40))
+    assert job_a.get_nowait() == []
+    bus.unsubscribe(everything)
+    assert not bus.has_subscribers("a")
+
+
+def test_slow_subscriber_is_coalesced_without_losing_completion():
+    """Test that a subscriber that falls behind keeps the latest progress and final events."""
+    bus = ProgressBus(max_pending=3)
+    slow = bus.subscribe()
+
+    for progress in range(10):
+        bus.publish(event("a", progress))
+    bus.publish(event("a", 100, ProcessingStatus.COMPLETED))
+    bus.publish(event("b", 5))
+
+    events = slow.get_nowait()
+    assert [(e.job_id, e.progress) for e in events] == [("a", 9), ("a", 100), ("b", 5)]
+    assert events[1].status is ProcessingStatus.COMPLETED
+    assert slow.coalesced == 9
+
+
+def test_final_events_are_never_dropped():
+    """Test that a queue full of final events drops new progress but keeps new final events."""
+    bus = ProgressBus(max_pending=2)
+    slow = bus.subscribe()
+
+    bus.publish(event("a", 100, ProcessingStatus.COMPLETED))
+    bus.publish(event("b", 100, ProcessingStatus.FAILED))
+    bus.publish(event("c", 50))
+    bus.publish(event("d", 100, ProcessingStatus.CANCELLED))
+
+    assert [e.job_id for e in slow.get_nowait()] == ["a", "b", "d"]
+    assert slow.coalesced == 1
+
+
+def test_callbacks_run_outside_the_publisher():
+    """Test that a stalled callback neither blocks publishing nor other subscribers."""
+    bus = ProgressBus(max_pending=2)
+    received = []
+
+    async def stalled(update):
+        await asyncio.Event().wait()
+
+    async def run():
+        bus.add_callback("a", stalled)
+        fast = bus.subscribe(["a"])
+
+        for progress in range(50):
+            bus.publish(event("a", progress))
+            await asyncio.sleep(0)
+            received.extend(fast.get_nowait())
+
+        bus.remove_callbacks("a")
+        await asyncio.sleep(0)
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert [e.progress for e in received] == list(range(50))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
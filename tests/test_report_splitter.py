@@ -0,0 +1,187 @@
+"""
+Unit tests for the Report Splitter and OCR pool modules.
+
+Run with: pytest tests/
+"""
+
+import sys
+
+import pytest
+from PIL import Image
+
+from config.config import REPORT_SPLITTING_CONFIG
+from src import ocr_pool
+from src.ocr_pool import OCRWorkerPool
+from src.pdf_processor import PDFProcessor
+from src.report_splitter import ReportSplitter
+
+
+class FakeOCRPool:
+    """OCR pool stand-in that returns canned header text per image width."""
+
+    def __init__(self, texts_by_width):
+        self.texts_by_width = texts_by_width
+        self.calls = 0
+        self.inputs = []
+
+    def map_images(self, images):
+        self.calls += 1
+        self.inputs.extend(images)
+        return [self.texts_by_width.get(image.width, "") for image in images]
+
+    def image_to_string(self, image):
+        return self.map_images([image])[0]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path, monkeypatch):
+    """Install a fake tesseract executable that echoes one page per listed image."""
+    script = tmp_path / "fake_tesseract.py"
+    script.write_text(
+        "import sys\n"
+        "paths = [p for p in open(sys.argv[1]).read().splitlines() if p]\n"
+        "sys.stdout.write(''.join(f'text {i}\\f' for i, _ in enumerate(paths)))\n"
+    )
+    launcher = tmp_path / "tesseract"
+    launcher.write_text(f"#!/bin/sh\nexec {sys.executable} {script} \"$@\"\n")
+    launcher.chmod(0o755)
+    monkeypatch.setattr(ocr_pool, "get_tesseract_cmd", lambda: str(launcher))
+    return launcher
+
+
+class TestOCRWorkerPool:
+    """Test cases for OCRWorkerPool class."""
+
+    def test_cli_batches_preserve_order(self, fake_tesseract):
+        """Test that batched CLI OCR returns one text per image in order."""
+        images = [Image.new("L", (100, 20), color=255) for _ in range(7)]
+
+        with OCRWorkerPool(max_workers=2, batch_size=3, backend="cli") as pool:
+            texts = pool.map_images(images)
+
+        # One tesseract run per batch of 3; numbering restarts per run
+        assert texts == ["text 0", "text 1", "text 2"] * 2 + ["text 0"]
+
+    def test_empty_input(self):
+        """Test that no OCR work is started for an empty list."""
+        pool = OCRWorkerPool(backend="cli")
+
+        assert pool.map_images([]) == []
+        assert pool._executor is None
+
+    def test_invalid_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            OCRWorkerPool(backend="easyocr")
+
+
+class TestReportSplitter:
+    """Test cases for ReportSplitter class."""
+
+    def test_ocr_boundaries_use_single_pool_call(self, monkeypatch):
+        """Test that all header crops are OCR'd in one parallel pool call."""
+        monkeypatch.setattr("src.report_splitter.tesseract_available", lambda: True)
+        splitter = ReportSplitter(use_ocr=True)
+        # Pages are told apart by width; widths 300 and 500 carry a header
+        fake = FakeOCRPool({300: "Patient Name: Jane", 500: "HOSPITAL report"})
+        splitter._ocr_pool = fake
+        widths = [300, 301, 302, 500, 501]
+        images = [Image.new("RGB", (w, 400), color="white") for w in widths]
+
+        reports = splitter.split_reports(images)
+
+        assert fake.calls == 1
+        assert [r.page_indices for r in reports] == [[0, 1, 2], [3, 4]]
+        assert reports[1].metadata["ocr_pages"] == [3, 4]
+
+    def test_text_layer_pages_skip_ocr(self, monkeypatch, sample_pdf):
+        """Test that only image-only pages are sent to OCR."""
+        monkeypatch.setattr("src.report_splitter.tesseract_available", lambda: True)
+        splitter = ReportSplitter(use_ocr=True, ocr_dpi=144)
+        processor = PDFProcessor(dpi=36)
+        images = processor.extract_pages(sample_pdf)
+        # The scanned page (index 1) is OCR'd from a 144 DPI header clip
+        fake = FakeOCRPool({595 * 2: "Report Date: 2024-01-01"})
+        splitter._ocr_pool = fake
+
+        reports = splitter.split_reports(images, processor.get_page_refs(sample_pdf))
+
+        assert len(fake.inputs) == 1
+        assert fake.inputs[0].size == (595 * 2, int(842 * 2 * 0.2) + 1)
+        assert [r.page_indices for r in reports] == [[0], [1, 2]]
+        assert reports[0].metadata["ocr_pages"] == []
+        assert reports[1].metadata["ocr_pages"] == [1]
+
+    def test_heuristic_uses_header_clips(self, sample_pdf, monkeypatch):
+        """Test that the heuristic path renders header clips once per page."""
+        splitter = ReportSplitter(use_ocr=False, heuristic_dpi=36)
+        processor = PDFProcessor(dpi=36)
+        images = processor.extract_pages(sample_pdf)
+        calls, signatures = [], []
+        original_render = splitter._pdf_processor.render_regions
+        original_signature = splitter._header_signature
+
+        def counting_render(refs, regions, dpi=None):
+            calls.append((len(refs), dpi))
+            return original_render(refs, regions, dpi)
+
+        def counting_signature(region):
+            signatures.append(region)
+            return original_signature(region)
+
+        monkeypatch.setattr(splitter._pdf_processor, "render_regions", counting_render)
+        monkeypatch.setattr(splitter, "_header_signature", counting_signature)
+
+        reports = splitter.split_reports(images, processor.get_page_refs(sample_pdf))
+
+        assert calls == [(3, 36)]
+        assert len(signatures) == 3
+        # The gray scanned page has a very different header from the white pages
+        assert [r.page_indices for r in reports] == [[0], [1], [2]]
+
+    def test_page_refs_must_match_images(self, sample_pdf):
+        """Test that mismatched page references are rejected."""
+        splitter = ReportSplitter(use_ocr=False)
+        refs = PDFProcessor().get_page_refs(sample_pdf)
+
+        with pytest.raises(ValueError):
+            splitter.split_reports([Image.new("RGB", (10, 10))], refs)
+
+    def test_ocr_disabled_without_tesseract(self, monkeypatch):
+        """Test that OCR falls back to heuristics when Tesseract is missing."""
+        monkeypatch.setattr("src.report_splitter.tesseract_available", lambda: False)
+
+        splitter = ReportSplitter(use_ocr=True)
+
+        assert splitter.use_ocr is False
+
+    def test_heuristic_single_report(self):
+        """Test that identical pages form a single report."""
+        splitter = ReportSplitter(use_ocr=False)
+        images = [Image.new("RGB", (200, 300), color="white") for _ in range(4)]
+
+        reports = splitter.split_reports(images)
+
+        assert len(reports) == 1
+        assert reports[0].page_indices == [0, 1, 2, 3]
+
+    def test_configured_ocr_settings_reach_the_pool(self, monkeypatch):
+        """Test that the OCR settings of REPORT_SPLITTING_CONFIG configure the splitter and pool."""
+        monkeypatch.setattr(ocr_pool, "TESSEROCR_AVAILABLE", False)
+        settings = {k: v for k, v in REPORT_SPLITTING_CONFIG.items() if k != "enabled"}
+        settings.update(ocr_workers=2, ocr_batch_size=5, ocr_backend="cli")
+
+        splitter = ReportSplitter(use_ocr=False, **settings)
+        pool = splitter.ocr_pool
+
+        assert (pool.max_workers, pool.batch_size, pool.backend) == (2, 5, "cli")
+        assert splitter.ocr_dpi == REPORT_SPLITTING_CONFIG["ocr_dpi"]
+        splitter.close()
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_report_splitter.py -v
+    pytest.main([__file__, "-v"])
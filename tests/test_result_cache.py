@@ -0,0 +1,106 @@
+"""
+Unit tests for the result cache.
+
+Run with: pytest tests/
+"""
+
+import os
+import time
+
+import pytest
+
+from app.api.models import ProcessingResult, ProcessingStatus, ReportInfo
+from app.core.result_cache import ResultCache, config_digest
+
+
+def make_result(
+    job_id: str, filename: str = "scan_report_0001.pdf", **overrides
+) -> ProcessingResult:
+    """Build a completed ProcessingResult with one output file."""
+    fields = dict(
+        job_id=job_id,
+        status=ProcessingStatus.COMPLETED,
+        input_file="scan.pdf",
+        total_pages=3,
+        blank_pages=1,
+        reports_found=1,
+        duplicate_reports=0,
+        unique_reports=1,
+        reports=[ReportInfo(
+            report_id="report_0001",
+            filename=filename,
+            page_count=2,
+            file_size_mb=0.01,
+            download_url=f"/api/download/{filename}",
+        )],
+        processing_time_seconds=2.0,
+    )
+    fields.update(overrides)
+    return ProcessingResult(**fields)
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    """Output directory holding one report file."""
+    path = tmp_path / "output"
+    path.mkdir()
+    (path / "scan_report_0001.pdf").write_bytes(b"%PDF-1.4 report")
+    return path
+
+
+class TestResultCache:
+    """Test cases for ResultCache class."""
+
+    def test_config_digest_ignores_unrelated_settings(self):
+        """Test that only result-affecting sections change the digest."""
+        config = {"pdf": {"dpi": 200}, "blank_detection": {"variance_threshold": 100}}
+
+        assert config_digest(config) == config_digest({**config, "logging": {"level": "DEBUG"}})
+        assert config_digest(config) != config_digest({**config, "pdf": {"dpi": 150}})
+
+    def test_hit_restores_output_files(self, tmp_path, output_dir):
+        """Test that a cached result is returned for a new job with its files restored."""
+        cache = ResultCache(tmp_path / "cache")
+        key = cache.key("abc", {"pdf": {"dpi": 200}})
+
+        assert cache.get(key, "job2", output_dir) is None
+        assert cache.put(key, make_result("job1"), output_dir) is True
+        (output_dir / "scan_report_0001.pdf").unlink()
+
+        cached = cache.get(key, "job2", output_dir)
+
+        assert cached.job_id == "job2"
+        assert cached.reports == make_result("job1").reports
+        assert (output_dir / "scan_report_0001.pdf").read_bytes() == b"%PDF-1.4 report"
+
+    def test_selection_results_are_not_cached(self, tmp_path, output_dir):
+        """Test that results waiting for page selection or failed results are skipped."""
+        cache = ResultCache(tmp_path / "cache")
+
+        selection = make_result("job1", requires_user_selection=True)
+        failed = make_result("job1", status=ProcessingStatus.FAILED)
+        disabled = ResultCache(tmp_path / "off", enabled=False)
+
+        assert cache.put("a", selection, output_dir) is False
+        assert cache.put("b", failed, output_dir) is False
+        assert disabled.put("c", make_result("job1"), output_dir) is False
+
+    def test_eviction_by_age_and_size(self, tmp_path, output_dir):
+        """Test that expired entries go first, then the least recently used ones."""
+        cache = ResultCache(tmp_path / "cache", max_size_mb=1, max_age_hours=1)
+        for key in ("old", "lru", "recent"):
+            cache.put(key, make_result(key), output_dir)
+        stale = time.time() - 2 * 3600
+        os.utime(cache.cache_dir / "old", (stale, stale))
+        os.utime(cache.cache_dir / "lru", (time.time() - 60, time.time() - 60))
+        # Room for a single entry
+        recent = (cache.cache_dir / "recent").rglob("*")
+        cache.max_bytes = sum(f.stat().st_size for f in recent if f.is_file())
+
+        assert cache.evict() == 2
+        assert [entry.name for entry in cache.cache_dir.iterdir()] == ["recent"]
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_result_cache.py -v
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+Unit tests for the job status and listing endpoints.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.api.models import PageInfo, ProcessingResult, ProcessingStatus
+from app.core.job_store import InMemoryJobStore
+
+
+def make_result(job_id: str, page_count: int) -> ProcessingResult:
+    """Build a completed selection result with a page list."""
+    return ProcessingResult(
+        job_id=job_id,
+        status=ProcessingStatus.COMPLETED,
+        input_file="sample.pdf",
+        total_pages=page_count,
+        blank_pages=0,
+        reports_found=1,
+        duplicate_reports=0,
+        unique_reports=1,
+        reports=[],
+        pages=[
+            PageInfo(page_index=i, page_number=i + 1, is_duplicate=False)
+            for i in range(page_count)
+        ],
+        requires_user_selection=True,
+        processing_time_seconds=1.0,
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Serve the API router with an empty in-memory job store."""
+    monkeypatch.setattr(routes.job_manager, "store", InMemoryJobStore())
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_job_status_summary_and_revalidation(client):
+    """Test that polling gets a slim result, then 304s until the job changes."""
+    job_id = asyncio.run(routes.job_manager.create_job("sample.pdf"))
+    routes.job_manager.store.update(job_id, status=ProcessingStatus.COMPLETED, progress=100,
+                                    result=make_result(job_id, 5), updated_at=datetime.now())
+
+    response = client.get(f"/api/jobs/{job_id}")
+    data = response.json()
+    assert data["result"]["pages"] is None
+    assert data["page_count"] == 5
+    assert data["pages_url"] == f"/api/jobs/{job_id}/pages"
+
+    full = client.get(f"/api/jobs/{job_id}", params={"view": "full"}).json()
+    assert len(full["result"]["pages"]) == 5
+
+    etag = response.headers["etag"]
+    assert client.get(f"/api/jobs/{job_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    routes.job_manager.store.update(job_id, updated_at=datetime.now())
+    assert client.get(f"/api/jobs/{job_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_job_pages_are_paginated(client):
+    """Test the page list resource."""
+    job_id = asyncio.run(routes.job_manager.create_job("sample.pdf"))
+    assert client.get(f"/api/jobs/{job_id}/pages").status_code == 409
+
+    routes.job_manager.store.update(job_id, result=make_result(job_id, 5))
+    data = client.get(f"/api/jobs/{job_id}/pages", params={"offset": 3, "limit": 10}).json()
+
+    assert data["total"] == 5
+    assert [page["page_index"] for page in data["pages"]] == [3, 4]
+    assert client.get("/api/jobs/missing/pages").status_code == 404
+
+
+def test_list_jobs_filters_and_paginates(client):
+    """Test status filtering, pagination and the list ETag."""
+    job_ids = [asyncio.run(routes.job_manager.create_job(f"{i}.pdf")) for i in range(3)]
+    routes.job_manager.store.update(job_ids[0], status=ProcessingStatus.FAILED)
+
+    response = client.get("/api/jobs", params={"limit": 1, "offset": 1})
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["jobs"]) == 1
+
+    failed = client.get("/api/jobs", params={"status": "failed"}).json()
+    assert [job["job_id"] for job in failed["jobs"]] == [job_ids[0]]
+
+    etag = response.headers["etag"]
+    repeat = client.get(
+        "/api/jobs", params={"limit": 1, "offset": 1}, headers={"If-None-Match": etag}
+    )
+    assert repeat.status_code == 304
+
+    assert client.get("/api/jobs", params={"limit": 0}).status_code == 422
+
+
+def test_job_websocket_reports_store_updates(client, monkeypatch):
+    """Test that /ws/{job_id} sends the job's state, then changes made by other workers."""
+    monkeypatch.setitem(routes.PERFORMANCE_CONFIG, "event_poll_interval", 0.05)
+    job_id = asyncio.run(routes.job_manager.create_job("sample.pdf"))
+
+    with client.websocket_connect(f"/api/ws/{job_id}") as websocket:
+        assert websocket.receive_json()["current_step"] == "Queued for processing"
+
+        # Written straight to the store, as another worker would
+        routes.job_manager.store.update(job_id, status=ProcessingStatus.PROCESSING, progress=40,
+                                        current_step="Analyzing pages", updated_at=datetime.now())
+        event = websocket.receive_json()
+        assert (event["status"], event["progress"]) == ("processing", 40)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
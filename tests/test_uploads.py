@@ -0,0 +1,182 @@
+"""
+Unit tests for streamed upload storage.
+
+Run with: pytest tests/
+"""
+
+import asyncio
+import hashlib
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.uploads import (
+    ResumableUploadStore,
+    UploadNotFoundError,
+    UploadOffsetError,
+    UploadTooLargeError,
+    commit_upload,
+    content_digest,
+    object_path,
+    partial_dir,
+    stream_upload,
+)
+
+
+def make_upload(data: bytes, filename: str = "scan.pdf") -> UploadFile:
+    """Build an UploadFile over in-memory bytes."""
+    return UploadFile(file=BytesIO(data), filename=filename)
+
+
+class TestStreamUpload:
+    """Test cases for stream_upload."""
+
+    def test_streams_and_hashes(self, tmp_path):
+        """Test that the file is written in chunks with its SHA-256 digest."""
+        data = b"%PDF-1.4" + bytes(range(256)) * 100
+
+        upload = make_upload(data)
+        stored = asyncio.run(stream_upload(upload, tmp_path, max_bytes=10**6, chunk_size=1000))
+
+        assert stored.path == tmp_path / "scan.pdf"
+        assert stored.path.read_bytes() == data
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert list(partial_dir(tmp_path).iterdir()) == []
+
+    def test_existing_names_are_kept(self, tmp_path):
+        """Test that a second upload with the same name gets a suffix."""
+        asyncio.run(stream_upload(make_upload(b"first"), tmp_path, max_bytes=100))
+
+        stored = asyncio.run(stream_upload(make_upload(b"second"), tmp_path, max_bytes=100))
+
+        assert stored.path.name == "scan_1.pdf"
+        assert (tmp_path / "scan.pdf").read_bytes() == b"first"
+
+    def test_content_is_stored_once(self, tmp_path):
+        """Test that identical uploads share one content-addressed object."""
+        data = b"%PDF-1.4 same scan"
+
+        first = asyncio.run(stream_upload(make_upload(data), tmp_path, max_bytes=100))
+        again = asyncio.run(stream_upload(make_upload(data), tmp_path, max_bytes=100))
+        renamed = asyncio.run(stream_upload(make_upload(data, "copy.pdf"), tmp_path, max_bytes=100))
+
+        obj = object_path(tmp_path, first.sha256)
+        assert again.path == first.path
+        assert renamed.path.name == "copy.pdf"
+        assert obj.stat().st_nlink == 3
+        assert content_digest(renamed.path) == first.sha256
+
+    def test_size_limit(self, tmp_path):
+        """Test that oversized uploads are rejected and the partial file removed."""
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(
+                stream_upload(make_upload(b"x" * 5000), tmp_path, max_bytes=4096, chunk_size=1024)
+            )
+
+        assert not (tmp_path / "scan.pdf").exists()
+        assert list(partial_dir(tmp_path).iterdir()) == []
+
+    def test_empty_upload(self, tmp_path):
+        """Test that empty uploads are rejected."""
+        with pytest.raises(ValueError):
+            asyncio.run(stream_upload(make_upload(b""), tmp_path, max_bytes=100))
+
+    def test_commit_strips_directories(self, tmp_path):
+        """Test that client-supplied paths cannot escape the upload directory."""
+        part = partial_dir(tmp_path) / "a.part"
+        part.write_bytes(b"data")
+
+        target = commit_upload(part, tmp_path, "../../evil.pdf")
+
+        assert target == tmp_path / "evil.pdf"
+        assert not part.exists()
+
+
+async def as_chunks(*chunks: bytes):
+    """Async iterator over request body chunks."""
+    for chunk in chunks:
+        yield chunk
+
+
+class TestResumableUploadStore:
+    """Test cases for ResumableUploadStore."""
+
+    def test_resume_after_dropped_chunk(self, tmp_path):
+        """Test that a partially written chunk is kept and the client resumes from it."""
+        store = ResumableUploadStore(tmp_path, max_bytes=1000)
+        data = bytes(range(200))
+        digest = hashlib.sha256(data).hexdigest()
+        upload_id = store.create("bundle.pdf", len(data), digest)["upload_id"]
+
+        async def dropped_connection():
+            yield data[30:80]
+            raise ConnectionError("client went away")
+
+        async def run():
+            await store.append(upload_id, 0, as_chunks(data[:30]))
+            with pytest.raises(ConnectionError):
+                await store.append(upload_id, 30, dropped_connection())
+            offset = store.status(upload_id)["received"]
+            await store.append(upload_id, offset, as_chunks(data[offset:]))
+            return offset, await store.finalize(upload_id)
+
+        offset, stored = asyncio.run(run())
+
+        assert offset == 80
+        assert stored.path == tmp_path / "bundle.pdf"
+        assert stored.path.read_bytes() == data
+        assert list(partial_dir(tmp_path).iterdir()) == []
+
+    def test_offset_must_match(self, tmp_path):
+        """Test that chunks at the wrong offset are rejected with the expected offset."""
+        store = ResumableUploadStore(tmp_path, max_bytes=1000)
+        upload_id = store.create("bundle.pdf", 100)["upload_id"]
+
+        async def run():
+            await store.append(upload_id, 0, as_chunks(b"x" * 10))
+            await store.append(upload_id, 5, as_chunks(b"y" * 10))
+
+        with pytest.raises(UploadOffsetError) as excinfo:
+            asyncio.run(run())
+
+        assert excinfo.value.expected_offset == 10
+
+    def test_limits(self, tmp_path):
+        """Test the size ceiling and the declared size."""
+        store = ResumableUploadStore(tmp_path, max_bytes=100)
+        with pytest.raises(UploadTooLargeError):
+            store.create("bundle.pdf", 101)
+
+        upload_id = store.create("bundle.pdf", 10)["upload_id"]
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(store.append(upload_id, 0, as_chunks(b"x" * 8, b"x" * 8)))
+        assert store.status(upload_id)["received"] == 8
+
+    def test_finalize_checks_completion_and_digest(self, tmp_path):
+        """Test that incomplete or corrupted uploads cannot be finalized."""
+        store = ResumableUploadStore(tmp_path, max_bytes=100)
+        upload_id = store.create("bundle.pdf", 4, sha256="0" * 64)["upload_id"]
+
+        with pytest.raises(ValueError, match="incomplete"):
+            asyncio.run(store.finalize(upload_id))
+        asyncio.run(store.append(upload_id, 0, as_chunks(b"data")))
+        with pytest.raises(ValueError, match="mismatch"):
+            asyncio.run(store.finalize(upload_id))
+
+    def test_abort_and_unknown_ids(self, tmp_path):
+        """Test discarding uploads and rejecting unknown or malformed IDs."""
+        store = ResumableUploadStore(tmp_path, max_bytes=100)
+        upload_id = store.create("bundle.pdf", 4)["upload_id"]
+
+        assert store.abort(upload_id) is True
+        with pytest.raises(UploadNotFoundError):
+            store.status(upload_id)
+        with pytest.raises(UploadNotFoundError):
+            store.status("../../etc/passwd")
+
+
+if __name__ == "__main__":
+    # Run tests with: python -m pytest tests/test_uploads.py -v
+    pytest.main([__file__, "-v"])
@@ -17,6 +17,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.pdf_processor import PDFProcessor
 from src.image_analyzer import ImageAnalyzer
+from src.page_store import PageStore
+from src.page_table import PageTable
+from src.pipeline import AnalyzeStage, Pipeline, render_pages
 from PIL import Image
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
@@ -71,25 +74,28 @@ class SampleExtractor:
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
-        # Extract all pages
-        logger.info("Converting PDF pages to images...")
-        pages = self.pdf_processor.extract_pages(str(pdf_path))
-        logger.info(f"Extracted {len(pages)} pages")
-
-        # Analyze all pages
-        logger.info("Analyzing pages...")
-        results = []
-        for idx, page in enumerate(pages):
-            is_blank, metrics = self.analyzer.is_blank(page)
-            results.append({"page_num": idx + 1, "image": page, "metrics": metrics})
-
-        if mode == "interactive":
-            self._interactive_labeling(results, pdf_path.stem)
-        elif mode == "auto":
-            self._auto_extraction(results, pdf_path.stem, auto_threshold)
-        else:
+        if mode not in ("interactive", "auto"):
             raise ValueError(f"Unknown mode: {mode}")
 
+        with PageStore() as store:
+            # Render and analyze all pages (rendering overlaps the analysis)
+            logger.info("Converting PDF pages to images and analyzing them...")
+            table = PageTable(self.pdf_processor.get_page_count(str(pdf_path)))
+            Pipeline([AnalyzeStage(table, self.analyzer, workers=2)]).run(
+                render_pages(self.pdf_processor, str(pdf_path), store), len(table)
+            )
+            logger.info(f"Analyzed {len(table)} pages")
+
+            results = []
+            for idx, metrics in enumerate(table.metrics()):
+                self.analyzer.evaluate_metrics(metrics)  # Adds is_blank and reasons
+                results.append({"page_num": idx + 1, "image": store.image(idx), "metrics": metrics})
+
+            if mode == "interactive":
+                self._interactive_labeling(results, pdf_path.stem)
+            else:
+                self._auto_extraction(results, pdf_path.stem, auto_threshold)
+
         # Save metadata
         self._save_metadata()
         logger.info(f"Sample extraction complete. Metadata saved to {self.metrics_file}")